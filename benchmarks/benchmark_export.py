@@ -0,0 +1,222 @@
+"""Compare ways of downloading a job's many small output files.
+
+Serves this repo's example extraction outputs (Word paragraphs, PowerPoint
+slides, Cameo diagrams) from a local HTTP server that waits a fixed time
+before each response, like a round trip to the file service. Each file is
+an artifact with a download URL and a salted hash, as the SDK sees it.
+Compared, each with an empty artifact store:
+
+  sequential   one read_bytes() after another, each written to a file
+  parallel     read_bytes() on 8 threads, all results kept until written out
+  directory    istari_export into a directory (8 workers, shared connection pool)
+  zip / tar    istari_export into a zip / tar
+  resume       a zip export stopped halfway, then run again
+
+Reports seconds, HTTP requests and TCP connections opened, and peak memory
+traced during a second run of each.
+
+Usage:
+    python benchmarks/benchmark_export.py
+    python benchmarks/benchmark_export.py --delay-ms 100 --copies 4 --only cameo
+"""
+import argparse
+import functools
+import hashlib
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter, sleep
+from types import SimpleNamespace
+
+import urllib3
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+import istari_artifact_store
+from istari_artifact_store import ArtifactStore
+from istari_export import export_artifacts
+
+EXAMPLES = REPO_ROOT / "use-cases"
+WORKLOADS = {
+    "word": EXAMPLES / "extract-word-document/example-output",
+    "powerpoint": EXAMPLES / "extract-powerpoint/example-output",
+    "cameo": EXAMPLES / "extract-cameo-model/example-output",
+}
+SALT = "benchmark"
+WORKERS = 8
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    delay = 0.0
+    requests = connections = 0
+    _lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the file service offers
+    disable_nagle_algorithm = True  # else headers and body go out 40 ms apart (delayed ACK)
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def do_GET(self):
+        self.server.count("requests")
+        sleep(self.server.delay)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def _artifacts(files, url):
+    """Artifacts the artifact store can download: a download URL and a salted hash each."""
+    client = SimpleNamespace(generate_download_url=lambda sha: SimpleNamespace(url=f"{url}/{sha}"))
+    artifacts = []
+    for n, path in enumerate(files):
+        data = path.read_bytes()
+        sha = hashlib.sha384(data + SALT.encode()).hexdigest()
+        artifacts.append(SimpleNamespace(
+            id=f"rev-{n}", name=path.name, size=len(data), created=None, sources=[], _client=client,
+            content_token=SimpleNamespace(sha=sha, salt=SALT), path=path,
+        ))
+    return artifacts
+
+
+def _read_bytes(artifact):
+    """What artifact.read_bytes() does with the SDK: one whole GET."""
+    url = artifact._client.generate_download_url(artifact.content_token.sha).url
+    return urllib3.request("GET", url).data
+
+
+def sequential(artifacts, out, store):
+    out.mkdir()
+    for artifact in artifacts:
+        (out / artifact.name).write_bytes(_read_bytes(artifact))
+
+
+def parallel(artifacts, out, store):
+    out.mkdir()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        contents = list(pool.map(_read_bytes, artifacts))
+    for artifact, data in zip(artifacts, contents):
+        (out / artifact.name).write_bytes(data)
+
+
+def directory(artifacts, out, store):
+    export_artifacts(artifacts, out, WORKERS, store=store)
+
+
+def to_zip(artifacts, out, store):
+    export_artifacts(artifacts, out.with_suffix(".zip"), WORKERS, store=store)
+
+
+def to_tar(artifacts, out, store):
+    export_artifacts(artifacts, out.with_suffix(".tar"), WORKERS, store=store)
+
+
+def resume(artifacts, out, store, stop=None):
+    def interrupt(entry, written=[]):
+        written.append(entry)
+        if len(written) == len(artifacts) // 2:
+            raise KeyboardInterrupt
+    try:
+        export_artifacts(artifacts, out.with_suffix(".zip"), WORKERS, store=store, progress=interrupt)
+    except KeyboardInterrupt:
+        pass
+    stop()  # only the resumed run is measured
+    export_artifacts(artifacts, out.with_suffix(".zip"), WORKERS, store=store)
+
+
+APPROACHES = {"sequential": sequential, "parallel": parallel, "directory": directory,
+              "zip": to_zip, "tar": to_tar, "resume": resume}
+
+
+def _run(approach, artifacts, work, server, traced=False):
+    """(seconds, requests, connections, peak MB traced or None) of one run from a cold store."""
+    out = work / f"{approach.__name__}-{'traced' if traced else 'timed'}"
+    store = ArtifactStore(work / f"store-{out.name}")
+    istari_artifact_store._pools.clear()  # new pools: no connections carried over
+    urllib3._DEFAULT_POOL.clear()
+    started = {}
+
+    def start():
+        server.requests = server.connections = 0
+        started["at"] = perf_counter()
+        if traced:
+            tracemalloc.start()
+
+    start()
+    if approach is resume:
+        approach(artifacts, out, store, stop=lambda: (tracemalloc.stop(), start()))
+    else:
+        approach(artifacts, out, store)
+    seconds = perf_counter() - started["at"]
+    peak = None
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    return seconds, server.requests, server.connections, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk export of many small artifacts")
+    parser.add_argument("--delay-ms", type=float, default=50, help="Wait before each response (default: 50)")
+    parser.add_argument("--copies", type=int, default=1, help="Copies of each workload's files (default: 1)")
+    parser.add_argument("--only", action="append", default=None, choices=list(WORKLOADS), help="Run only this workload")
+    args = parser.parse_args()
+    importlib.import_module("istari_digital_client.legacy.proxy")  # the store's pools use it; not timed
+
+    with tempfile.TemporaryDirectory(prefix="export-bench-") as tmp:
+        root = Path(tmp)
+        served = root / "served"
+        served.mkdir()
+        server = _Server(("127.0.0.1", 0), functools.partial(_Handler, directory=str(served)))
+        server.delay = args.delay_ms / 1000
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        print(f"{'workload':<12}{'files':>6}{'MB':>6}  {'approach':<11}{'s':>7}{'requests':>10}"
+              f"{'connections':>13}{'peak MB':>9}")
+        for name, folder in WORKLOADS.items():
+            if args.only and name not in args.only:
+                continue
+            files = []
+            for copy in range(args.copies):
+                for path in sorted(folder.iterdir()):
+                    target = root / f"{name}-{copy}" / (path.name if not copy else f"{copy}-{path.name}")
+                    target.parent.mkdir(exist_ok=True)
+                    target.write_bytes(path.read_bytes() + (f"\n{copy}".encode() if copy else b""))  # unique content
+                    files.append(target)
+            artifacts = _artifacts(files, url)
+            for artifact in artifacts:
+                blob = served / artifact.content_token.sha
+                if not blob.exists():  # identical files share a hash
+                    os.link(artifact.path, blob)
+            megabytes = sum(a.size for a in artifacts) / 1024 / 1024
+            for label, approach in APPROACHES.items():
+                work = root / f"{name}-{label}"
+                work.mkdir()
+                # Timed without tracing, which slows the streamed downloads; memory from a traced run
+                seconds, requests, connections, _ = _run(approach, artifacts, work, server)
+                peak = _run(approach, artifacts, work, server, traced=True)[3]
+                print(f"{name:<12}{len(artifacts):>6}{megabytes:>6.1f}  {label:<11}{seconds:>7.2f}{requests:>10}"
+                      f"{connections:>13}{peak:>9.1f}")
+                shutil.rmtree(work)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Compare peak memory of reading part of a large JSON artifact: whole vs streamed.
+
+Builds three large artifacts modelled on this repo's example outputs:
+
+  docling       docling_text.json (extract-pdf) with many pages of words, lines and characters
+  aerodeck      aerodeck metrics with a large coefficient table ahead of range_mission
+  requirements  extracted SysML requirements, many packages of them
+
+and reads the part a caller needs from each, in a fresh process per read:
+
+  loads    json.loads(read_text(artifact)), then pick out the part
+  stream   istari_json_stream: iter_json / load_json on the same artifact
+
+Each read is run cold (downloaded from a local HTTP server through a
+presigned-style URL, as the SDK does) and warm (from the artifact store).
+Reports peak resident memory and seconds; a process that only imports the
+modules gives the floor.
+
+Usage:
+    python benchmarks/benchmark_json_stream.py
+    python benchmarks/benchmark_json_stream.py --mb 300 --only docling
+"""
+import argparse
+import functools
+import hashlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from istari_artifact_store import get_store, read_text
+from istari_json_stream import iter_json, load_json
+
+EXAMPLES = REPO_ROOT / "use-cases"
+SALT = "benchmark"
+PACKAGE = "'Complex Drone System'::Requirements::Package0007::*"
+
+# case -> (paths selected, what the caller wants from the document)
+CASES = {
+    "docling": (["pages.*.lines.*.text"],
+                lambda doc: [line["text"] for page in doc["pages"] for line in page["lines"]]),
+    "aerodeck": (["range_mission", "mass_properties.empty_weight_lbm"],
+                 lambda doc: {"range_mission": doc["range_mission"],
+                              "mass_properties": {"empty_weight_lbm": doc["mass_properties"]["empty_weight_lbm"]}}),
+    "requirements": ([PACKAGE],
+                     lambda doc: [v for k, v in doc.items() if k.startswith(PACKAGE[:-1])]),
+}
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def _docling(path, size, rnd):
+    template = json.loads((EXAMPLES / "extract-pdf/example-output/docling_text.json").read_text())
+    page = template["pages"][0]
+    per_page = len(json.dumps(page))
+    pages = max(1, size // per_page)
+    with open(path, "w") as f:
+        f.write(json.dumps({"document_info": {"total_pages": pages, "extraction_method": "docling-parse"}})[:-1])
+        f.write(', "pages": [')
+        for n in range(pages):
+            f.write(", " if n else "")
+            f.write(json.dumps(dict(page, page_number=n + 1)))
+        f.write("]}")
+
+
+def _aerodeck(path, size, rnd):
+    metrics = json.loads((EXAMPLES / "check-design-meets-requirements/example-output/"
+                          "grp3-uas_v6_aerodeck_metrics.json").read_text())
+    columns = ["alpha_deg", "beta_deg", "mach", "CL", "CD", "Cm", "Cl", "Cn"]
+    row = lambda: {k: round(rnd.uniform(-1, 1), 6) for k in columns}
+    rows = max(1, size // (len(json.dumps(row())) + 2))
+    table = [row() for _ in range(rows)]
+    padded = {"metadata": metrics["metadata"], "coefficient_table": table}
+    padded.update(metrics)
+    Path(path).write_text(json.dumps(padded))
+
+
+def _requirements(path, size, rnd):
+    template = json.loads((EXAMPLES / "check-design-meets-requirements/example-output/"
+                           "output_requirements.json").read_text())
+    sample = [v for v in template.values() if "attributes" in v]
+    per = sum(len(json.dumps(req, indent=1)) + 2 * len(req["qualified_name"]) for req in sample) / len(sample)
+    count = max(1, int(size // per))
+    reqs = {}
+    for n in range(count):
+        req = sample[n % len(sample)]
+        package = f"'Complex Drone System'::Requirements::Package{n % 40:04d}"
+        name = f"{req['name']}{n}"
+        reqs[f"{package}::{name}"] = dict(req, name=name, qualified_name=f"{package}::{name}", parent=package)
+    Path(path).write_text(json.dumps(reqs, indent=1))
+
+
+def _peak_rss_mb():
+    """This process's peak resident memory. On Linux ru_maxrss carries over from
+    the parent across exec, so the kernel's high-water mark is read instead."""
+    try:
+        status = Path("/proc/self/status").read_text()
+        return int(next(line.split()[1] for line in status.splitlines() if line.startswith("VmHWM"))) / 1024
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _child(case, mode, work, url):
+    """One read in this process; prints its measurements as JSON."""
+    paths, pick = CASES[case]
+    blob = work / f"{case}.json"
+    meta = json.loads((work / f"{case}.meta.json").read_text())
+    token = SimpleNamespace(sha=meta["sha"], salt=SALT)
+    client = SimpleNamespace(generate_download_url=lambda sha: SimpleNamespace(url=f"{url}/{blob.name}"))
+    artifact = SimpleNamespace(id=case, name=blob.name, content_token=token, _client=client)
+    start = perf_counter()
+    if mode == "import":
+        result = None
+    elif mode == "loads":
+        result = pick(json.loads(read_text(artifact)))
+    elif len(paths) == 1 and "*" in paths[0]:  # a list of parts: take them one at a time
+        result = [value for _, value in iter_json(artifact, *paths)]
+    else:
+        result = load_json(artifact, *paths)
+    seconds = perf_counter() - start
+    digest = hashlib.md5(json.dumps(result, sort_keys=True).encode()).hexdigest()
+    print(json.dumps({"seconds": seconds, "rss_mb": _peak_rss_mb(),
+                      "digest": digest, "hits": get_store().hits}))
+
+
+def _measure(case, mode, work, url, store):
+    env = dict(os.environ, ISTARI_ARTIFACT_STORE=str(store))
+    out = subprocess.run([sys.executable, __file__, "--child", case, mode, str(work), url],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3], Path(sys.argv[4]), sys.argv[5])
+        return
+    parser = argparse.ArgumentParser(description="Benchmark streamed vs whole reads of large JSON artifacts")
+    parser.add_argument("--mb", type=float, default=100, help="Size of each artifact in MB (default: 100)")
+    parser.add_argument("--only", action="append", default=None, choices=list(CASES), help="Run only this case")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="json-stream-bench-") as tmp:
+        work = Path(tmp)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=str(work)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        print(f"{'case':<14}{'size MB':>8}  {'read':<7}{'cold MB':>9}{'cold s':>8}{'warm MB':>9}{'warm s':>8}")
+        for case, build in (("docling", _docling), ("aerodeck", _aerodeck), ("requirements", _requirements)):
+            if args.only and case not in args.only:
+                continue
+            blob = work / f"{case}.json"
+            build(blob, int(args.mb * 1024 * 1024), random.Random(0))
+            digest = hashlib.sha384()
+            with open(blob, "rb") as f:
+                while chunk := f.read(1024 * 1024):
+                    digest.update(chunk)
+            digest.update(SALT.encode())
+            (work / f"{case}.meta.json").write_text(json.dumps({"sha": digest.hexdigest()}))
+            size = blob.stat().st_size / 1024 / 1024
+
+            results = {}
+            for mode in ("import", "loads", "stream"):
+                store = work / f"store-{case}-{mode}"
+                cold = _measure(case, mode, work, url, store)
+                warm = _measure(case, mode, work, url, store)
+                assert warm["hits"] or mode == "import", f"{case} {mode}: warm read missed the store"
+                results[mode] = (cold, warm)
+                print(f"{case:<14}{size:>8.0f}  {mode:<7}{cold['rss_mb']:>9.0f}{cold['seconds']:>8.2f}"
+                      f"{warm['rss_mb']:>9.0f}{warm['seconds']:>8.2f}")
+            if results["loads"][1]["digest"] != results["stream"][1]["digest"]:
+                raise SystemExit(f"{case}: streamed result differs from json.loads")
+            blob.unlink()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
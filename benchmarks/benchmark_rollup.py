@@ -0,0 +1,162 @@
+"""Compare mass/power/cost roll-ups over a large synthetic SysML architecture.
+
+Generates parts in the extractor's output_parts.json form: one system,
+subsystems, assemblies and so on down to components, with mass,
+powerConsumption and cost attributes. Component names repeat across
+assemblies (bracket3, harness1, ...), as they do in real models. Compared:
+
+  flat     sum every part's value, as check_architecture_mass did: model totals only
+  prefix   a dict of totals per qualified-name prefix: every subtotal, rebuilt on each change
+  tree     istari_rollup.RollupTree: built once, then updated along each changed part's ancestors
+
+Reports build time and memory, the cost of one part change, and checks that
+the tree's subtotals match the prefix sums after the changes.
+
+Usage:
+    python benchmarks/benchmark_rollup.py
+    python benchmarks/benchmark_rollup.py --parts 1000000 --changes 10000
+"""
+import argparse
+import gc
+import math
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from istari_rollup import ROLLUPS, RollupTree, split_name
+
+SYSTEM = "'Complex Drone System'::Drone"
+FANOUT = [12, 8, 6, 5, 4]  # children per level below the system
+KINDS = ["bracket", "harness", "fastener", "panel", "sensor", "motor", "controller", "cable", "spar", "rib"]
+
+
+def _attribute(name, value):
+    return {"name": name, "value": f"{value:.3f}", "code": f"attribute {name} : Real = {value:.3f};", "type": "real"}
+
+
+def _part(name, rnd):
+    attributes = {"mass": _attribute("mass", rnd.uniform(0.01, 5))}
+    if rnd.random() < 0.3:
+        attributes["powerConsumption"] = _attribute("powerConsumption", rnd.uniform(0.1, 40))
+    attributes["cost"] = _attribute("cost", rnd.uniform(1, 500))
+    return {"declared_name": name.strip("'"), "attributes": attributes}
+
+
+def make_parts(count, seed=0):
+    """About `count` parts in a tree under SYSTEM, in extractor order (parents first)."""
+    rnd = random.Random(seed)
+    parts = {SYSTEM: {"declared_name": "Drone", "attributes": {}}}
+    level = [SYSTEM]
+    for depth, fanout in enumerate(FANOUT + [None] * 8):
+        next_level = []
+        for parent in level:
+            for i in range(fanout or rnd.randint(2, 12)):
+                kind = KINDS[i % len(KINDS)] if depth >= 2 else f"'Subsystem {i}'" if depth == 0 else f"assembly{i}"
+                name = f"{parent}::{kind}{i // len(KINDS) if depth >= 2 else ''}"
+                parts[name] = _part(split_name(name)[-1], rnd)
+                next_level.append(name)
+                if len(parts) >= count:
+                    return parts
+        level = next_level
+    return parts
+
+
+def prefix_totals(parts, rollups=ROLLUPS):
+    """{qualified name prefix: [totals]}, summed part by part over every ancestor."""
+    attributes = list(rollups.values())
+    totals = {}
+    for name, part in parts.items():
+        found = part.get("attributes", {})
+        values = [float(found.get(a, {}).get("value") or 0) for a in attributes]
+        segments = split_name(name)
+        for k in range(1, len(segments) + 1):
+            sums = totals.setdefault("::".join(segments[:k]), [0.0] * len(values))
+            for j, v in enumerate(values):
+                sums[j] += v
+    return totals
+
+
+def flat_totals(parts, rollups=ROLLUPS):
+    attributes = list(rollups.values())
+    sums = [0.0] * len(attributes)
+    for part in parts.values():
+        found = part.get("attributes", {})
+        for j, a in enumerate(attributes):
+            sums[j] += float(found.get(a, {}).get("value") or 0)
+    return sums
+
+
+def _measure(build):
+    """(result, seconds, MB allocated and still held by the result)."""
+    gc.collect()
+    tracemalloc.start()
+    start = perf_counter()
+    result = build()
+    seconds = perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, seconds, held / 1024 / 1024
+
+
+def _timed(build):
+    start = perf_counter()
+    result = build()
+    return result, perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hierarchical roll-ups over a large parts tree")
+    parser.add_argument("--parts", type=int, default=150000, help="Parts in the model (default: 150000)")
+    parser.add_argument("--changes", type=int, default=2000, help="Single-part changes to apply (default: 2000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    parts = make_parts(args.parts, args.seed)
+    depth = max(len(split_name(name)) for name in parts)
+    print(f"Model: {len(parts):,} parts, {depth} levels deep\n")
+
+    # Build times without tracing; memory from a separate traced build
+    _, flat_s = _timed(lambda: flat_totals(parts))
+    prefix, prefix_s = _timed(lambda: prefix_totals(parts))
+    tree, tree_s = _timed(lambda: RollupTree(parts))
+    _, _, prefix_mb = _measure(lambda: prefix_totals(parts))
+    _, _, tree_mb = _measure(lambda: RollupTree(parts))
+
+    rnd = random.Random(args.seed + 1)
+    names = list(parts)
+    changed = []
+    for _ in range(args.changes):
+        name = rnd.choice(names)
+        part = dict(parts[name], attributes=dict(parts[name]["attributes"],
+                                                 mass=_attribute("mass", rnd.uniform(0.01, 5))))
+        parts[name] = part
+        changed.append((name, part))
+    start = perf_counter()
+    for name, part in changed:
+        tree.update({name: part})
+    update_s = (perf_counter() - start) / len(changed)
+
+    expected, _ = _timed(lambda: prefix_totals(parts))
+    mismatches = sum(1 for name, sums in expected.items()
+                     if not all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+                                for a, b in zip(tree.total(name).values(), sums)))
+    start = perf_counter()
+    rows = list(tree.rows(depth=4))
+    rows_s = perf_counter() - start
+
+    print(f"{'approach':<9}{'build s':>9}{'held MB':>9}{'per change ms':>15}  subtotals")
+    print(f"{'flat':<9}{flat_s:>9.3f}{'-':>9}{flat_s * 1000:>15.2f}  model only")
+    print(f"{'prefix':<9}{prefix_s:>9.3f}{prefix_mb:>9.1f}{prefix_s * 1000:>15.2f}  {len(prefix):,} nodes")
+    print(f"{'tree':<9}{tree_s:>9.3f}{tree_mb:>9.1f}{update_s * 1000:>15.4f}  {len(tree):,} nodes")
+    print(f"\nTree vs prefix after {len(changed):,} changes: {mismatches} mismatched subtotals")
+    print(f"Subtotals down to 4 levels: {len(rows):,} rows in {rows_s * 1000:.1f} ms")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
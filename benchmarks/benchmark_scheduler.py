@@ -0,0 +1,107 @@
+"""Compare ways of placing a batch of jobs on agents, against the local stand-in.
+
+Three "RHEL 8" agents, one of them 2.5x slower than the others. Another
+team has already queued jobs on the first agent. Two users then submit
+nTop runs at the same moment: a large sweep (alice) and a few one-off runs
+(bob). Placements compared:
+
+  pinned        every job on one agent, as with a single --agent-id
+  platform      assigned_agent_id=None; the first agent to come free takes the job
+  round-robin   jobs dealt across the agents in turn
+  scheduler     istari_scheduler.AgentScheduler, one job per agent at a time
+
+Reports when the last job finished, and each user's mean and last finish
+time, all measured from the moment the batch was submitted.
+
+Usage:
+    python benchmarks/benchmark_scheduler.py
+    python benchmarks/benchmark_scheduler.py --jobs 40 --job-seconds 0.5 --background 8
+"""
+import argparse
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import cycle
+from pathlib import Path
+from statistics import mean
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from istari_jobs import JobWatcher
+from istari_local import DEMO_NTOP_MODEL_ID, LocalIstari
+from istari_scheduler import AgentScheduler, JobSpec, discover_agents
+
+SPEEDS = [1.0, 1.0, 2.5]  # run time of each agent's jobs, in job_seconds
+SPEC = JobSpec(DEMO_NTOP_MODEL_ID, "@ntop:run_model", None, "ntopcl", "5.30", "RHEL 8")
+STRATEGIES = ["pinned", "platform", "round-robin", "scheduler"]
+
+
+def _finished_at(job):
+    return max(status.created for status in job.status_history)
+
+
+def _run(strategy, jobs, small, job_seconds, background, seed):
+    """One batch; returns {user: [seconds to finish]} and {agent name: job count}."""
+    client = LocalIstari(job_seconds=job_seconds, agents=SPEEDS, systems=0, seed=seed)
+    agents = discover_agents(client, "RHEL 8")
+    names = {a.id: a.name for a in agents}
+    busy = agents[0]
+    for _ in range(background):  # the other team's jobs
+        client.add_job(DEMO_NTOP_MODEL_ID, "@ntop:run_model", operating_system="RHEL 8",
+                       assigned_agent_id=busy.id)
+    agents = discover_agents(client, "RHEL 8")  # now showing the first agent busy
+
+    batch = [("alice", i) for i in range(jobs)] + [("bob", i) for i in range(small)]
+    watcher = JobWatcher(client, min_interval=0.01, max_interval=0.05)
+    started = datetime.now(timezone.utc)
+    finished = []  # (user, job)
+    if strategy == "scheduler":
+        scheduler = AgentScheduler(client, agents, limit=1, watcher=watcher, refresh=0)
+        for user, i in batch:
+            scheduler.submit(SPEC._replace(description=f"{user}-{i}"), user=user)
+        finished = [(done.user, done.job) for done in scheduler.run()]
+    else:
+        placement = {
+            "pinned": cycle([busy.id]),
+            "platform": cycle([None]),
+            "round-robin": cycle([a.id for a in agents]),
+        }[strategy]
+        owners = {}
+        for (user, i), agent_id in zip(batch, placement):
+            job = client.add_job(SPEC.model_id, SPEC.function, tool_name=SPEC.tool_name,
+                                 tool_version=SPEC.tool_version, operating_system=SPEC.operating_system,
+                                 assigned_agent_id=agent_id)
+            owners[job.id] = user
+            watcher.watch(job.id, function=SPEC.function)
+        finished = [(owners[job_id], job) for job_id, job in watcher.wait(list(owners)).items()]
+
+    times, placed = {}, Counter()
+    for user, job in finished:
+        times.setdefault(user, []).append((_finished_at(job) - started).total_seconds())
+        placed[names[job.agent_id]] += 1
+    return times, placed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job placement on the local stand-in's agents")
+    parser.add_argument("--jobs", type=int, default=24, help="Jobs in the large sweep (default: 24)")
+    parser.add_argument("--small", type=int, default=4, help="Jobs the second user submits (default: 4)")
+    parser.add_argument("--job-seconds", type=float, default=0.4, help="Run time on a normal agent (default: 0.4)")
+    parser.add_argument("--background", type=int, default=6,
+                        help="Other team's jobs already queued on the first agent (default: 6)")
+    args = parser.parse_args()
+
+    print(f"Agents: {', '.join(f'{s:g}x' for s in SPEEDS)} x {args.job_seconds:g} s per job; "
+          f"{args.background} other jobs queued on the first")
+    print(f"Batch: alice {args.jobs} jobs, bob {args.small} jobs\n")
+    print(f"{'placement':<13}{'all done s':>11}{'alice mean':>12}{'bob mean':>10}{'bob last':>10}  jobs per agent")
+    for n, strategy in enumerate(STRATEGIES):
+        times, placed = _run(strategy, args.jobs, args.small, args.job_seconds, args.background, seed=n)
+        every = times["alice"] + times["bob"]
+        per_agent = ", ".join(f"{name} {count}" for name, count in sorted(placed.items()))
+        print(f"{strategy:<13}{max(every):>11.1f}{mean(times['alice']):>12.1f}{mean(times['bob']):>10.1f}"
+              f"{max(times['bob']):>10.1f}  {per_agent}")
+
+
+if __name__ == "__main__":
+    main()
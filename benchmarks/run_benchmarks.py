@@ -0,0 +1,178 @@
+"""End-to-end benchmark suite against the local Istari stand-in (istari_local.py).
+
+Runs the example scripts as they would be run by hand, each in its own
+process pointed at a local:// registry with a fixed per-request latency.
+For each one it records the requests made, the wall time (total, and from
+get_client() on) and the peak memory.
+Results can be saved as a JSON baseline and compared with a later run.
+Request counts do not depend on the machine, so any increase is a
+regression. Time and memory are compared with a tolerance.
+
+Each scenario starts cold: its own artifact store, job index and upload
+journal in a temp directory.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --only run_ntop_model --latency-ms 50
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from istari_local import (
+    DEMO_NTOP_MODEL_ID, DEMO_SYSML_MODEL_ID, DEMO_SYSTEM_ID, LocalIstari,
+)
+
+# Metrics compared against a baseline: name -> (relative tolerance, absolute slack).
+# A tolerance of None flags any increase.
+COMPARED = {
+    "requests": (None, 0),
+    "wall_seconds": (0.25, 0.5),
+    "client_seconds": (0.25, 0.1),
+    "peak_rss_mb": (0.25, 5.0),
+}
+
+
+def scenarios(tmp, filler_system_id):
+    """(name, script, arguments) for every benchmarked flow."""
+    upload = tmp / "wing_v2.ntop"
+    upload.write_bytes(os.urandom(1024 * 1024))
+    return [
+        ("01_list_systems", "getting-started/01_explore_systems.py", []),
+        ("01_explore_system", "getting-started/01_explore_systems.py",
+         ["--system-id", filler_system_id]),
+        ("01_crawl_system", "getting-started/01_explore_systems.py",
+         ["--system-id", filler_system_id, "--workers", "8"]),
+        ("02_version_model", "getting-started/02_version_model.py",
+         ["--model-id", DEMO_NTOP_MODEL_ID, "--file", str(upload), "--name", "v2"]),
+        ("03_share_resources", "getting-started/03_share_resources.py",
+         ["--system-id", filler_system_id, "--email", "a@example.com", "--email", "b@example.com",
+          "--rate", "1000", "--checkpoint", str(tmp / "share.jsonl")]),
+        ("run_ntop_model", "ntop/run_ntop_model.py", ["--model-id", DEMO_NTOP_MODEL_ID]),
+        ("update_and_extract_sysml", "sysgit/update_and_extract_sysml.py",
+         ["--model-id", DEMO_SYSML_MODEL_ID, "--find", "275.0", "--replace", "325.0"]),
+        ("check_design", "use-cases/check-design-meets-requirements/check_design.py", []),
+    ]
+
+
+def run_scenario(name, script, arguments, registry, tmp, verbose=False):
+    """Run one script in a fresh process; return its measurements."""
+    work = tmp / name
+    work.mkdir()
+    stats_path = work / "stats.json"
+    env = dict(
+        os.environ,
+        ISTARI_DIGITAL_REGISTRY_URL=f"{registry}&stats={stats_path}",
+        ISTARI_ARTIFACT_STORE=str(work / "artifacts"),
+        ISTARI_JOB_INDEX=str(work / "jobs.sqlite"),
+        ISTARI_UPLOAD_JOURNAL=str(work / "uploads"),
+        ISTARI_LINEAGE_INDEX=str(work / "lineage.sqlite"),
+        PYTHONDONTWRITEBYTECODE="1",
+    )
+    env.pop("ISTARI_CACHE_PATH", None)
+    start = perf_counter()
+    proc = subprocess.run(
+        [sys.executable, str(REPO_ROOT / script), *arguments],
+        cwd=work, env=env, capture_output=True, text=True,
+    )
+    wall = perf_counter() - start
+    if verbose or proc.returncode:
+        print(proc.stdout[-4000:], proc.stderr[-4000:], sep="\n")
+    stats = json.loads(stats_path.read_text()) if stats_path.exists() else {}
+    return {
+        "script": script,
+        "exit_code": proc.returncode,
+        "requests": stats.get("requests"),
+        "by_method": stats.get("by_method", {}),
+        "wall_seconds": round(wall, 3),
+        # From get_client() to exit, i.e. without interpreter start-up and SDK import
+        "client_seconds": stats.get("seconds"),
+        "peak_rss_mb": stats.get("peak_rss_mb"),
+    }
+
+
+def compare(current, baseline):
+    """Regression messages for scenarios present in both runs."""
+    problems = []
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        for metric, (tolerance, slack) in COMPARED.items():
+            new, old = result.get(metric), before.get(metric)
+            if new is None or old is None:
+                continue
+            limit = old if tolerance is None else max(old * (1 + tolerance), old + slack)
+            if new > limit:
+                problems.append(f"{name}: {metric} {old} → {new}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the example scripts against the local stand-in")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Per-request latency (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="Dataset seed (default: 0)")
+    parser.add_argument("--systems", type=int, default=20, help="Filler systems (default: 20)")
+    parser.add_argument("--job-seconds", type=float, default=3.0, help="Simulated job duration (default: 3)")
+    parser.add_argument("--only", action="append", default=None, help="Run only this scenario (repeatable)")
+    parser.add_argument("--save", default=None, help="Write results to this JSON baseline")
+    parser.add_argument("--compare", default=None, help="Compare with a saved baseline; exit 1 on regressions")
+    parser.add_argument("--verbose", action="store_true", help="Print each script's output")
+    args = parser.parse_args()
+
+    registry = (f"local://?latency_ms={args.latency_ms:g}&seed={args.seed}"
+                f"&systems={args.systems}&job_seconds={args.job_seconds:g}")
+    # Same seed, same dataset: pick a filler system the scripts can walk
+    dataset = LocalIstari(seed=args.seed, systems=args.systems)
+    filler_system_id = next(s.id for s in dataset.list_systems().items if s.id != DEMO_SYSTEM_ID)
+
+    results = {
+        "meta": {
+            "registry": registry,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "scenarios": {},
+    }
+    print(f"Registry: {registry}\n")
+    print(f"{'Scenario':<28}{'Requests':>10}{'Wall (s)':>10}{'Client (s)':>12}{'Peak MB':>10}")
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for name, script, arguments in scenarios(tmp, filler_system_id):
+            if args.only and name not in args.only:
+                continue
+            result = run_scenario(name, script, arguments, registry, tmp, args.verbose)
+            results["scenarios"][name] = result
+            status = "" if result["exit_code"] == 0 else f"  (exit {result['exit_code']})"
+            failed = failed or bool(result["exit_code"])
+            print(f"{name:<28}{result['requests'] or 0:>10}{result['wall_seconds']:>10.2f}"
+                  f"{result['client_seconds'] or 0:>12.2f}{result['peak_rss_mb'] or 0:>10.1f}{status}")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nSaved {args.save}")
+    if args.compare:
+        problems = compare(results, json.loads(Path(args.compare).read_text()))
+        print(f"\nCompared with {args.compare}: {len(problems)} regression(s)")
+        for problem in problems:
+            print(f"  {problem}")
+        failed = failed or bool(problems)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,28 +3,33 @@
 Usage:
     python getting-started/01_explore_systems.py
     python getting-started/01_explore_systems.py --system-id <SYSTEM_ID>
+    python getting-started/01_explore_systems.py --system-id <SYSTEM_ID> --workers 8
 """
 import argparse
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from time import perf_counter
 
 # Allow imports from repo root
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from istari_client import get_client
+from istari_pagination import iter_items, paginate
 
 
 def list_systems(client, show_all=False):
     """List all systems the current user can access."""
     archive_status = "all" if show_all else "active"
-    page = client.list_systems(page=1, size=20, archive_status=archive_status)
-    print(f"Systems ({page.total} total):\n")
-    for system in page.items:
+    systems = paginate(client.list_systems, archive_status=archive_status)
+    print(f"Systems ({systems.total} total):\n")
+    for system in systems:
         print(f"  {system.name}")
         print(f"    ID: {system.id}")
         if system.description:
             print(f"    Description: {system.description}")
         print()
-    return page.items
+    return systems.items
 
 
 def explore_system(client, system_id):
@@ -35,28 +40,89 @@ def explore_system(client, system_id):
     print(f"  Description: {system.description or '—'}\n")
 
     # List configurations
-    configs = client.list_system_configurations(system_id, page=1, size=50)
+    configs = paginate(client.list_system_configurations, system_id)
     print(f"Configurations ({configs.total}):\n")
-    for config in configs.items:
+    for config in configs:
         print(f"  {config.name}")
         print(f"    Config ID: {config.id}")
 
         # List snapshots for this configuration
-        snapshots = client.list_snapshots(configuration_id=config.id, page=1, size=10)
-        for snap in snapshots.items:
+        for snap in iter_items(client.list_snapshots, configuration_id=config.id):
             # Show tags if any
-            tags = client.list_tags(snapshot_id=snap.id, page=1, size=10)
-            tag_names = [t.tag for t in tags.items]
+            tag_names = [t.tag for t in iter_items(client.list_tags, snapshot_id=snap.id)]
             tag_str = f" [{', '.join(tag_names)}]" if tag_names else ""
             print(f"    Snapshot: {snap.id[:8]}...{tag_str}")
 
             # List files in this snapshot
-            revs = client.list_snapshot_revisions(snap.id, page=1, size=50)
-            for rev in revs.items:
+            for rev in iter_items(client.list_snapshot_revisions, snap.id):
                 print(f"      - {rev.name} ({rev.size:,} bytes)")
         print()
 
 
+def crawl_system(client, system_id, max_workers=8):
+    """Drill into a system like explore_system, fetching branches concurrently.
+
+    Snapshot, tag and revision listings for sibling configurations and
+    snapshots are requested in parallel on a bounded thread pool. Output is
+    printed in the same order as explore_system, as soon as each branch is
+    ready, so printing never waits for the whole tree.
+    """
+    start = perf_counter()
+    requests = 0
+    lock = threading.Lock()
+
+    def counted(method):
+        def call(*args, **kwargs):
+            nonlocal requests
+            with lock:
+                requests += 1
+            return method(*args, **kwargs)
+        return call
+
+    def fetch_all(method, *args, **kwargs):
+        # Sibling branches already run in parallel, so pages are fetched in turn
+        return list(iter_items(counted(method), *args, prefetch=False, **kwargs))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+
+        def fetch_branch(config):
+            # Queue tags + revisions for every snapshot without waiting on them
+            snapshots = fetch_all(client.list_snapshots, configuration_id=config.id)
+            return [
+                (
+                    snap,
+                    pool.submit(fetch_all, client.list_tags, snapshot_id=snap.id),
+                    pool.submit(fetch_all, client.list_snapshot_revisions, snap.id),
+                )
+                for snap in snapshots
+            ]
+
+        system_future = pool.submit(counted(client.get_system), system_id)
+        configs = paginate(counted(client.list_system_configurations), system_id)
+        branches = [(config, pool.submit(fetch_branch, config)) for config in configs]
+
+        system = system_future.result()
+        print(f"System: {system.name}")
+        print(f"  ID: {system.id}")
+        print(f"  Description: {system.description or '—'}\n")
+        print(f"Configurations ({configs.total}):\n")
+
+        for config, branch in branches:
+            print(f"  {config.name}")
+            print(f"    Config ID: {config.id}")
+            for snap, tags_future, revs_future in branch.result():
+                tag_names = [t.tag for t in tags_future.result()]
+                tag_str = f" [{', '.join(tag_names)}]" if tag_names else ""
+                print(f"    Snapshot: {snap.id[:8]}...{tag_str}")
+                for rev in revs_future.result():
+                    print(f"      - {rev.name} ({rev.size:,} bytes)")
+            print(flush=True)
+
+    elapsed = perf_counter() - start
+    print(f"Crawled {requests} requests in {elapsed:.2f}s ({max_workers} workers)")
+    return {"requests": requests, "seconds": elapsed}
+
+
 def main():
     parser = argparse.ArgumentParser(description="Explore Istari systems")
     parser.add_argument(
@@ -70,13 +136,21 @@ def main():
         action="store_true",
         help="Include archived systems",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Fetch snapshots, tags and files with N concurrent requests (default: 1, serial)",
+    )
     args = parser.parse_args()
 
     client = get_client()
     user = client.get_current_user()
     print(f"Connected as: {user.display_name} ({user.email})\n")
 
-    if args.system_id:
+    if args.system_id and args.workers > 1:
+        crawl_system(client, args.system_id, max_workers=args.workers)
+    elif args.system_id:
         explore_system(client, args.system_id)
     else:
         list_systems(client, show_all=args.all)
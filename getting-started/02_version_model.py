@@ -5,6 +5,9 @@ This demonstrates the Istari versioning workflow:
   2. Re-upload it as a new revision of the original model
   3. Verify both revisions exist
 
+Large files are uploaded in parallel parts (istari_upload.py); if the upload
+is interrupted, running the same command again resumes it.
+
 Usage:
     python getting-started/02_version_model.py --model-id <MODEL_ID> --file <PATH>
     python getting-started/02_version_model.py --model-id <MODEL_ID> --file output.ntop --name "v2 — High Endurance"
@@ -15,6 +18,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from istari_client import get_client
+from istari_upload import UploadManager
 
 
 def main():
@@ -63,13 +67,18 @@ def main():
 
     # Upload new revision
     print(f"\nUploading new revision from: {file_path.name}")
-    updated = client.update_model(
+    uploads = UploadManager(client)
+    updated = uploads.update_model(
         model_id=args.model_id,
         path=file_path,
         version_name=args.name,
         description=args.description,
     )
 
+    if uploads.last_stats:
+        print(f"  {uploads.last_stats.bytes / 1e6:,.1f} MB in {uploads.last_stats.parts} parts, "
+              f"{uploads.last_stats.seconds:.1f}s")
+
     # Show updated state
     refreshed = client.get_model(args.model_id)
     print(f"\nModel now has {len(refreshed.file.revisions)} revisions:")
@@ -1,35 +1,188 @@
-"""Share an Istari system and its files with a teammate by email.
+"""Share Istari systems and their files with teammates by email.
 
 Note: Systems and files must be shared separately in Istari.
 
+Grants run on a bounded worker pool with a shared rate limit, retry
+transient errors with jittered backoff, and skip grants that already exist.
+Completed grants are appended to a checkpoint file, so an interrupted run
+picks up where it left off when re-run with the same arguments.
+
 Usage:
     python getting-started/03_share_resources.py --system-id <ID> --email user@example.com
     python getting-started/03_share_resources.py --system-id <ID> --email user@example.com --role viewer
+    python getting-started/03_share_resources.py --system-id <ID1> --system-id <ID2> \\
+        --email a@example.com --email b@example.com --workers 16 --rate 20
 """
 import argparse
+import json
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from time import perf_counter
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from istari_client import get_client
-from istari_digital_client import AccessSubjectType, AccessRelation
+from istari_pagination import iter_items
+from istari_throttle import TokenBucket, retry_call, status_of
+from istari_digital_client import AccessResourceType, AccessSubjectType, AccessRelation
+
+# An existing grant at this level or above makes a new one redundant
+RELATION_RANK = {"viewer": 0, "editor": 1, "owner": 2, "administrator": 2}
+
+
+def collect_file_ids(client, system_id, workers=8):
+    """Collect every file ID tracked by a system or attached to its models."""
+    file_ids = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        models = pool.submit(list, iter_items(client.list_models, system_id=system_id))
+        tracked = [
+            pool.submit(list, iter_items(client.list_tracked_files, config.id))
+            for config in iter_items(client.list_system_configurations, system_id)
+        ]
+        for future in tracked:
+            file_ids.update(tf.file_id for tf in future.result())
+
+        # Also collect files from model artifacts
+        for model in models.result():
+            if model.file:
+                file_ids.add(model.file.id)
+            for artifact in model.artifacts:
+                if artifact.file:
+                    file_ids.add(artifact.file.id)
+    return file_ids
+
+
+class Checkpoint:
+    """Append-only record of completed grants, one JSON object per line."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done = set()
+        self._lock = threading.Lock()
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self.done.add((entry["resource_id"], entry["email"], entry["relation"]))
+        self._file = open(self.path, "a")
+
+    def record(self, resource_id, email, relation):
+        with self._lock:
+            self.done.add((resource_id, email, relation))
+            self._file.write(json.dumps(
+                {"resource_id": resource_id, "email": email, "relation": relation}
+            ) + "\n")
+            self._file.flush()
+
+    def close(self, remove=False):
+        self._file.close()
+        if remove:
+            self.path.unlink(missing_ok=True)
+
+
+def share_all(client, resources, emails, relation, checkpoint, workers=8, rate=10.0):
+    """Grant `relation` on every (resource_type, resource_id) to every email.
+
+    Returns a summary dict with counts, API calls and throughput.
+    """
+    bucket = TokenBucket(rate)
+    lock = threading.Lock()
+    counts = {"granted": 0, "skipped": 0, "failed": 0, "api_calls": 0}
+    existing = {}  # resource_id -> Future[set of emails with access]
+    wanted = RELATION_RANK.get(relation.value, 0)
+
+    def call(fn, *args, **kwargs):
+        def attempt(*args, **kwargs):
+            bucket.acquire()  # retries of a 429/5xx wait for a token too
+            with lock:
+                counts["api_calls"] += 1
+            return fn(*args, **kwargs)
+        return retry_call(attempt, *args, **kwargs)
+
+    def lookup_existing(resource_type, resource_id):
+        # One list_access per resource, shared by every recipient
+        try:
+            relationships = call(client.list_access, resource_type, resource_id)
+        except Exception:
+            return set()
+        return {
+            rel.subject_info.email.lower()
+            for rel in relationships
+            if rel.subject_info and rel.subject_info.email
+            and RELATION_RANK.get(getattr(rel.relation, "value", rel.relation), -1) >= wanted
+        }
+
+    def grant(resource_type, resource_id, email):
+        key = (resource_id, email, relation.value)
+        if key in checkpoint.done:
+            return "skipped"
+        with lock:
+            if resource_id not in existing:
+                existing[resource_id] = lookup_pool.submit(
+                    lookup_existing, resource_type, resource_id
+                )
+        if email.lower() in existing[resource_id].result():
+            checkpoint.record(*key)
+            return "skipped"
+        try:
+            call(
+                client.create_access_by_email,
+                resource_id=resource_id,
+                subject_type=AccessSubjectType.USER,
+                subject_email=email,
+                relation=relation,
+            )
+        except Exception as e:
+            if status_of(e) == 409:  # already shared
+                checkpoint.record(*key)
+                return "skipped"
+            print(f"  Warning: could not share {resource_type.value} {resource_id} with {email}: {e}")
+            return "failed"
+        checkpoint.record(*key)
+        return "granted"
+
+    start = perf_counter()
+    lookup_pool = ThreadPoolExecutor(max_workers=workers)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [
+            pool.submit(grant, resource_type, resource_id, email)
+            for resource_type, resource_id in resources
+            for email in emails
+        ]
+        for i, future in enumerate(futures, 1):
+            counts[future.result()] += 1
+            if i % 100 == 0:
+                print(f"  {i}/{len(futures)} grants processed")
+    finally:
+        # On Ctrl-C, drop queued grants instead of draining them
+        pool.shutdown(cancel_futures=True)
+        lookup_pool.shutdown(cancel_futures=True)
+
+    elapsed = perf_counter() - start
+    counts["seconds"] = round(elapsed, 2)
+    counts["grants_per_second"] = round(len(futures) / elapsed, 1) if elapsed else 0.0
+    return counts
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Share a system and its files with a user"
+        description="Share systems and their files with users"
     )
     parser.add_argument(
         "--system-id",
         type=str,
+        action="append",
         required=True,
-        help="System ID to share",
+        help="System ID to share (repeat for several systems)",
     )
     parser.add_argument(
         "--email",
         type=str,
+        action="append",
         required=True,
-        help="Email of the user to share with",
+        help="Email of the user to share with (repeat for several users)",
     )
     parser.add_argument(
         "--role",
@@ -38,6 +191,24 @@ def main():
         choices=["viewer", "editor"],
         help="Access level (default: editor)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Maximum concurrent requests (default: 8)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=10.0,
+        help="Maximum requests per second across all workers (default: 10)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=".share_checkpoint.jsonl",
+        help="Progress file for resuming an interrupted run (default: .share_checkpoint.jsonl)",
+    )
     args = parser.parse_args()
 
     client = get_client()
@@ -45,49 +216,37 @@ def main():
         AccessRelation.EDITOR if args.role == "editor" else AccessRelation.VIEWER
     )
 
-    # Share the system
-    print(f"Sharing system {args.system_id} with {args.email} as {args.role}...")
-    client.create_access_by_email(
-        resource_id=args.system_id,
-        subject_type=AccessSubjectType.USER,
-        subject_email=args.email,
-        relation=relation,
-    )
-    print("  System shared.")
+    # Systems first, then every file they contain
+    resources = [(AccessResourceType.SYSTEM, system_id) for system_id in args.system_id]
+    for system_id in args.system_id:
+        file_ids = collect_file_ids(client, system_id, workers=args.workers)
+        print(f"System {system_id}: {len(file_ids)} files")
+        resources += [(AccessResourceType.FILE, file_id) for file_id in sorted(file_ids)]
 
-    # Collect all file IDs from the system's configurations
-    configs = client.list_system_configurations(args.system_id, page=1, size=50)
-    file_ids = set()
+    checkpoint = Checkpoint(args.checkpoint)
+    if checkpoint.done:
+        print(f"Resuming: {len(checkpoint.done)} grants already done in {args.checkpoint}")
 
-    for config in configs.items:
-        # Get tracked files directly
-        tracked = client.list_tracked_files(config.id, page=1, size=50)
-        for tf in tracked.items:
-            file_ids.add(tf.file_id)
-
-    # Also collect files from model artifacts
-    models = client.list_models(system_id=args.system_id, page=1, size=100)
-    for model in models.items:
-        if model.file:
-            file_ids.add(model.file.id)
-        for artifact in model.artifacts:
-            if artifact.file:
-                file_ids.add(artifact.file.id)
-
-    # Share each file
-    print(f"Sharing {len(file_ids)} files...")
-    for file_id in file_ids:
-        try:
-            client.create_access_by_email(
-                resource_id=file_id,
-                subject_type=AccessSubjectType.USER,
-                subject_email=args.email,
-                relation=relation,
-            )
-        except Exception as e:
-            print(f"  Warning: could not share file {file_id}: {e}")
+    total = len(resources) * len(args.email)
+    print(f"\nSharing {len(resources)} resources with {len(args.email)} user(s) "
+          f"as {args.role} ({total} grants)...")
+    try:
+        summary = share_all(
+            client, resources, args.email, relation, checkpoint,
+            workers=args.workers, rate=args.rate,
+        )
+    except KeyboardInterrupt:
+        checkpoint.close()
+        print(f"\nInterrupted — re-run the same command to resume from {args.checkpoint}")
+        sys.exit(130)
+    checkpoint.close(remove=summary["failed"] == 0)
 
-    print(f"\nDone! Shared system + {len(file_ids)} files with {args.email}.")
+    print(f"\nDone! {summary['granted']} granted, {summary['skipped']} already shared, "
+          f"{summary['failed']} failed.")
+    print(f"  {summary['api_calls']} API calls in {summary['seconds']}s "
+          f"({summary['grants_per_second']} grants/s)")
+    if summary["failed"]:
+        print(f"  Re-run to retry failures; progress is kept in {args.checkpoint}")
 
 
 if __name__ == "__main__":
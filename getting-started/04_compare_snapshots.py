@@ -0,0 +1,77 @@
+"""Compare two or more snapshots of a configuration.
+
+Lists what changed between each consecutive pair: files added, removed and
+modified (by content hash). Files that got a new revision with identical
+content are counted separately. With --content, a unified diff is printed
+for each modified text file.
+
+Snapshots can be given by ID or, with --config-id, by tag.
+
+Usage:
+    python getting-started/04_compare_snapshots.py --snapshot <OLD_ID> --snapshot <NEW_ID>
+    python getting-started/04_compare_snapshots.py --config-id <CONFIG_ID> \\
+        --snapshot initial-checks --snapshot post-requirement-update --content
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from istari_client import get_client
+from istari_snapshot_diff import DEFAULT_WORKERS, compare_chain, fetch_snapshots, resolve, text_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare snapshots")
+    parser.add_argument(
+        "--snapshot",
+        action="append",
+        required=True,
+        help="Snapshot ID or tag, oldest first (repeat: at least two)",
+    )
+    parser.add_argument(
+        "--config-id",
+        type=str,
+        default=None,
+        help="Configuration the tags belong to",
+    )
+    parser.add_argument(
+        "--content",
+        action="store_true",
+        help="Print a unified diff for each modified text file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent page requests (default: {DEFAULT_WORKERS})",
+    )
+    args = parser.parse_args()
+    if len(args.snapshot) < 2:
+        parser.error("give at least two --snapshot values")
+
+    client = get_client()
+    snapshot_ids = [resolve(client, ref, args.config_id) for ref in args.snapshot]
+    labels = [ref if ref != sid else sid[:8] + "..." for ref, sid in zip(args.snapshot, snapshot_ids)]
+    files = fetch_snapshots(client, snapshot_ids, workers=args.workers)
+    for label, sid in zip(labels, snapshot_ids):
+        print(f"{label}: {sid[:8]}..., {len(files[sid])} files")
+
+    for (old_id, new_id, diff), old_label, new_label in zip(
+        compare_chain(files, snapshot_ids), labels, labels[1:]
+    ):
+        print(f"\n{old_label} → {new_label}: {diff.summary()}")
+        for entry in diff.added:
+            print(f"  + {entry.name}")
+        for entry in diff.removed:
+            print(f"  - {entry.name}")
+        for old, new in diff.modified:
+            renamed = f" (was {old.name})" if old.name != new.name else ""
+            print(f"  ~ {new.name}{renamed}")
+            if args.content:
+                for line in text_diff(client, old, new):
+                    print(f"      {line}", end="" if line.endswith("\n") else "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Exercise istari_upload.UploadManager against a local stand-in file service.
+
+The stand-in keeps uploaded parts in memory, limits each connection's
+bandwidth, and injects faults: dropped requests, corrupted ETags, and a full
+outage part-way through an upload. The script checks that:
+
+  1. parallel parts beat one sequential stream (throughput for both)
+  2. an upload with random faults still stores the exact file contents
+  3. an upload cut off by an outage resumes from its journal and only
+     sends the parts that were missing
+  4. re-uploading identical content is skipped
+
+Usage:
+    python getting-started/benchmark_uploads.py
+    python getting-started/benchmark_uploads.py --size-mb 512 --part-mb 16 --workers 8
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from time import sleep
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from istari_upload import UploadManager, throughput
+from istari_digital_client.legacy.storage.models.temporary_url import TemporaryURL
+
+
+class _Response:
+    def __init__(self, status, etag=None):
+        self.status = status
+        self._etag = etag
+
+    def getheader(self, name):
+        return f'"{self._etag}"' if name == "ETag" and self._etag else None
+
+
+class StandInFileService:
+    """In-memory multipart storage with bandwidth limits and injected faults.
+
+    `mbps` is the bandwidth of one connection. `fail_rate` and `corrupt_rate`
+    are per-request probabilities. After `outage_after` part requests every
+    request fails until `outage_after` is reset to None.
+    """
+
+    def __init__(self, mbps=20.0, latency=0.02, fail_rate=0.0, corrupt_rate=0.0, seed=0):
+        self.mbps = mbps
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.corrupt_rate = corrupt_rate
+        self.outage_after = None
+        self.blobs = {}
+        self.uploads = {}
+        self.models = {}
+        self.part_requests = 0
+        self.faults = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def create_multipart_upload(self, request):
+        if request.sha in self.blobs:
+            raise Exception("Sha already exists")
+        upload_id = uuid.uuid4().hex
+        self.uploads[upload_id] = {}
+        expires = datetime.now(timezone.utc) + timedelta(hours=1)
+        return SimpleNamespace(upload_id=upload_id, upload_urls={
+            str(n): TemporaryURL(url=f"http://stand-in/{upload_id}/{n}", expires=expires)
+            for n in range(1, request.num_parts + 1)
+        })
+
+    def _upload_multipart_chunk(self, upload_url, chunk_data):
+        with self._lock:
+            self.part_requests += 1
+            down = self.outage_after is not None and self.part_requests > self.outage_after
+            roll = self._rng.random()
+        sleep(self.latency + len(chunk_data) / (self.mbps * 1e6))
+        if down or roll < self.fail_rate:
+            with self._lock:
+                self.faults += 1
+            raise ConnectionError("connection reset by stand-in")
+        upload_id, number = upload_url.url.rsplit("/", 2)[-2:]
+        etag = hashlib.md5(chunk_data).hexdigest()
+        if roll < self.fail_rate + self.corrupt_rate:
+            with self._lock:
+                self.faults += 1
+            etag = hashlib.md5(chunk_data[:-1]).hexdigest()  # part arrived damaged
+        else:
+            self.uploads[upload_id][int(number)] = chunk_data
+        return _Response(200, etag)
+
+    def finalize_multipart_upload(self, request):
+        parts = self.uploads.pop(request.upload_id)
+        if request.action.value.upper() != "COMPLETE":
+            return
+        data = b"".join(parts[p.part_number] for p in request.completed_parts)
+        self.blobs[request.sha] = data
+
+    def _upload_properties(self, token, data):
+        self.blobs[token.sha] = data
+
+    def _create_model(self, file_revision, source_job_id=None):
+        model_id = uuid.uuid4().hex
+        self.models[model_id] = file_revision
+        return SimpleNamespace(id=model_id, revision=file_revision)
+
+    def _update_model(self, model_id, file_revision, source_job_id=None):
+        self.models[model_id] = file_revision
+        return SimpleNamespace(id=model_id, revision=file_revision)
+
+    def new_model(self):
+        """An existing model to upload revisions to (no content yet)."""
+        token = SimpleNamespace(sha=None, salt=uuid.uuid4().hex)
+        return self._create_model(SimpleNamespace(content_token=token)).id
+
+    def get_model(self, model_id):
+        return SimpleNamespace(id=model_id, revision=self.models[model_id])
+
+    def stored(self, model_id):
+        token = self.models[model_id].content_token
+        return self.blobs.get(token.sha), token
+
+
+def check_stored(service, model_id, path):
+    data, token = service.stored(model_id)
+    expected = Path(path).read_bytes()
+    sha = hashlib.sha384(expected + token.salt.encode()).hexdigest()
+    return data == expected and token.sha == sha
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and fault-test chunked uploads")
+    parser.add_argument("--size-mb", type=int, default=256, help="Test file size in MB (default: 256)")
+    parser.add_argument("--part-mb", type=int, default=8, help="Part size in MB (default: 8)")
+    parser.add_argument("--workers", type=int, default=6, help="Parallel parts (default: 6)")
+    parser.add_argument("--mbps", type=float, default=20.0,
+                        help="Stand-in bandwidth per connection in MB/s (default: 20)")
+    args = parser.parse_args()
+
+    part_size = args.part_mb * 1024 * 1024
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        path = tmp / "large_model.bdf"
+        with open(path, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+        print(f"Test file: {args.size_mb} MB, {part_size // (1024 * 1024)} MB parts\n")
+
+        def manager(service, workers, name):
+            return UploadManager(service, part_size=part_size, workers=workers, backoff=0.01,
+                                 journal_dir=tmp / name, verbose=False)
+
+        # 1. Sequential vs parallel parts
+        rates = {}
+        for workers in (1, args.workers):
+            service = StandInFileService(mbps=args.mbps)
+            uploads = manager(service, workers, f"journal-{workers}")
+            model = uploads.add_model(path, display_name="Large model")
+            rates[workers] = throughput(uploads.last_stats)
+            print(f"  {workers} worker(s): {uploads.last_stats.seconds:6.2f}s  {rates[workers]:8.1f} MB/s")
+            ok = ok and check_stored(service, model.id, path)
+        print(f"  Parallel speedup: {rates[args.workers] / rates[1]:.1f}x\n")
+
+        # 2. Random dropped requests and damaged parts
+        service = StandInFileService(mbps=args.mbps, fail_rate=0.15, corrupt_rate=0.05, seed=1)
+        uploads = manager(service, args.workers, "journal-faults")
+        model = uploads.add_model(path, display_name="Large model")
+        intact = check_stored(service, model.id, path)
+        ok = ok and intact
+        print(f"Faults injected: {service.faults}, retries: {uploads.last_stats.retries}, "
+              f"contents intact: {intact}")
+
+        # 3. Outage part-way through, then resume from the journal
+        parts = -(-path.stat().st_size // part_size)
+        service = StandInFileService(mbps=args.mbps)
+        service.outage_after = parts // 2
+        uploads = manager(service, args.workers, "journal-resume")
+        uploads.retries = 2
+        model_id = service.new_model()
+        try:
+            uploads.update_model(model_id, path)
+            print("Outage: upload unexpectedly finished")
+            ok = False
+        except IOError as e:
+            print(f"Outage after {parts // 2}/{parts} parts: {e}")
+        service.outage_after = None
+        before = service.part_requests
+        uploads.update_model(model_id, path)
+        stats = uploads.last_stats
+        intact = check_stored(service, model_id, path)
+        resent = service.part_requests - before
+        ok = ok and intact and stats.resumed_parts > 0 and resent == parts - stats.resumed_parts
+        print(f"  Resumed: {stats.resumed_parts} parts kept, {resent} sent, contents intact: {intact}")
+
+        # 4. Identical content again: nothing to send
+        before = service.part_requests
+        uploads.update_model(model_id, path)
+        print(f"\nRe-upload of identical content: deduplicated={uploads.last_stats.deduplicated}, "
+              f"{service.part_requests - before} part requests")
+        ok = ok and uploads.last_stats.deduplicated
+
+    print(f"\n{'All checks passed' if ok else 'CHECKS FAILED'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
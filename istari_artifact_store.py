@@ -0,0 +1,347 @@
+"""Content-addressed local store for artifact and model bytes.
+
+File revisions in Istari are immutable, so once a revision has been
+downloaded there is no reason to fetch it again. This store keeps revision
+contents on local disk, keyed by the revision's content hash, and serves
+repeated reads from there instead of the file service.
+
+Usage:
+    from istari_artifact_store import get_store, read_bytes, read_text
+
+    metrics = json.loads(read_text(artifact))   # first run: download + store
+    metrics = json.loads(read_text(artifact))   # later runs: local disk
+
+    for chunk in get_store().iter_chunks(artifact):   # large files, a chunk at a time
+        ...
+
+Settings (environment):
+    ISTARI_ARTIFACT_STORE         Store directory (default: ~/.cache/istari/artifacts)
+    ISTARI_ARTIFACT_STORE_MAX_MB  Size cap before least-recently-used blobs are evicted (default: 2048)
+    ISTARI_DOWNLOAD_CONNECTIONS   Connections kept open to the file service; more downloads at once wait (default: 10)
+"""
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from pathlib import Path
+from time import perf_counter
+
+DEFAULT_ROOT = Path.home() / ".cache" / "istari" / "artifacts"
+DEFAULT_MAX_MB = 2048
+
+# Blobs at or above this size are memory-mapped by open_blob()
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+# Bytes per read when downloading or streaming a blob
+CHUNK_SIZE = 1024 * 1024
+
+DEFAULT_CONNECTIONS = 10
+
+# Seconds to wait to connect, and for each read of a download, when the
+# client's http_request_timeout_secs is unset
+DEFAULT_TIMEOUT = 60
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(url, config):
+    """The urllib3 pool downloads of `url` share, set up as the SDK client's is.
+
+    CA bundle, proxy (and NO_PROXY) and retries come from the client's
+    Configuration. Each pool keeps at most ISTARI_DOWNLOAD_CONNECTIONS
+    keep-alive connections, however many threads download at once; beyond
+    that, a download waits for a free connection instead of opening another.
+    """
+    import urllib3
+    from istari_digital_client.legacy.proxy import (
+        proxy_headers_for, proxy_url_for, resolve_ca_certs, resolve_proxies,
+    )
+
+    trust_env = getattr(config, "trust_env", True) is not False
+    ca_certs = resolve_ca_certs(getattr(config, "ca_bundle", None), trust_env)
+    proxy = proxy_url_for(url, resolve_proxies(getattr(config, "proxy_url", None), trust_env))
+    retries = getattr(config, "retry_max_attempts", None) if getattr(config, "retry_enabled", False) else None
+    with _pools_lock:
+        pool = _pools.get((ca_certs, proxy, retries))
+        if pool is None:
+            connections = int(os.getenv("ISTARI_DOWNLOAD_CONNECTIONS", DEFAULT_CONNECTIONS))
+            args = {"cert_reqs": "CERT_REQUIRED", "ca_certs": ca_certs, "maxsize": connections, "block": True}
+            if retries is not None:
+                args["retries"] = retries
+            if proxy:
+                target, headers = proxy_headers_for(proxy)
+                pool = urllib3.ProxyManager(target, proxy_headers=headers, **args)
+            else:
+                pool = urllib3.PoolManager(**args)
+            _pools[(ca_certs, proxy, retries)] = pool
+        return pool
+
+
+def _revision(resource):
+    """Return the FileRevision behind a model, artifact or revision."""
+    if hasattr(resource, "content_token"):
+        return resource
+    return resource.revision
+
+
+def _download_chunks(revision, chunk_size=CHUNK_SIZE):
+    """Yield a revision's contents in chunks as they arrive from storage.
+
+    With the SDK the body is streamed from a presigned download URL and its
+    salted SHA-384 checked at the end, as the SDK checks whole downloads.
+    The client's timeout, CA bundle and proxy apply, and with ISTARI_METRICS
+    the call and bytes are recorded as `read_bytes()` records them.
+    Anything else (e.g. the local stand-in) is read in one piece.
+    """
+    client = getattr(revision, "_client", None) or getattr(revision, "client", None)
+    token = revision.content_token
+    if not hasattr(client, "generate_download_url") or not getattr(token, "salt", None):
+        data = revision.read_bytes()
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+        return
+    import urllib3
+    import istari_metrics
+
+    metrics = istari_metrics.current()
+    generate_download_url = client.generate_download_url
+    if metrics is not None:  # the client behind a model is not the instrumented wrapper
+        generate_download_url = metrics.wrap("generate_download_url", generate_download_url)
+    url = generate_download_url(token.sha).url
+    config = getattr(client, "configuration", None) or getattr(client, "config", None)
+    seconds = getattr(config, "http_request_timeout_secs", None) or DEFAULT_TIMEOUT
+    digest = hashlib.sha384()
+    started = perf_counter()
+    elapsed, received, failed, response = 0.0, 0, True, None
+    try:
+        response = _pool(url, config).request(
+            "GET", url, preload_content=False, timeout=urllib3.Timeout(connect=seconds, read=seconds),
+        )
+        if response.status != 200:
+            raise OSError(f"Download of {revision.name} failed: HTTP {response.status}")
+        for chunk in response.stream(chunk_size):
+            elapsed += perf_counter() - started  # time spent in the transfer, not in the caller
+            received += len(chunk)
+            digest.update(chunk)
+            yield chunk
+            started = perf_counter()
+        failed = False
+    finally:
+        if response is not None:
+            response.release_conn()
+        if metrics is not None:
+            elapsed += perf_counter() - started
+            metrics.record("_download", elapsed, failed=failed, bytes_in=received)
+    digest.update(token.salt.encode())
+    if digest.hexdigest() != token.sha:
+        raise ValueError("Hash of downloaded data does not match expected hash")
+
+
+class ArtifactStore:
+    """On-disk blob store with a size cap and least-recently-used eviction.
+
+    Layout:
+        objects/<hash[:2]>/<hash>   blob contents
+        refs/<revision_id>          content hash of that revision
+
+    Writes go to a temp file in the same directory and are renamed into
+    place, so concurrent processes never see a partial blob. Downloads are
+    written a chunk at a time, so a blob is never held in memory whole.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = Path(root or os.getenv("ISTARI_ARTIFACT_STORE") or DEFAULT_ROOT)
+        max_mb = int(os.getenv("ISTARI_ARTIFACT_STORE_MAX_MB", DEFAULT_MAX_MB))
+        self.max_bytes = max_bytes if max_bytes is not None else max_mb * 1024 * 1024
+        self.objects = self.root / "objects"
+        self.refs = self.root / "refs"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.refs.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._headroom = None  # bytes that fit under the cap as of the last scan; None: scan next time
+        self._lock = threading.Lock()
+
+    def _key(self, revision):
+        token = getattr(revision, "content_token", None)
+        return getattr(token, "sha", None) or f"rev-{revision.id}"
+
+    def _blob_path(self, key):
+        return self.objects / key[:2] / key
+
+    def path(self, resource):
+        """Return the local path of a revision's contents, downloading on a miss."""
+        revision = _revision(resource)
+        key = self._key(revision)
+        path = self._blob_path(key)
+        if path.exists():
+            self.hits += 1
+            self.bytes_saved += path.stat().st_size
+            os.utime(path)  # bump recency for LRU eviction
+            return path
+        for _ in self._download(revision, path):
+            pass
+        return path
+
+    def iter_chunks(self, resource, chunk_size=CHUNK_SIZE):
+        """Yield a revision's contents in chunks: from disk, or as they download.
+
+        A download is stored as it streams. If the caller stops early, the rest
+        is still downloaded to disk (not memory), so the next read is a hit.
+        """
+        revision = _revision(resource)
+        path = self._blob_path(self._key(revision))
+        if not path.exists():
+            download = self._download(revision, path, chunk_size)
+            try:
+                for chunk in download:  # not `yield from`, which would pass a close() on
+                    yield chunk
+            finally:
+                for _ in download:
+                    pass
+            return
+        self.hits += 1
+        self.bytes_saved += path.stat().st_size
+        os.utime(path)
+        with open(path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def _download(self, revision, path, chunk_size=CHUNK_SIZE):
+        """Download a revision to `path` a chunk at a time, yielding each chunk."""
+        self.misses += 1
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in _download_chunks(revision, chunk_size):
+                    f.write(chunk)
+                    yield chunk
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+        self._write_atomic(self.refs / revision.id, self._key(revision).encode())
+        self._grew(path.stat().st_size, keep=path)
+
+    def read_bytes(self, resource):
+        """Return a revision's contents as bytes."""
+        return self.path(resource).read_bytes()
+
+    def read_text(self, resource, encoding="utf-8"):
+        """Return a revision's contents decoded as text."""
+        return self.read_bytes(resource).decode(encoding)
+
+    def open_blob(self, resource):
+        """Return a read-only view of a revision's contents.
+
+        Large blobs are memory-mapped rather than read into memory; the
+        returned mmap supports slicing, len() and find() like bytes.
+        """
+        path = self.path(resource)
+        size = path.stat().st_size
+        if size < MMAP_THRESHOLD or size == 0:
+            return path.read_bytes()
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def contains(self, resource):
+        """True if a revision's contents are already stored locally."""
+        return self._blob_path(self._key(_revision(resource))).exists()
+
+    def adopt(self, path, key):
+        """Move a finished local file into the store as the blob for `key`.
+
+        Used after an upload whose content hash is already known, so the new
+        revision is served locally without downloading what was just sent.
+        `path` must be on the same filesystem as the store (e.g. under root).
+        """
+        blob = self._blob_path(key)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, blob)
+        self._grew(blob.stat().st_size, keep=blob)
+        return blob
+
+    def _write_atomic(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _grew(self, size, keep=None):
+        """Evict once `size` new bytes may have taken the store over its cap.
+
+        The store is scanned only then, not after every blob: a bulk download
+        of many small files would otherwise rescan the store for each one.
+        `keep` is the blob just written, which its caller is about to read.
+        """
+        with self._lock:
+            if self._headroom is not None and size <= self._headroom:
+                self._headroom -= size
+                return
+        self.evict(keep)
+
+    def evict(self, keep=None):
+        """Remove least-recently-used blobs until the store is under its cap.
+
+        The blob at `keep` is never removed, even if it alone is over the cap;
+        it goes the next time the store is evicted.
+        """
+        blobs = []
+        total = 0
+        for shard in self.objects.iterdir():
+            for entry in os.scandir(shard):
+                if entry.name.startswith(".tmp-"):
+                    continue
+                stat = entry.stat()
+                blobs.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+                total += stat.st_size
+        removed = 0
+        if total > self.max_bytes:
+            for _, size, path in sorted(blobs):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                path.unlink(missing_ok=True)  # refs to it now simply miss
+                total -= size
+                removed += 1
+        with self._lock:
+            self._headroom = self.max_bytes - total
+        return removed
+
+    def stats(self):
+        """Hit/miss counts and bytes served locally instead of downloaded."""
+        return {"hits": self.hits, "misses": self.misses, "bytes_saved": self.bytes_saved}
+
+
+_default_store = None
+
+
+def get_store():
+    """Return the process-wide store configured from the environment."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ArtifactStore()
+    return _default_store
+
+
+def read_bytes(resource):
+    """Store-backed replacement for `artifact.read_bytes()`."""
+    return get_store().read_bytes(resource)
+
+
+def read_text(resource, encoding="utf-8"):
+    """Store-backed replacement for `artifact.read_text()`."""
+    return get_store().read_text(resource, encoding)
@@ -0,0 +1,209 @@
+"""Read-through metadata cache for the Istari SDK client.
+
+Wraps a `Client` so repeated get_*/list_* calls for the same IDs are served
+from memory (and optionally from a SQLite file shared across runs) instead of
+going back to the registry. Mutating calls invalidate the affected resource
+types, so reads after an update always see fresh data.
+
+Usage:
+    from istari_client import get_client
+
+    client = get_client()                  # cached by default
+    client.get_model(model_id)             # miss → registry
+    client.get_model(model_id)             # hit  → memory
+    print(client.cache_stats())
+
+Values in the SQLite tier are pickled without the client they came from
+(SDK models and stand-in resources keep a reference to it, which holds a
+lock); the caching client's own client is attached again when they are
+read back.
+"""
+import io
+import pickle
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from time import time
+
+# method -> (resource type, TTL in seconds)
+CACHED_METHODS = {
+    "get_current_user": ("user", 3600),
+    "get_system": ("system", 300),
+    "get_model": ("model", 60),
+    "get_artifact": ("artifact", 300),
+    "get_file": ("file", 60),
+    "get_revision": ("revision", 86400),  # revisions are immutable
+    "list_systems": ("system", 300),
+    "list_system_configurations": ("configuration", 300),
+    "list_tracked_files": ("tracked_file", 120),
+    "list_models": ("model", 60),
+    "list_snapshots": ("snapshot", 60),
+    "list_tags": ("tag", 60),
+    "list_snapshot_revisions": ("snapshot_revision", 86400),  # snapshots are immutable
+}
+
+# mutating method -> resource types it makes stale
+INVALIDATED_BY = {
+    "add_model": ("model", "file"),
+    "update_model": ("model", "artifact", "file"),
+    "add_artifact": ("model", "artifact", "file"),
+    "add_job": ("model", "artifact"),
+    "create_snapshot": ("snapshot", "tag"),
+    "create_tag": ("tag", "snapshot"),
+    "create_configuration": ("configuration",),
+    "create_system": ("system",),
+    "create_access_by_email": (),
+}
+
+# Any other method starting with one of these drops the whole cache
+MUTATING_PREFIXES = ("add_", "create_", "update_", "delete_", "remove_", "archive_", "restore_")
+
+
+class CachingClient:
+    """Client wrapper with an LRU memory tier and an optional SQLite tier.
+
+    All SDK methods are available unchanged; only the ones listed in
+    CACHED_METHODS are cached. `ttls` overrides the TTL per resource type.
+    """
+
+    def __init__(self, client, max_entries=2048, db_path=None, namespace="", ttls=None):
+        self.client = client
+        # What returned values point back to: the client, or the one an InstrumentedClient wraps
+        self._owners = (client, getattr(client, "client", client))
+        self._unpicklable = set()
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self.ttls = {kind: ttl for kind, ttl in CACHED_METHODS.values()}
+        self.ttls.update(ttls or {})
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (kind, expires, value)
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, kind TEXT, expires REAL, value BLOB)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS cache_kind ON cache (kind)")
+            self._db.execute("DELETE FROM cache WHERE expires < ?", (time(),))
+            self._db.commit()
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+        if name in CACHED_METHODS:
+            kind = CACHED_METHODS[name][0]
+            return lambda *args, **kwargs: self._read_through(name, kind, attr, args, kwargs)
+        if name in INVALIDATED_BY or name.startswith(MUTATING_PREFIXES):
+            return lambda *args, **kwargs: self._mutate(name, attr, args, kwargs)
+        return attr
+
+    def _read_through(self, name, kind, method, args, kwargs):
+        key = f"{self.namespace}|{name}|{args!r}|{sorted(kwargs.items())!r}"
+        found, value = self._get(key)
+        if found:
+            return value
+        value = method(*args, **kwargs)
+        self._put(key, kind, value)
+        return value
+
+    def _mutate(self, name, method, args, kwargs):
+        result = method(*args, **kwargs)
+        kinds = INVALIDATED_BY.get(name)
+        if kinds is None:
+            self.cache_clear()
+        elif kinds:
+            self.cache_invalidate(*kinds)
+        return result
+
+    def _get(self, key):
+        now = time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return True, entry[2]
+            if entry:
+                del self._memory[key]
+            if self._db:
+                row = self._db.execute(
+                    "SELECT kind, expires, value FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    value = self._loads(row[2])
+                    self._remember(key, row[0], row[1], value)
+                    self.hits += 1
+                    return True, value
+            self.misses += 1
+            return False, None
+
+    def _put(self, key, kind, value):
+        expires = time() + self.ttls.get(kind, 60)
+        with self._lock:
+            self._remember(key, kind, expires, value)
+            if self._db:
+                try:
+                    blob = self._dumps(value)
+                except Exception as e:  # keep it in memory only, but say so once per kind
+                    if kind not in self._unpicklable:
+                        self._unpicklable.add(kind)
+                        print(f"istari_cache: {kind} results not stored on disk: {e}", file=sys.stderr)
+                    return
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                    (key, kind, expires, blob),
+                )
+                self._db.commit()
+
+    def _dumps(self, value):
+        """Pickle `value`, storing references to the client as a placeholder."""
+        owners = self._owners
+        buffer = io.BytesIO()
+        pickler = pickle.Pickler(buffer)
+        pickler.persistent_id = lambda obj: "client" if any(obj is owner for owner in owners) else None
+        pickler.dump(value)
+        return buffer.getvalue()
+
+    def _loads(self, blob):
+        """Unpickle a value from _dumps(), pointing it at this process's client."""
+        unpickler = pickle.Unpickler(io.BytesIO(blob))
+        unpickler.persistent_load = lambda pid: self._owners[-1]
+        return unpickler.load()
+
+    def _remember(self, key, kind, expires, value):
+        self._memory[key] = (kind, expires, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def cache_invalidate(self, *kinds):
+        """Drop every cached entry of the given resource types."""
+        with self._lock:
+            for key in [k for k, entry in self._memory.items() if entry[0] in kinds]:
+                del self._memory[key]
+            if self._db:
+                self._db.executemany("DELETE FROM cache WHERE kind = ?", [(k,) for k in kinds])
+                self._db.commit()
+
+    def cache_clear(self):
+        """Drop everything from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db:
+                self._db.execute("DELETE FROM cache")
+                self._db.commit()
+
+    def cache_stats(self):
+        """Hit/miss counts; every hit is one registry round trip saved."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": len(self._memory),
+        }
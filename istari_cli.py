@@ -0,0 +1,350 @@
+"""One `istari` command for the example scripts, with an optional warm daemon.
+
+Each subcommand runs one of the repo's scripts with the remaining arguments.
+Only the standard library is imported up front, so `--help` and the daemon
+round trip start quickly. The SDK is imported by the script itself, or not
+at all when a daemon is running.
+
+`istari daemon start` launches a background process that imports the SDK
+once and keeps one client across commands. It listens on a Unix socket. The
+client keeps its keep-alive connections and its metadata cache between
+commands. When the daemon is running, commands are sent to it and their
+output is streamed back. When it isn't, or the command sets a different
+registry URL or token, the command runs in-process as usual. The daemon
+runs one command at a time and does not forward stdin. It exits after
+ISTARI_DAEMON_IDLE_MINUTES (default 30) without commands.
+
+Usage:
+    alias istari="python /path/to/istari_cli.py"
+
+    istari --help
+    istari whoami
+    istari explore --system-id <SYSTEM_ID>
+    istari ntop-run --model-id <MODEL_ID>
+
+    istari daemon start        # then the commands above skip the SDK import
+    istari daemon status
+    istari daemon stop
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from time import sleep, time
+
+REPO_ROOT = Path(__file__).resolve().parent
+
+# command -> (script relative to the repo root, help)
+COMMANDS = {
+    "whoami": ("istari_client.py", "Check the connection and show the current user"),
+    "explore": ("getting-started/01_explore_systems.py", "Browse systems, configurations, snapshots and files"),
+    "version": ("getting-started/02_version_model.py", "Upload a file as a new revision of a model"),
+    "share": ("getting-started/03_share_resources.py", "Share a system and its files by email"),
+    "ntop-run": ("ntop/run_ntop_model.py", "Run an nTop model with a parameter file"),
+    "ntop-sweep": ("ntop/run_ntop_sweep.py", "Run a batch parameter sweep of an nTop model"),
+    "ntop-optimize": ("ntop/optimize_ntop_wing.py", "Optimize the wing against the demo requirements with a surrogate model"),
+    "sysml": ("sysgit/update_and_extract_sysml.py", "Edit SysML models and extract requirements/parts"),
+    "sysml-extract": ("istari_sysml.py", "Extract requirements/parts from a local .sysml file"),
+    "rollup": ("istari_rollup.py", "Mass, power and cost subtotals of SysML parts by qualified name"),
+    "nastran": ("istari_nastran.py", "Read a local .bdf into mesh, materials, loads and constraints"),
+    "json": ("istari_json_stream.py", "Print parts of a large JSON artifact without loading all of it"),
+    "compare": ("getting-started/04_compare_snapshots.py", "Compare snapshots: files added, removed, modified"),
+    "lineage": ("istari_lineage.py", "Sync and query the local provenance index"),
+    "gallery": ("istari_gallery.py", "Write an HTML thumbnail gallery of a model's rendered views"),
+    "export": ("istari_export.py", "Download a model's or job's artifacts into a directory, zip or tar"),
+    "agents": ("istari_scheduler.py", "List the agents jobs can be scheduled on, idle or busy"),
+    "check-design": ("use-cases/check-design-meets-requirements/check_design.py",
+                     "Check the design against requirements, update, re-check"),
+    "benchmark": ("benchmarks/run_benchmarks.py", "Benchmark the example scripts against the local stand-in"),
+}
+
+# Always run in-process: they start their own processes
+LOCAL_ONLY = {"benchmark"}
+
+# A different value for any of these in the caller's environment means the
+# daemon's client is the wrong one for this command
+SESSION_VARIABLES = ("ISTARI_DIGITAL_REGISTRY_URL", "ISTARI_DIGITAL_REGISTRY_AUTH_TOKEN")
+
+START_TIMEOUT = 60.0
+
+
+def socket_path():
+    default = Path("~/.cache/istari/daemon.sock").expanduser()
+    return Path(os.getenv("ISTARI_DAEMON_SOCKET", default))
+
+
+def whoami():
+    from istari_client import get_client
+
+    user = get_client().get_current_user()
+    print(f"Connected as: {user.display_name} ({user.email})")
+
+
+def run_script(command, args):
+    """Run a command's script in this process, as `python <script> <args>` would."""
+    import runpy
+
+    if command == "whoami":
+        whoami()  # istari_client.py's own main would build a second client
+        return 0
+    script = str(REPO_ROOT / COMMANDS[command][0])
+    sys.argv = [script, *args]
+    sys.path.insert(0, str(Path(script).parent))  # as `python <script>` does, for sibling imports
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        return _exit_code(e)
+    return 0
+
+
+def _exit_code(exit):
+    if exit.code is None or isinstance(exit.code, int):
+        return exit.code or 0
+    print(exit.code, file=sys.stderr)
+    return 1
+
+
+def _send(message, path=None):
+    """Connect to the daemon and send one request; None if it isn't running."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(str(path or socket_path()))
+    except OSError:
+        conn.close()
+        return None
+    conn.sendall(json.dumps(message).encode() + b"\n")
+    return conn
+
+
+def _replies(conn):
+    with conn, conn.makefile("r", encoding="utf-8") as lines:
+        for line in lines:
+            yield json.loads(line)
+
+
+def forward(command, args):
+    """Run a command in the daemon, streaming its output; None if it can't."""
+    conn = _send({"run": command, "args": args, "cwd": os.getcwd(), "env": dict(os.environ)})
+    if conn is None:
+        return None
+    code = None
+    for reply in _replies(conn):
+        if "out" in reply:
+            sys.stdout.write(reply["out"])
+            sys.stdout.flush()
+        elif "err" in reply:
+            sys.stderr.write(reply["err"])
+            sys.stderr.flush()
+        elif "exit" in reply:
+            code = reply["exit"]
+        elif "mismatch" in reply:
+            return None
+    return 1 if code is None else code
+
+
+class _Disconnected(Exception):
+    """The calling CLI went away (e.g. Ctrl-C) while the daemon was replying."""
+
+
+def _reply(conn, message):
+    """Send one JSON line to the calling CLI."""
+    try:
+        conn.sendall(json.dumps(message).encode() + b"\n")
+    except OSError as e:
+        raise _Disconnected from e
+
+
+class _Forward:
+    """File-like object that sends each write to the calling CLI."""
+
+    encoding = "utf-8"
+
+    def __init__(self, conn, key, lock):
+        self.conn = conn
+        self.key = key
+        self.lock = lock
+
+    def write(self, text):
+        if text:
+            with self.lock:
+                _reply(self.conn, {self.key: text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+def _run_request(conn, request):
+    """Run one forwarded command with the caller's cwd, environment and output."""
+    import threading
+    import traceback
+
+    saved = (dict(os.environ), os.getcwd(), list(sys.path), sys.argv, sys.stdout, sys.stderr)
+    lock = threading.Lock()
+    try:
+        sys.stdout = _Forward(conn, "out", lock)
+        sys.stderr = _Forward(conn, "err", lock)
+        try:
+            os.environ.update(request.get("env", {}))
+            os.chdir(request["cwd"])
+            code = run_script(request["run"], request["args"])
+        except _Disconnected:
+            raise
+        except Exception:  # OSError included: only a failed send means the CLI is gone
+            traceback.print_exc()
+            code = 1
+        _reply(conn, {"exit": code})
+    finally:
+        environ, cwd, sys.path[:], sys.argv, sys.stdout, sys.stderr = saved
+        os.environ.clear()
+        os.environ.update(environ)
+        os.chdir(cwd)
+
+
+def serve(path, idle_minutes):
+    """Run the daemon: one warm client, one command at a time, until idle or stopped."""
+    import istari_client
+
+    istari_client._session = istari_client.get_client()
+    session_env = {name: os.getenv(name) for name in SESSION_VARIABLES}
+    started, served = time(), 0
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    os.chmod(path, 0o600)
+    server.listen(8)
+    server.settimeout(60)
+    print(f"istari daemon {os.getpid()} listening on {path}", flush=True)
+
+    last_used = time()
+    stopping = False
+    try:
+        while not stopping and time() - last_used < idle_minutes * 60:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            last_used = time()
+            conn.settimeout(None)
+            with conn:
+                try:
+                    try:
+                        request = json.loads(conn.makefile("r", encoding="utf-8").readline() or "{}")
+                    except OSError as e:
+                        raise _Disconnected from e
+                    if request.get("stop"):
+                        stopping = True
+                        _reply(conn, {"stopped": True})
+                    elif request.get("status"):
+                        status = {"pid": os.getpid(), "uptime": round(time() - started),
+                                  "commands": served, "socket": str(path)}
+                        if hasattr(istari_client._session, "cache_stats"):
+                            status["cache"] = istari_client._session.cache_stats()
+                        _reply(conn, status)
+                    elif any(name in request.get("env", {}) and request["env"][name] != value
+                             for name, value in session_env.items()):
+                        _reply(conn, {"mismatch": True})
+                    elif "run" in request:
+                        served += 1
+                        _run_request(conn, request)
+                except _Disconnected:
+                    pass  # the CLI went away (e.g. Ctrl-C)
+    finally:
+        server.close()
+        if path.exists():
+            path.unlink()
+
+
+def daemon(action, idle_minutes):
+    path = socket_path()
+    if action == "serve":
+        serve(path, idle_minutes)
+        return 0
+
+    if action in ("status", "stop"):
+        conn = _send({action: True}, path)
+        if conn is None:
+            print("istari daemon is not running")
+            return 1 if action == "status" else 0
+        for reply in _replies(conn):
+            if action == "stop":
+                print("istari daemon stopped")
+            else:
+                print(f"istari daemon {reply['pid']}: up {reply['uptime']}s, "
+                      f"{reply['commands']} command(s), socket {reply['socket']}")
+                if "cache" in reply:
+                    print(f"  Cache: {reply['cache']}")
+        return 0
+
+    # start
+    conn = _send({"status": True}, path)
+    if conn is not None:
+        conn.close()
+        print(f"istari daemon already running ({path})")
+        return 0
+    import subprocess
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    log = path.with_suffix(".log")
+    with open(log, "a") as out:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "daemon", "serve",
+             "--idle-minutes", str(idle_minutes)],
+            stdin=subprocess.DEVNULL, stdout=out, stderr=out,
+            start_new_session=True, cwd=REPO_ROOT,
+        )
+    deadline = time() + START_TIMEOUT
+    while time() < deadline:
+        conn = _send({"status": True}, path)
+        if conn is not None:
+            conn.close()
+            print(f"istari daemon started ({path})")
+            return 0
+        sleep(0.1)
+    print(f"istari daemon did not start; see {log}", file=sys.stderr)
+    return 1
+
+
+def main():
+    commands = "\n".join(f"  {name:<15}{help_text}" for name, (_, help_text) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog="istari",
+        description="Run the Istari example scripts from one command.",
+        epilog=f"commands:\n{commands}\n  {'daemon':<15}start | stop | status the warm session daemon\n\n"
+               f"Run `istari <command> --help` for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--no-daemon", action="store_true", help="Run in this process even if a daemon is running")
+    parser.add_argument("command", choices=[*COMMANDS, "daemon"], metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the command")
+    args = parser.parse_args()
+
+    if args.command == "daemon":
+        daemon_parser = argparse.ArgumentParser(prog="istari daemon")
+        daemon_parser.add_argument("action", choices=["start", "stop", "status", "serve"])
+        daemon_parser.add_argument("--idle-minutes", type=float,
+                                   default=float(os.getenv("ISTARI_DAEMON_IDLE_MINUTES", "30")),
+                                   help="Exit after this long without commands (default: 30)")
+        options = daemon_parser.parse_args(args.args)
+        sys.exit(daemon(options.action, options.idle_minutes))
+
+    code = None
+    if not args.no_daemon and args.command not in LOCAL_ONLY:
+        code = forward(args.command, args.args)
+    if code is None:
+        code = run_script(args.command, args.args)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,61 @@
 """Istari Digital SDK client helper - reusable connection setup."""
+import hashlib
 import os
 from dotenv import load_dotenv
 from istari_digital_client import Client, Configuration
 
+from istari_cache import CachingClient
+from istari_metrics import instrument, settings as metrics_settings
+
 load_dotenv()
 
-def get_client() -> Client:
-    config = Configuration(
-        registry_url=os.getenv("ISTARI_DIGITAL_REGISTRY_URL"),
-        registry_auth_token=os.getenv("ISTARI_DIGITAL_REGISTRY_AUTH_TOKEN"),
+# Set by the istari CLI daemon (istari_cli.py) so every command it runs shares one warm client
+_session = None
+
+def get_client(cache=None, cache_path=None, metrics=None) -> Client:
+    """Build a client from .env settings.
+
+    By default the client is wrapped in a read-through metadata cache (see
+    istari_cache.py). Pass cache=False, or set ISTARI_CACHE=0, for a bare
+    client. Set cache_path (or ISTARI_CACHE_PATH) to also keep entries in a
+    SQLite file shared across runs.
+
+    A local:// registry URL connects to the in-process stand-in in
+    istari_local.py instead of a real registry.
+
+    Set ISTARI_METRICS=1 (or pass metrics=True) to record every registry call
+    (see istari_metrics.py). Calls served from the cache are not counted.
+    """
+    if _session is not None and cache is None and cache_path is None and metrics is None:
+        return _session
+    registry_url = os.getenv("ISTARI_DIGITAL_REGISTRY_URL")
+    auth_token = os.getenv("ISTARI_DIGITAL_REGISTRY_AUTH_TOKEN")
+    if registry_url and registry_url.startswith("local://"):
+        from istari_local import LocalIstari
+
+        client = LocalIstari.from_url(registry_url)
+    else:
+        config = Configuration(
+            registry_url=registry_url,
+            registry_auth_token=auth_token,
+        )
+        client = Client(config)
+
+    enabled, prefix, port = metrics_settings()
+    if metrics or (metrics is None and enabled):
+        client = instrument(client, prefix=prefix, port=port)
+
+    if cache is None:
+        cache = os.getenv("ISTARI_CACHE", "1") != "0"
+    if not cache:
+        return client
+    # Keep entries from different registries/users apart in a shared cache file
+    user_key = hashlib.sha256((auth_token or "").encode()).hexdigest()[:12]
+    return CachingClient(
+        client,
+        db_path=cache_path or os.getenv("ISTARI_CACHE_PATH"),
+        namespace=f"{registry_url}#{user_key}",
     )
-    return Client(config)
 
 if __name__ == "__main__":
     client = get_client()
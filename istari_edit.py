@@ -0,0 +1,123 @@
+"""Streaming find/replace edits of model files, uploading only real changes.
+
+The source file is read in line-aligned chunks, every rule is applied to
+each chunk, and the output is written to disk and hashed as it goes. The
+hash is computed the same way as the file service's content token, so an
+edit that leaves the file byte-for-byte unchanged is detected without an
+upload, and update_model() (plus any follow-up extraction) is skipped.
+
+Rules are applied in order, literal or regex. A match must lie within one
+line, since chunks always end at a line break. Files are decoded with
+surrogate escapes, so bytes that are not valid text pass through unchanged.
+
+Usage:
+    from istari_edit import Rule, edit_model
+
+    rules = [Rule("maxValue : Real = 275.0", "maxValue : Real = 325.0"),
+             Rule(r"shall not exceed \\d+ lb", "shall not exceed 325 lb", regex=True)]
+    result = edit_model(client, model_id, rules)
+    if result.uploaded:
+        ...  # a new revision exists; re-run extraction
+"""
+import hashlib
+import re
+import shutil
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+
+from istari_artifact_store import get_store
+
+CHUNK_SIZE = 1024 * 1024  # characters per chunk, before completing the last line
+
+EditResult = namedtuple(
+    "EditResult", ["model_id", "replacements", "changed", "uploaded", "sha", "size", "path"]
+)
+
+
+class Rule:
+    """One find/replace; `regex=True` treats `find` as a pattern (re.sub syntax)."""
+
+    def __init__(self, find, replace, regex=False):
+        self.find = find
+        self.replace = replace
+        self.regex = regex
+        self._pattern = re.compile(find) if regex else None
+
+    def apply(self, text):
+        """Return (new text, number of replacements)."""
+        if self._pattern is not None:
+            return self._pattern.subn(self.replace, text)
+        count = text.count(self.find)
+        return (text.replace(self.find, self.replace), count) if count else (text, 0)
+
+    def __repr__(self):
+        kind = "regex" if self.regex else "literal"
+        return f"Rule({self.find!r} → {self.replace!r}, {kind})"
+
+
+def _chunks(f, chunk_size):
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk + f.readline()  # end every chunk on a line break
+
+
+def stream_edit(src_path, dst, rules, salt=None, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    """Apply rules from src_path into the binary file object `dst`.
+
+    Returns (replacements per rule, content hash of the output, bytes written).
+    """
+    counts = [0] * len(rules)
+    digest = hashlib.sha384()
+    size = 0
+    with open(src_path, encoding=encoding, errors="surrogateescape", newline="") as src:
+        for chunk in _chunks(src, chunk_size):
+            for i, rule in enumerate(rules):
+                chunk, n = rule.apply(chunk)
+                counts[i] += n
+            data = chunk.encode(encoding, errors="surrogateescape")
+            digest.update(data)
+            dst.write(data)
+            size += len(data)
+    if salt:
+        digest.update(salt.encode())
+    return counts, digest.hexdigest(), size
+
+
+def edit_model(client, model_id, rules, description=None, dry_run=False, store=None):
+    """Edit a model's current revision and upload it only if the bytes changed.
+
+    The source comes from the local artifact store. When the result differs
+    it is uploaded with update_model() and then kept in the store under its
+    new content hash, so reading the new revision does not download it again;
+    `path` in the result is that local copy.
+    """
+    store = store or get_store()
+    model = client.get_model(model_id)
+    revision = model.revision
+    token = revision.content_token
+    src_path = store.path(model)
+
+    # Write inside the store so the result can be renamed into place, under
+    # the revision's own file name, which update_model() uses for the new one
+    tmp_dir = Path(tempfile.mkdtemp(dir=store.root, prefix=".tmp-"))
+    tmp = tmp_dir / (Path(revision.name or "").name or "model")
+    try:
+        with open(tmp, "wb") as dst:
+            counts, sha, size = stream_edit(src_path, dst, rules, salt=token.salt)
+        changed = sha != token.sha
+        uploaded, path = False, None
+        if changed and not dry_run:
+            client.update_model(
+                model_id=model_id,
+                path=tmp,
+                description=description or "; ".join(f"{r.find} → {r.replace}" for r in rules),
+            )
+            uploaded = True
+            # Same salt as the previous revision, so `sha` is the new revision's token
+            path = store.adopt(tmp, sha)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return EditResult(model_id, counts, changed, uploaded, sha, size, path)
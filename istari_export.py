@@ -0,0 +1,381 @@
+"""Bulk export of a model's or a job's artifacts to a directory, zip or tar.
+
+Extraction jobs leave many small files behind: a Par-*.txt per paragraph of
+a Word document, four files per PowerPoint slide, a PNG per Cameo diagram.
+Reading them with one read_bytes() each waits out the request latency once
+per file. Here several download at once (through the artifact store and its
+shared connection pool) and each is written out as soon as it arrives:
+straight to disk a chunk at a time for a directory, or copied from the
+downloaded file into a zip or tar. No file is held in memory whole.
+
+A manifest records each file's path, original name, artifact and revision
+IDs, size, content hash and the job that produced it: manifest.json in a
+directory, <archive>.manifest.json next to an archive. While an export runs,
+each finished file is appended to a journal (manifest.jsonl), so running the
+same export again resumes it. Files whose revision is already exported are
+skipped, and only new or changed ones are downloaded. A zip or plain tar is
+appended to. A compressed tar, or an archive that can't be appended to (cut
+off mid-write, or with a file to replace), is rebuilt. Files already
+downloaded then come from the artifact store.
+
+Usage:
+    from istari_export import export_artifacts, select_artifacts
+
+    paragraphs = select_artifacts(client, model_id, match="Par-*.txt")
+    export_artifacts(paragraphs, "word-paragraphs/")                  # a directory
+    export_artifacts(select_artifacts(client, job_id=job.id), "run.zip")  # or .tar, .tar.gz
+
+    python istari_export.py --model-id <MODEL_ID> --out diagrams.zip --match "*.png"
+    python istari_export.py --job-id <JOB_ID> --out run-42/
+"""
+import argparse
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from pathlib import Path
+from time import perf_counter
+
+from istari_artifact_store import CHUNK_SIZE, _revision, get_store
+from istari_lineage import _created, _job_source
+from istari_pagination import iter_items
+from istari_throttle import retry_call
+
+MAX_WORKERS = 8
+MANIFEST = "manifest.json"
+
+# Archive suffix -> tarfile compression ("" for none); anything else is a directory
+_ARCHIVES = {".zip": None, ".tar": "", ".tar.gz": "gz", ".tgz": "gz", ".tar.bz2": "bz2", ".tar.xz": "xz"}
+
+# Already compressed: stored in a zip as they are
+_STORED = {".png", ".jpg", ".jpeg", ".gif", ".pdf", ".zip", ".gz", ".mdzip",
+           ".docx", ".pptx", ".xlsx", ".odp", ".ntop"}
+_ZIP_EPOCH = 315532800  # 1980-01-01, the earliest time a zip entry can carry
+
+Entry = namedtuple("Entry", "path name artifact_id revision_id size sha created job_id")
+
+ExportStats = namedtuple("ExportStats", "files exported skipped bytes seconds manifest")
+
+
+def select_artifacts(client, model_id=None, job_id=None, match=None, latest=False):
+    """A model's artifacts, or only those a job produced, oldest first.
+
+    `match` is a glob on the file name ("Par-*.txt"). With `latest`, only
+    the newest artifact of each name is kept (e.g. the views of the last
+    nTop run). A job's model is looked up when no model_id is given.
+    """
+    if model_id is None:
+        if job_id is None:
+            raise ValueError("Give a model_id, a job_id or both")
+        model_id = client.get_job(job_id).model_id
+    selected = []
+    for artifact in iter_items(client.list_model_artifacts, model_id):
+        revision = _revision(artifact)
+        if match and not fnmatch(revision.name, match):
+            continue
+        if job_id and _job_source(revision)[0] != job_id:
+            continue
+        selected.append(artifact)
+    selected.sort(key=lambda a: _created(_revision(a)))
+    if latest:
+        newest = {_revision(a).name: a for a in selected}
+        selected = [a for a in selected if newest[_revision(a).name] is a]
+    return selected
+
+
+def _entry(resource, path, size=None):
+    revision = _revision(resource)
+    return Entry(
+        path=path, name=revision.name,
+        artifact_id=resource.id if resource is not revision else None, revision_id=revision.id,
+        size=size if size is not None else getattr(revision, "size", None),
+        sha=revision.content_token.sha, created=_created(revision), job_id=_job_source(revision)[0],
+    )
+
+
+def _plan(resources, previous):
+    """An Entry per resource. A path exported before is kept for the same
+    artifact; a name several artifacts share gets the artifact's ID added."""
+    earlier = {e.artifact_id or e.revision_id: e.path for e in previous.values()}
+    owners = {path: key for key, path in earlier.items()}
+    owners[MANIFEST] = None
+    names = [Path(_revision(r).name.replace("\\", "/")).name or _revision(r).id for r in resources]
+    counts = Counter(names)
+    entries = []
+    for resource, name in zip(resources, names):
+        entry = _entry(resource, name)
+        key = entry.artifact_id or entry.revision_id
+        path = earlier.get(key)
+        if path is None:
+            path = name
+            if counts[name] > 1 or owners.get(path, key) != key:
+                stem, suffix = os.path.splitext(name)
+                path = f"{stem}-{key[:8]}{suffix}"
+            owners[path] = key
+        entries.append(entry._replace(path=path))
+    return entries
+
+
+class _Journal:
+    """Entries finished so far, one JSON line each, flushed as they are added."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    def load(self):
+        entries = {}
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                try:
+                    entry = Entry(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # a line cut off by an interrupted write
+                entries[entry.path] = entry
+        return entries
+
+    def add(self, entry):
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(entry._asdict()) + "\n")
+        self._file.flush()
+
+    def close(self, remove=False):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if remove:
+            self.path.unlink(missing_ok=True)
+
+
+def _load_manifest(path):
+    if not Path(path).exists():
+        return {}
+    return {e["path"]: Entry(**e) for e in json.loads(Path(path).read_text())["files"]}
+
+
+class _Directory:
+    """Files written into a directory by the workers, each through a temp file and a rename."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.manifest = self.root / MANIFEST
+        self.journal = self.root / "manifest.jsonl"
+        for stale in self.root.glob(".tmp-*"):  # left by an export that was killed
+            stale.unlink(missing_ok=True)
+
+    def start(self, paths, append=True):
+        return False  # files are replaced in place, so there is never a need to start over
+
+    def has(self, entry):
+        path = self.root / entry.path
+        return path.is_file() and path.stat().st_size == entry.size
+
+    def fetch(self, resource, entry, store):
+        """Stream a file to its place in the directory. Returns (bytes, None)."""
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in store.iter_chunks(resource):
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp, self.root / entry.path)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+        return size, None
+
+    def add(self, entry, source):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Archive:
+    """A zip or tar, written one entry at a time from downloaded files."""
+
+    def __init__(self, path, compression):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self.manifest = self.path.with_name(self.path.name + ".manifest.json")
+        self.journal = self.path.with_name(self.path.name + ".manifest.jsonl")
+        self._archive = None
+        # entry path -> size of what the archive already holds; None if there is none or it is cut off
+        self.sizes = self._members() if self.path.exists() else None
+
+    def _members(self):
+        """{path: size} of an existing archive, or None if it can't be read to the end."""
+        try:
+            if self.compression is None:
+                with zipfile.ZipFile(self.path) as archive:
+                    return {i.filename: i.file_size for i in archive.infolist()}
+            with tarfile.open(self.path, f"r:{self.compression}") as archive:
+                return {i.name: i.size for i in archive.getmembers()}
+        except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError):
+            return None
+
+    def start(self, paths, append=True):
+        """Open for writing `paths`. True if the archive is started over, not appended to."""
+        if not paths and append and self.sizes is not None:
+            return False  # nothing to add
+        append = (append and self.sizes is not None and self.compression in (None, "")
+                  and not (set(paths) & self.sizes.keys()))
+        if not append:
+            self.sizes = {}
+        if self.compression is None:
+            self._archive = zipfile.ZipFile(self.path, "a" if append else "w", zipfile.ZIP_DEFLATED)
+        else:
+            mode = "a" if append else f"w:{self.compression}"
+            self._archive = tarfile.open(self.path, mode)
+        return not append
+
+    def has(self, entry):
+        return self.sizes is not None and self.sizes.get(entry.path) == entry.size
+
+    def fetch(self, resource, entry, store):
+        """Download a file into the store. Returns (bytes, open file) for add().
+
+        The file is opened here, so the store evicting it before add() does not matter.
+        """
+        source = open(store.path(resource), "rb")
+        return os.fstat(source.fileno()).st_size, source
+
+    def add(self, entry, source):
+        with source:
+            mtime = datetime.fromisoformat(entry.created).timestamp() if entry.created else 0
+            if self.compression is None:
+                info = zipfile.ZipInfo(entry.path, datetime.fromtimestamp(max(mtime, _ZIP_EPOCH)).timetuple()[:6])
+                info.compress_type = (zipfile.ZIP_STORED if Path(entry.path).suffix.lower() in _STORED
+                                      else zipfile.ZIP_DEFLATED)
+                info.file_size = entry.size
+                with self._archive.open(info, "w") as out:
+                    shutil.copyfileobj(source, out, CHUNK_SIZE)
+            else:
+                info = tarfile.TarInfo(entry.path)
+                info.size, info.mode, info.mtime = entry.size, 0o644, mtime
+                self._archive.addfile(info, source)
+        self.sizes[entry.path] = entry.size
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()  # a zip's directory or a tar's end blocks: appendable next time
+            self._archive = None
+
+
+def _destination(out):
+    name = str(out).lower()
+    for suffix, compression in _ARCHIVES.items():
+        if name.endswith(suffix):
+            return _Archive(out, compression)
+    return _Directory(out)
+
+
+def export_artifacts(resources, out, max_workers=MAX_WORKERS, resume=True, source=None,
+                     progress=None, store=None):
+    """Write artifacts (or models, or revisions) to `out`: a directory, or a
+    .zip, .tar, .tar.gz, .tgz, .tar.bz2 or .tar.xz file.
+
+    Up to `max_workers` download at once; transient failures are retried.
+    `source` (e.g. {"model_id": ...}) is recorded in the manifest. With
+    `resume`, files already exported at the same revision are skipped.
+    `progress(entry)` is called as each file is written. Returns ExportStats.
+    """
+    start = perf_counter()
+    store = store or get_store()
+    destination = _destination(out)
+    journal = _Journal(destination.journal)
+    previous = {}
+    if resume:
+        previous = _load_manifest(destination.manifest)
+        previous.update(journal.load())
+    resources = list(resources)
+    entries = _plan(resources, previous)
+    finished, todo = {}, []
+    for resource, entry in zip(resources, entries):
+        earlier = previous.get(entry.path)
+        if earlier and earlier.revision_id == entry.revision_id and destination.has(earlier):
+            finished[entry.path] = earlier
+        else:
+            todo.append((resource, entry))
+    if destination.start([e.path for _, e in todo], append=resume):
+        finished, todo = {}, list(zip(resources, entries))
+    journal.path.unlink(missing_ok=True)  # started again with what the destination still holds
+    for entry in finished.values():
+        journal.add(entry)
+
+    written = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(retry_call, destination.fetch, r, e, store): e for r, e in todo}
+            try:
+                for future in as_completed(futures):
+                    size, data = future.result()
+                    entry = futures[future]._replace(size=size)
+                    destination.add(entry, data)
+                    journal.add(entry)
+                    finished[entry.path] = entry
+                    written += size
+                    if progress:
+                        progress(entry)
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                for future in futures:  # close files fetched but not added
+                    if future.done() and not future.cancelled() and not future.exception():
+                        data = future.result()[1]
+                        if data is not None:
+                            data.close()
+                raise
+    finally:
+        destination.close()
+        journal.close()
+
+    files = sorted(finished.values())
+    manifest = {
+        "exported": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **(source or {}),
+        "files": [e._asdict() for e in files],
+    }
+    tmp = destination.manifest.with_name(f".{destination.manifest.name}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2) + "\n")
+    os.replace(tmp, destination.manifest)
+    journal.close(remove=True)
+    return ExportStats(files=len(files), exported=len(todo), skipped=len(files) - len(todo),
+                       bytes=written, seconds=perf_counter() - start, manifest=destination.manifest)
+
+
+def main():
+    from istari_client import get_client
+
+    parser = argparse.ArgumentParser(description="Export a model's or a job's artifacts to a directory, zip or tar")
+    parser.add_argument("--model-id", default=None, help="Model whose artifacts to export")
+    parser.add_argument("--job-id", default=None, help="Only the artifacts this job produced")
+    parser.add_argument("--out", required=True, help="Directory, or a .zip / .tar / .tar.gz file")
+    parser.add_argument("--match", default=None, help='Only file names matching this glob, e.g. "Par-*.txt"')
+    parser.add_argument("--latest", action="store_true", help="Only the newest artifact of each name")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"Downloads at once (default: {MAX_WORKERS})")
+    parser.add_argument("--restart", action="store_true", help="Export everything again instead of resuming")
+    args = parser.parse_args()
+    if not args.model_id and not args.job_id:
+        parser.error("give --model-id, --job-id or both")
+
+    artifacts = select_artifacts(get_client(), args.model_id, args.job_id, args.match, args.latest)
+    source = {k: v for k, v in [("model_id", args.model_id), ("job_id", args.job_id)] if v}
+    stats = export_artifacts(artifacts, args.out, args.workers, resume=not args.restart, source=source,
+                             progress=lambda e: print(f"  {e.path} ({e.size:,} bytes)"))
+    print(f"{stats.files} file(s) in {args.out}: {stats.exported} exported "
+          f"({stats.bytes / 1024 / 1024:.1f} MB), {stats.skipped} already there; "
+          f"{stats.seconds:.1f} s. Manifest: {stats.manifest}")
+
+
+if __name__ == "__main__":
+    main()
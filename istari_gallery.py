@@ -0,0 +1,227 @@
+"""Galleries of rendered views: fetched in parallel, shown as cached thumbnails.
+
+Extraction and nTop jobs render each model as PNG views (iso, top, front,
+...), hundreds of KB to a few MB apiece. Reading them one after another and
+inlining them at full size makes a notebook slow to run and heavy to save.
+Here all the views of a gallery are fetched at once (through the artifact
+store), each is downscaled once, and the grid is rendered from the
+thumbnails, each linking to its full-resolution image.
+
+Thumbnails are cached on disk keyed by revision ID and size. Revisions are
+immutable, so a re-run neither downloads nor re-encodes anything; with a
+`link`, not even the originals the store has since evicted. Pillow is
+optional: without it the full images are inlined at thumbnail width.
+
+Usage:
+    from istari_gallery import view_artifacts, gallery_html
+
+    views = view_artifacts(model.artifacts, ["iso", "top", "front", "right"])
+    display(HTML(gallery_html(views)))                      # links to the local full-size files
+    display(HTML(gallery_html(views, link=lambda a: f"{UI_URL}/files/{model.id}")))
+
+    python istari_gallery.py <model_id> --out gallery.html  # every PNG view of a model
+
+Settings (environment):
+    ISTARI_THUMBNAIL_CACHE  Thumbnail directory (default: ~/.cache/istari/thumbnails)
+"""
+import argparse
+import base64
+import html
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from istari_artifact_store import _revision, get_store
+
+try:
+    from PIL import Image
+except ImportError:  # thumbnails fall back to the full images
+    Image = None
+
+DEFAULT_ROOT = Path.home() / ".cache" / "istari" / "thumbnails"
+THUMBNAIL_PX = 320
+MAX_WORKERS = 8
+
+# Views rendered by the CAD and nTop integrations, in display order
+VIEWS = ["iso", "top", "front", "right", "left", "back", "bottom"]
+
+_MIME = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".gif": "image/gif"}
+
+
+def view_artifacts(artifacts, names=VIEWS, suffix=".png"):
+    """Return {view name: artifact} for the latest artifact of each named view (None if absent)."""
+    views = {}
+    for artifact in reversed(list(artifacts)):
+        name = _revision(artifact).name
+        if name.lower().endswith(suffix):
+            view = name[:-len(suffix)]
+            if view in names and view not in views:
+                views[view] = artifact
+    return {view: views.get(view) for view in names}
+
+
+class Thumbnail:
+    """A downscaled image and where its full-resolution original is.
+
+    `locate()` gives the original's path; it is called (and the original
+    downloaded, if the store no longer has it) only when full_path is read.
+    """
+
+    def __init__(self, data, mime, locate, width=None):
+        self.data = data
+        self.mime = mime
+        self.width = width
+        self._locate = locate
+        self._full_path = None
+
+    @property
+    def full_path(self):
+        if self._full_path is None:
+            self._full_path = self._locate()
+        return self._full_path
+
+    def data_uri(self):
+        return f"data:{self.mime};base64,{base64.b64encode(self.data).decode()}"
+
+
+class ThumbnailCache:
+    """On-disk thumbnails, one file per (revision ID, size).
+
+    Originals come from the artifact store, so the full-resolution files are
+    on local disk too.
+    """
+
+    def __init__(self, root=None, size=THUMBNAIL_PX, store=None):
+        self.root = Path(root or os.getenv("ISTARI_THUMBNAIL_CACHE") or DEFAULT_ROOT)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.size = size
+        self.store = store or get_store()
+        self.hits = 0
+        self.misses = 0
+
+    def thumbnail(self, resource):
+        """Return a resource's Thumbnail, downloading and downscaling on a miss.
+
+        A cached thumbnail is returned without touching the original.
+        """
+        revision = _revision(resource)
+        path = self.root / f"{revision.id}-{self.size}.jpg"
+        if Image is not None and path.exists():
+            self.hits += 1
+            return Thumbnail(path.read_bytes(), "image/jpeg", lambda: self.store.path(resource))
+        full_path = self.store.path(resource)
+        if Image is None:
+            mime = _MIME.get(Path(revision.name).suffix.lower(), "image/png")
+            return Thumbnail(full_path.read_bytes(), mime, lambda: full_path, self.size)
+        self.misses += 1
+        data = self._downscale(full_path)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return Thumbnail(data, "image/jpeg", lambda: full_path)
+
+    def _downscale(self, path):
+        with Image.open(path) as image:
+            image.thumbnail((self.size, self.size))
+            if image.mode in ("RGBA", "LA", "P"):  # flatten transparency onto white for JPEG
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, "white")
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            out = io.BytesIO()
+            image.convert("RGB").save(out, "JPEG", quality=85, optimize=True)
+            return out.getvalue()
+
+    def fetch(self, resources, max_workers=MAX_WORKERS, full_paths=False):
+        """Thumbnails of many resources at once; None where one can't be read.
+
+        With `full_paths`, each original is located (downloaded if need be) in
+        the same parallel pass.
+        """
+        def get(resource):
+            try:
+                thumb = self.thumbnail(resource)
+                if full_paths:
+                    thumb.full_path
+                return thumb
+            except Exception:
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(get, resources))
+
+
+_default_cache = None
+
+
+def get_thumbnail_cache():
+    """Return the process-wide thumbnail cache configured from the environment."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ThumbnailCache()
+    return _default_cache
+
+
+def gallery_html(views, columns=2, link=None, cache=None, max_width=600):
+    """HTML grid of thumbnails for {label: artifact}, each linking to its full image.
+
+    `link(artifact)` gives each image's link; by default the full-resolution
+    file in the local artifact store. Missing or unreadable views are shown as
+    "(label unavailable)".
+    """
+    cache = cache or get_thumbnail_cache()
+    labels = list(views)
+    thumbnails = cache.fetch([views[label] for label in labels if views[label] is not None],
+                             full_paths=link is None)
+    thumbnails = iter(thumbnails)
+    cells = []
+    for label in labels:
+        thumb = next(thumbnails) if views[label] is not None else None
+        title = html.escape(label.capitalize() if label.islower() else label)
+        if thumb is None:
+            cells.append(f'<div style="text-align: center; color: #94a3b8; padding: 40px;">({title} unavailable)</div>')
+            continue
+        href = link(views[label]) if link else thumb.full_path.as_uri()
+        width = f' width="{thumb.width}"' if thumb.width else ""
+        cells.append(f'''
+            <div style="text-align: center;">
+                <a href="{html.escape(href)}" target="_blank"><img src="{thumb.data_uri()}"{width}
+                   style="max-width: 100%; border-radius: 4px; border: 1px solid #e2e8f0;"></a>
+                <div style="font-size: 12px; color: #64748b; margin-top: 4px;">{title}</div>
+            </div>''')
+    return f'''
+    <div style="display: grid; grid-template-columns: repeat({columns}, 1fr); gap: 12px; max-width: {max_width}px;
+                margin: 20px 0; background: #f8fafc; padding: 12px; border-radius: 8px;">{"".join(cells)}
+    </div>
+    '''
+
+
+def main():
+    from istari_client import get_client
+
+    parser = argparse.ArgumentParser(description="Write an HTML gallery of a model's rendered views")
+    parser.add_argument("model_id", help="Model whose PNG artifacts to show")
+    parser.add_argument("--out", default="gallery.html", help="HTML file to write (default: gallery.html)")
+    parser.add_argument("--size", type=int, default=THUMBNAIL_PX, help=f"Thumbnail size in px (default: {THUMBNAIL_PX})")
+    parser.add_argument("--columns", type=int, default=2, help="Images per row (default: 2)")
+    args = parser.parse_args()
+
+    model = get_client().get_model(args.model_id)
+    pngs = [a for a in model.artifacts if _revision(a).name.lower().endswith(".png")]
+    others = sorted({_revision(a).name[:-4] for a in pngs} - set(VIEWS))
+    views = {name: a for name, a in view_artifacts(pngs, VIEWS + others).items() if a is not None}
+    cache = ThumbnailCache(size=args.size)
+    page = gallery_html(views, columns=args.columns, cache=cache, max_width=args.columns * (args.size + 24))
+    Path(args.out).write_text(f"<!doctype html>\n<html><body>{page}</body></html>\n")
+    full = sum(_revision(a).size or 0 for a in views.values())
+    print(f"{len(views)} view(s) -> {args.out} ({Path(args.out).stat().st_size / 1024:.0f} KB; "
+          f"full images {full / 1024:.0f} KB)")
+    print(f"Thumbnails: {cache.hits} cached, {cache.misses} new"
+          + ("" if Image else " (Pillow not installed: full images inlined)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Shared job monitoring for Istari jobs.
+
+One JobWatcher polls any number of jobs from a single loop. Each job is
+polled on its own adaptive schedule: quickly right after submission or a
+status change, then backing off exponentially up to a cap. Once a function
+has been seen to finish, later jobs of that function skip most of the polls
+they would spend waiting for a run of known length.
+
+Usage:
+    from istari_jobs import JobWatcher, monitor_job
+
+    # One job, printing status changes (drop-in for the old monitor_job loops)
+    job = monitor_job(client, job.id, "Extraction")
+
+    # Many jobs from one poller
+    watcher = JobWatcher(client)
+    for job in jobs:
+        watcher.watch(job.id, function="@ntop:run_model")
+    finished = watcher.wait()
+
+    # asyncio: status transitions as they happen
+    async for change in watcher.transitions():
+        print(change.job_id, change.old, "→", change.new)
+"""
+import asyncio
+import statistics
+from collections import defaultdict, deque, namedtuple
+from datetime import datetime
+from time import monotonic, sleep
+
+from istari_digital_client import JobStatusName
+
+TERMINAL_STATUSES = {JobStatusName.COMPLETED, JobStatusName.FAILED, JobStatusName.CANCELED}
+
+Transition = namedtuple("Transition", ["job_id", "old", "new", "job"])
+
+
+class _Tracked:
+    """Polling state for one watched job."""
+
+    def __init__(self, job_id, function, description, interval):
+        self.job_id = job_id
+        self.function = function
+        self.description = description or job_id[:8]
+        self.interval = interval
+        self.started = monotonic()
+        self.next_poll = self.started + interval
+        self.status = None
+        self.status_since = self.started
+        self.status_times = defaultdict(float)  # status -> seconds observed
+        self.job = None
+        self.polls = 0
+
+
+class JobWatcher:
+    """Track many jobs from one poller with adaptive intervals.
+
+    min_interval/max_interval bound the poll period; each unchanged poll
+    multiplies a job's period by `backoff`. Durations of finished jobs are
+    kept per function and used to hold off polling until a new job of that
+    function is close to its expected finish.
+    """
+
+    # Observed total run times per function, shared by all watchers in the process
+    durations_by_function = defaultdict(lambda: deque(maxlen=20))
+
+    def __init__(self, client, min_interval=1.0, max_interval=30.0, backoff=1.6):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jobs = {}
+        self.api_calls = 0
+
+    def watch(self, job_id, function=None, description=None):
+        """Start tracking a job. `function` enables duration-based tuning."""
+        if job_id not in self.jobs:
+            self.jobs[job_id] = _Tracked(job_id, function, description, self.min_interval)
+        return self.jobs[job_id]
+
+    def expected_duration(self, function):
+        """Median observed run time of a function, or None if never seen."""
+        history = self.durations_by_function.get(function)
+        return statistics.median(history) if history else None
+
+    def _schedule(self, tracked, changed):
+        now = monotonic()
+        if changed:
+            tracked.interval = self.min_interval
+        else:
+            tracked.interval = min(self.max_interval, tracked.interval * self.backoff)
+        delay = tracked.interval
+        expected = self.expected_duration(tracked.function)
+        if expected:
+            # Skip ahead while the job is well short of its usual run time
+            remaining = expected * 0.8 - (now - tracked.started)
+            delay = max(delay, min(remaining, self.max_interval))
+        tracked.next_poll = now + delay
+
+    def poll_due(self):
+        """Poll every job whose next poll time has come; return the transitions."""
+        now = monotonic()
+        changes = []
+        for tracked in list(self.jobs.values()):
+            if tracked.status in TERMINAL_STATUSES or tracked.next_poll > now:
+                continue
+            job = self.client.get_job(tracked.job_id)
+            self.api_calls += 1
+            tracked.polls += 1
+            tracked.job = job
+            status = job.status.name
+            changed = status != tracked.status
+            if changed:
+                seen = monotonic()
+                if tracked.status is not None:
+                    tracked.status_times[tracked.status] += seen - tracked.status_since
+                changes.append(Transition(tracked.job_id, tracked.status, status, job))
+                tracked.status, tracked.status_since = status, seen
+                if status in TERMINAL_STATUSES:
+                    # A finished job has added artifacts; drop stale cached models
+                    invalidate = getattr(self.client, "cache_invalidate", None)
+                    if invalidate:
+                        invalidate("model", "artifact")
+                    if status == JobStatusName.COMPLETED and tracked.function:
+                        self.durations_by_function[tracked.function].append(
+                            seen - tracked.started
+                        )
+                    continue
+            self._schedule(tracked, changed)
+        return changes
+
+    def _pending(self, job_ids):
+        return [
+            self.jobs[job_id] for job_id in job_ids
+            if self.jobs[job_id].status not in TERMINAL_STATUSES
+        ]
+
+    def _sleep_time(self, pending):
+        return max(0.0, min(t.next_poll for t in pending) - monotonic())
+
+    def wait(self, job_ids=None, timeout=None, on_change=None):
+        """Block until the given jobs (default: all watched) finish.
+
+        `on_change` is called with each Transition. Returns {job_id: job}.
+        """
+        job_ids = list(job_ids or self.jobs)
+        deadline = monotonic() + timeout if timeout else None
+        while True:
+            for change in self.poll_due():
+                if on_change and change.job_id in job_ids:
+                    on_change(change)
+            pending = self._pending(job_ids)
+            if not pending:
+                return {job_id: self.jobs[job_id].job for job_id in job_ids}
+            if deadline and monotonic() >= deadline:
+                raise TimeoutError(f"{len(pending)} job(s) still running after {timeout}s")
+            sleep(self._sleep_time(pending))
+
+    async def transitions(self, job_ids=None):
+        """Async generator of Transitions until the given jobs finish."""
+        job_ids = list(job_ids or self.jobs)
+        while True:
+            for change in await asyncio.to_thread(self.poll_due):
+                if change.job_id in job_ids:
+                    yield change
+            pending = self._pending(job_ids)
+            if not pending:
+                return
+            await asyncio.sleep(self._sleep_time(pending))
+
+    def status_durations(self, job_id):
+        """Seconds a job spent in each status.
+
+        Uses the server's status history timestamps when available, falling
+        back to what this watcher observed between polls.
+        """
+        tracked = self.jobs[job_id]
+        history = getattr(tracked.job, "status_history", None) or []
+        stamped = [s for s in history if getattr(s, "created", None)]
+        if len(stamped) >= 2:
+            stamped.sort(key=lambda s: s.created)
+            times = defaultdict(float)
+            for current, following in zip(stamped, stamped[1:]):
+                times[current.name.value] += (following.created - current.created).total_seconds()
+            return dict(times)
+        times = {status.value: secs for status, secs in tracked.status_times.items()}
+        if tracked.status is not None and tracked.status not in TERMINAL_STATUSES:
+            times[tracked.status.value] = times.get(tracked.status.value, 0.0) + (
+                monotonic() - tracked.status_since
+            )
+        return times
+
+
+def job_artifacts(model, job_id):
+    """Artifacts of a model whose latest revision was produced by the given job."""
+    found = []
+    for artifact in model.artifacts:
+        revisions = artifact.file.revisions if artifact.file else None
+        if not revisions:
+            continue
+        for source in revisions[-1].sources or []:
+            if source.resource_type == "Job" and source.resource_id == job_id:
+                found.append(artifact)
+                break
+    return found
+
+
+def monitor_job(client, job_id, description="Job", function=None, watcher=None):
+    """Wait for one job, printing each status change. Returns the final job."""
+    watcher = watcher or JobWatcher(client)
+    watcher.watch(job_id, function=function, description=description)
+
+    def report(change):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        print(f"  [{timestamp}] {description}: {change.new.value}")
+
+    return watcher.wait([job_id], on_change=report)[job_id]
@@ -0,0 +1,296 @@
+"""Read selected parts of large JSON artifacts without loading the whole document.
+
+`json.loads(read_text(artifact))` holds the file's text and its whole object
+tree in memory at once, and extraction outputs run to hundreds of MB. Here
+the file is read a chunk at a time (from the artifact store, or as it
+downloads) and parsed incrementally. Containers on the way to a selected
+path are walked without being built, everything else is skipped, and only
+the selected subtrees are decoded (by the json module's C decoder). Memory
+stays at about one chunk plus the largest selected value. When every path
+is literal, reading stops as soon as all of them have been found.
+
+A path is a dotted string ("range_mission.range_nm") or a sequence of
+segments (for keys that contain dots). A segment is an object key, an array
+index, "*" for any member, or a glob such as "Requirements::*".
+
+Usage:
+    from istari_json_stream import iter_json, load_json, select_json
+
+    mission = select_json(artifact, "range_mission")                  # one subtree
+    metrics = load_json(artifact, "range_mission", "mass_properties")  # the document, pruned
+    for path, req in iter_json(artifact, "'Complex Drone System'::Requirements::*"):
+        print(path[0], req["description"])
+
+    python istari_json_stream.py <artifact_id or file> range_mission
+"""
+import argparse
+import codecs
+import json
+import os
+import re
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+from istari_artifact_store import CHUNK_SIZE, get_store
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# A string, its closing quote missing if the buffer ends first
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(?P<close>")?')
+# Everything up to the next bracket outside a string; then the bracket, or the
+# quote of a string the buffer cuts off, or nothing at the end of the buffer.
+# Unrolled, so it doesn't backtrack; possessive quantifiers would need Python 3.11.
+_TO_BRACKET = re.compile(r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*([\[\]{}"]?)')
+_SCALAR = re.compile(r"[^\s,\]}]+")
+_MISSING = object()
+
+
+def _chunks(source, chunk_size):
+    """Byte chunks of a resource (through the artifact store), a file, bytes, or an iterable."""
+    if hasattr(source, "content_token") or hasattr(source, "revision"):
+        return get_store().iter_chunks(source, chunk_size)
+    if isinstance(source, (str, os.PathLike)):
+        return _file_chunks(Path(source), chunk_size)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return (source[i:i + chunk_size] for i in range(0, len(source), chunk_size))
+    return iter(source)
+
+
+def _file_chunks(path, chunk_size):
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def _segments(path):
+    if isinstance(path, str):
+        return tuple(path.split(".")) if path else ()
+    return tuple(str(segment) for segment in path)
+
+
+def _matches(segment, key):
+    key = str(key)
+    if segment == "*" or segment == key:
+        return True
+    return any(c in segment for c in "*?[") and fnmatchcase(key, segment)
+
+
+class _Reader:
+    """A sliding window of decoded text over a stream of byte chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self):
+        """Append the next chunk, dropping text before `pos`. False at the end."""
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self.decoder.decode(b"", final=True)
+        else:
+            text = chunk if isinstance(chunk, str) else self.decoder.decode(chunk)
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def _error(self, message):
+        return ValueError(f"{message} near {self.buf[self.pos:self.pos + 40]!r}")
+
+    def peek(self):
+        """The next non-whitespace character ("" at the end)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self._error(f"Expected {char!r}")
+        self.pos += 1
+
+    def string(self):
+        """Read a string at `pos`, e.g. an object key."""
+        while True:
+            m = _STRING.match(self.buf, self.pos)
+            if m and m.group("close"):
+                self.pos = m.end()
+                text = m.group()
+                return text[1:-1] if "\\" not in text else json.loads(text)
+            if not self.more():
+                raise self._error("Unterminated string")
+
+    def skip(self):
+        """Move past the value at `pos` without building it."""
+        char = self.peek()
+        if char == '"':
+            self.string()
+        elif char in "[{":
+            depth = 0
+            while True:
+                m = _TO_BRACKET.match(self.buf, self.pos)
+                bracket = m.group(1)
+                if bracket and bracket in "[{":
+                    depth += 1
+                elif bracket and bracket != '"':
+                    depth -= 1
+                    if depth == 0:
+                        self.pos = m.end()
+                        return
+                else:  # the buffer ends, maybe inside a string: read on from there
+                    self.pos = m.start(1)
+                    if not self.more():
+                        raise self._error("Unexpected end of JSON")
+                    continue
+                self.pos = m.end()
+        else:
+            while True:
+                m = _SCALAR.match(self.buf, self.pos)
+                if m is None:
+                    raise self._error("Expected a value")
+                if m.end() < len(self.buf) or not self.more():
+                    self.pos = m.end()
+                    return
+
+    def decode(self):
+        """Build the value at `pos`, reading on until the whole of it is buffered."""
+        if self.peek() not in '"[{':  # buffer all of a number, which may go on in the next chunk
+            while _SCALAR.match(self.buf, self.pos).end() == len(self.buf) and self.more():
+                pass
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Double what is buffered, so a large value is re-decoded only a few times
+            target = 2 * (len(self.buf) - self.pos) + 1
+            while len(self.buf) - self.pos < target and self.more():
+                pass
+
+    def walk(self, path, selectors):
+        """Yield (path, value) for each selected value inside the value at `pos`."""
+        depth = len(path)
+        if any(len(selector) == depth for selector in selectors):
+            yield path, self.decode()
+            return
+        char = self.peek()
+        if char not in "[{":
+            self.skip()  # a scalar where the paths go deeper
+            return
+        self.pos += 1
+        closing = "}" if char == "{" else "]"
+        if self.peek() == closing:
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            if char == "{":
+                if self.peek() != '"':
+                    raise self._error("Expected a key")
+                key = self.string()
+                self.expect(":")
+            else:
+                key = index
+                index += 1
+            inner = [selector for selector in selectors if _matches(selector[depth], key)]
+            if inner:
+                yield from self.walk(path + (key,), inner)
+            else:
+                self.skip()
+            separator = self.peek()
+            self.pos += 1
+            if separator == closing:
+                return
+            if separator != ",":
+                self.pos -= 1
+                raise self._error(f"Expected ',' or {closing!r}")
+
+
+def iter_json(source, *paths, chunk_size=CHUNK_SIZE):
+    """Yield (path, value) for each value at one of `paths`, in document order.
+
+    `source` is an artifact, model or revision (read through the artifact
+    store), a file path, bytes, or an iterable of byte chunks. Without paths
+    the whole document is the one value. A value inside another selected
+    value is not yielded separately.
+    """
+    selectors = [_segments(path) for path in paths] or [()]
+    literal = all(not any(c in s for s in selector for c in "*?[") for selector in selectors)
+    remaining = set(selectors)
+    reader = _Reader(_chunks(source, chunk_size))
+    if reader.peek() == "":
+        raise ValueError("Empty JSON document")
+    for path, value in reader.walk((), selectors):
+        yield path, value
+        if literal:
+            remaining.discard(tuple(str(key) for key in path))
+            if not remaining:
+                return  # everything asked for is found: read no further
+
+
+def select_json(source, path, default=_MISSING, chunk_size=CHUNK_SIZE):
+    """The first value at `path`; `default` (or KeyError) if there is none."""
+    for _, value in iter_json(source, path, chunk_size=chunk_size):
+        return value
+    if default is _MISSING:
+        raise KeyError(path)
+    return default
+
+
+def load_json(source, *paths, chunk_size=CHUNK_SIZE):
+    """The document cut down to the subtrees at `paths` (all of it without paths).
+
+    Objects keep only the selected keys; arrays keep only their selected
+    elements, in order. Code that indexes the full document by those paths
+    works unchanged on the result.
+    """
+    root = _MISSING
+    last_index = {}  # id(list) -> source index of its last element
+    for path, value in iter_json(source, *paths, chunk_size=chunk_size):
+        if not path:
+            return value
+        if root is _MISSING:
+            root = [] if isinstance(path[0], int) else {}
+        node = root
+        for key, following in zip(path, path[1:] + (None,)):
+            child = value if following is None else ([] if isinstance(following, int) else {})
+            if isinstance(node, list):
+                if node and last_index.get(id(node)) == key and following is not None:
+                    node = node[-1]
+                    continue
+                node.append(child)
+                last_index[id(node)] = key
+            else:
+                child = node.setdefault(key, child)
+            node = child
+    return {} if root is _MISSING else root
+
+
+def main():
+    from istari_client import get_client
+
+    parser = argparse.ArgumentParser(description="Print parts of a large JSON artifact or file")
+    parser.add_argument("source", help="Artifact ID, or a local JSON file")
+    parser.add_argument("paths", nargs="*", help='Paths to print, e.g. range_mission or "texts.*.text"')
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many values")
+    args = parser.parse_args()
+
+    source = args.source if Path(args.source).exists() else get_client().get_artifact(args.source)
+    for count, (path, value) in enumerate(iter_json(source, *args.paths), 1):
+        print(f"{'.'.join(str(key) for key in path) or '(document)'}: {json.dumps(value, indent=2)}")
+        if args.limit and count >= args.limit:
+            break
+
+
+if __name__ == "__main__":
+    main()
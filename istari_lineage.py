@@ -0,0 +1,212 @@
+"""Local provenance index: which job produced which artifact revision.
+
+Finding the outputs of a job by scanning every artifact of a model (and
+every revision's `sources`) costs time in proportion to the model's history.
+This module keeps the artifact → revision → source job → input model lineage
+(see docs/model_lineage.md) in a local SQLite index. Lookups are index
+seeks, so their cost does not grow with the history.
+
+sync() lists the model's artifacts newest first and stops at the first one
+already indexed, so after the first build it fetches only new artifacts,
+usually a single page. A job that only added revisions to older artifacts
+(a re-extraction) is not on those pages: job_outputs() looks for a job's
+outputs with that incremental sync and, only if it finds none, lists every
+artifact once and indexes the ones whose latest revision changed.
+
+Usage:
+    from istari_lineage import get_lineage
+
+    lineage = get_lineage()
+    lineage.sync(client, model_id)
+    lineage.outputs(job_id)                       # artifacts a job produced
+    lineage.job_outputs(client, model_id, job_id) # the same, syncing only if needed
+    lineage.latest(model_id, "grp3-uas_v6_aerodeck_metrics.json")
+    lineage.source_job(revision_id)               # who produced this revision
+
+    python istari_lineage.py --model-id <MODEL_ID> --job-id <JOB_ID>
+
+Settings (environment):
+    ISTARI_LINEAGE_INDEX  Index file (default: ~/.cache/istari/lineage.sqlite)
+"""
+import argparse
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from pathlib import Path
+from time import time
+
+from istari_pagination import iter_items
+
+DEFAULT_INDEX = Path.home() / ".cache" / "istari" / "lineage.sqlite"
+
+Output = namedtuple(
+    "Output", "artifact_id revision_id name created job_id model_id input_revision_id"
+)
+
+_COLUMNS = "artifact_id, revision_id, name, created, job_id, model_id, input_revision_id"
+
+
+def _created(resource):
+    created = getattr(resource, "created", None)
+    return created.isoformat() if hasattr(created, "isoformat") else str(created or "")
+
+
+def _job_source(revision):
+    """(job ID, input revision ID) from a revision's sources, or (None, None)."""
+    for source in getattr(revision, "sources", None) or []:
+        if source.resource_type == "Job":
+            return source.resource_id, getattr(source, "revision_id", None)
+    return None, None
+
+
+class LineageIndex:
+    """SQLite index of artifact revisions and the jobs that produced them."""
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.getenv("ISTARI_LINEAGE_INDEX") or DEFAULT_INDEX)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # one job_outputs() sync at a time
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS revisions ("
+            " revision_id TEXT PRIMARY KEY, artifact_id TEXT, model_id TEXT, name TEXT,"
+            " created TEXT, job_id TEXT, input_revision_id TEXT);"
+            "CREATE INDEX IF NOT EXISTS revisions_job ON revisions (job_id);"
+            "CREATE INDEX IF NOT EXISTS revisions_name ON revisions (model_id, name, created);"
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            " artifact_id TEXT PRIMARY KEY, model_id TEXT, latest_revision_id TEXT);"
+            "CREATE TABLE IF NOT EXISTS models ("
+            " model_id TEXT PRIMARY KEY, synced REAL, artifacts INTEGER);"
+        )
+        self._db.commit()
+
+    def sync(self, client, model_id, full=False):
+        """Index the artifacts added since the last sync. Returns how many were indexed.
+
+        With `full`, every artifact is listed and those with a new latest
+        revision are indexed again.
+        """
+        with self._lock:
+            indexed = dict(self._db.execute(
+                "SELECT artifact_id, latest_revision_id FROM artifacts WHERE model_id = ?", (model_id,)
+            ))
+        rows, artifacts = [], []
+        for artifact in iter_items(client.list_model_artifacts, model_id, sort="-created",
+                                   prefetch=full):
+            if not full and artifact.id in indexed:
+                break
+            revisions = artifact.file.revisions if artifact.file else None
+            if not revisions or indexed.get(artifact.id) == revisions[-1].id:
+                continue
+            artifacts.append((artifact.id, model_id, revisions[-1].id))
+            for revision in revisions:
+                job_id, input_revision_id = _job_source(revision)
+                rows.append((revision.id, artifact.id, model_id, revision.name, _created(revision),
+                             job_id, input_revision_id))
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO revisions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.executemany("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?)", artifacts)
+            count = self._db.execute(
+                "SELECT COUNT(*) FROM artifacts WHERE model_id = ?", (model_id,)
+            ).fetchone()[0]
+            self._db.execute("INSERT OR REPLACE INTO models VALUES (?, ?, ?)", (model_id, time(), count))
+            self._db.commit()
+        return len(artifacts)
+
+    def job_outputs(self, client, model_id, job_id, name=None):
+        """outputs() of a finished job, syncing the model only if they are not indexed yet.
+
+        Callers wait for one another, so jobs that finish together share a
+        sync. A full sync is made only when an incremental one finds nothing.
+        """
+        with self._sync_lock:
+            found = self.outputs(job_id, name)
+            if not found:
+                self.sync(client, model_id)
+                found = self.outputs(job_id, name)
+            if not found:
+                self.sync(client, model_id, full=True)
+                found = self.outputs(job_id, name)
+            return found
+
+    def _select(self, where, params, limit=None):
+        query = f"SELECT {_COLUMNS} FROM revisions WHERE {where}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [Output(*row) for row in self._db.execute(query, params)]
+
+    def outputs(self, job_id, name=None):
+        """Artifact revisions produced by a job, optionally only those named `name`."""
+        if name is None:
+            return self._select("job_id = ? ORDER BY name", (job_id,))
+        return self._select("job_id = ? AND name = ?", (job_id, name))
+
+    def latest(self, model_id, name):
+        """The newest artifact revision called `name` on a model, or None."""
+        found = self._select("model_id = ? AND name = ? ORDER BY created DESC", (model_id, name), limit=1)
+        return found[0] if found else None
+
+    def source_job(self, revision_id):
+        """The Output row for a revision (its job_id is None if no job produced it), or None."""
+        found = self._select("revision_id = ?", (revision_id,))
+        return found[0] if found else None
+
+    def stats(self):
+        with self._lock:
+            revisions, jobs = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT job_id) FROM revisions"
+            ).fetchone()
+            models = self._db.execute("SELECT COUNT(*) FROM models").fetchone()[0]
+        return {"models": models, "revisions": revisions, "jobs": jobs}
+
+
+_default_index = None
+
+
+def get_lineage():
+    """Return the process-wide index configured from the environment."""
+    global _default_index
+    if _default_index is None:
+        _default_index = LineageIndex()
+    return _default_index
+
+
+def main():
+    from istari_client import get_client
+
+    parser = argparse.ArgumentParser(description="Sync and query the local provenance index")
+    parser.add_argument("--model-id", required=True, help="Model to sync")
+    parser.add_argument("--job-id", default=None, help="List the artifacts this job produced")
+    parser.add_argument("--name", default=None, help="Show the latest artifact with this file name")
+    parser.add_argument("--revision-id", default=None, help="Show which job produced this revision")
+    parser.add_argument("--full", action="store_true", help="List every artifact, to pick up new revisions of older ones")
+    args = parser.parse_args()
+
+    client = get_client()
+    lineage = get_lineage()
+    new = lineage.sync(client, args.model_id, full=args.full)
+    print(f"Synced {args.model_id}: {new} new or updated artifact(s); index: {lineage.stats()}")
+
+    if args.job_id:
+        outputs = lineage.outputs(args.job_id)
+        print(f"\nJob {args.job_id} produced {len(outputs)} artifact revision(s):")
+        for out in outputs:
+            print(f"  - {out.name}  (artifact {out.artifact_id}, revision {out.revision_id})")
+    if args.name:
+        out = lineage.latest(args.model_id, args.name)
+        print(f"\nLatest {args.name}: " + (f"artifact {out.artifact_id} from job {out.job_id} ({out.created})"
+                                         if out else "not found"))
+    if args.revision_id:
+        out = lineage.source_job(args.revision_id)
+        if out is None:
+            print(f"\nRevision {args.revision_id} is not in the index")
+        else:
+            print(f"\nRevision {args.revision_id}: {out.name}, job {out.job_id or '(none)'}, "
+                  f"input model {out.model_id}, input revision {out.input_revision_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,715 @@
+"""Local stand-in for the Istari registry and file service.
+
+LocalIstari answers the client calls these examples make (systems,
+configurations, snapshots, tags, revisions, models, artifacts, jobs and
+access) from a seeded in-memory dataset, so scripts can be run, timed and
+regression-tested without demo.istari.app. Every call waits a configurable
+latency and is counted. Jobs finish after a set time with plausible outputs:
+nTop runs return the example aerodeck files, and SysML extraction runs
+istari_sysml.py on the model.
+
+The dataset always contains the "Check Design Meets Requirements" system,
+using the same IDs as the notebooks, with the example SysML model and nTop
+results. Seeded filler systems are added on top of it. Filler file contents
+are generated from the seed when read, and their content tokens are synthetic.
+
+Point get_client() at it with a local:// registry URL:
+
+    ISTARI_DIGITAL_REGISTRY_URL=local://?latency_ms=25&systems=40&seed=7
+    python getting-started/01_explore_systems.py
+
+URL options (all optional):
+    latency_ms    Wait per request (default: 0)
+    seed          Dataset seed (default: 0)
+    systems       Filler systems (default: 20)
+    configs       Configurations per filler system (default: 3)
+    files         Tracked models per configuration (default: 6)
+    snapshots     Snapshots per configuration (default: 4)
+    job_seconds   Time a job takes to complete (default: 2)
+    agents        Comma-separated run-time factors, one per "RHEL 8" agent, e.g. 1,1,2.5
+                  (default: none; every job starts at once)
+    agent_slots   Jobs each agent runs at a time (default: 1)
+    stats         Write request counts and peak memory to this JSON file on exit
+"""
+import atexit
+import hashlib
+import json
+import random
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from time import monotonic, perf_counter, sleep
+from types import SimpleNamespace
+from urllib.parse import parse_qsl, urlparse
+
+from istari_digital_client import AccessRelation, AgentStatusName, JobStatusName
+
+REPO_ROOT = Path(__file__).resolve().parent
+CHECK_DESIGN = REPO_ROOT / "use-cases" / "check-design-meets-requirements"
+NTOP_OUTPUT = REPO_ROOT / "use-cases" / "run-ntop-wing-design" / "example-output"
+
+# IDs the check-design notebook uses
+DEMO_SYSTEM_ID = "294568b3-e626-4293-8e2c-307370ec9e95"
+DEMO_CONFIG_ID = "cfdbd13b-817e-4c7e-b3c7-53ffcb4b9836"
+DEMO_SYSML_MODEL_ID = "c4280a27-b2e4-4376-81f7-474062bcdf4d"
+DEMO_NTOP_MODEL_ID = "263b7332-03f4-4ded-9686-7f11df478058"
+
+FILLER_EXTENSIONS = ["ntop", "sysml", "CATPart", "prt", "bdf", "xlsx", "pdf", "docx"]
+
+
+class LocalApiError(Exception):
+    """Error with an HTTP status, like the SDK's ApiException."""
+
+    def __init__(self, status, reason):
+        super().__init__(f"({status}) {reason}")
+        self.status = status
+        self.reason = reason
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _page(items, page=1, size=100):
+    size = max(1, size or 100)
+    start = (page - 1) * size
+    return SimpleNamespace(
+        items=items[start:start + size], total=len(items), page=page, size=size,
+        pages=max(1, -(-len(items) // size)),
+    )
+
+
+# Wing inputs of ntop/v4_input.json, which produced the example outputs
+_NTOP_BASE = {"LOA In": 99.9, "Span": 144, "LE Sweep P1": 46, "LE Sweep P2": 46,
+              "TE Sweep P1": -46, "TE Sweep P2": 15, "Panel Break Span %": 0.3}
+
+
+def _ntop_response(values):
+    """(structure weight, drag) factors of a wing relative to the example outputs.
+
+    A smooth made-up response, not aerodynamics: weight grows with size and
+    is least at one planform; drag falls with length and span and is least
+    at another. Light wings are short, so the range requirement binds.
+    """
+    def factors(x):
+        length, span = x["LOA In"] / 99.9, x["Span"] / 144
+        le1, le2, te1, te2, brk = (x[k] for k in list(_NTOP_BASE)[2:])
+        heavy = (1 + 0.5 * ((le1 - 30) / 40) ** 2 + 0.3 * ((le2 - 20) / 40) ** 2
+                 + 0.3 * ((te1 + 20) / 60) ** 2 + 0.3 * ((te2 - 10) / 60) ** 2 + (brk - 0.5) ** 2)
+        draggy = (1 + 0.4 * ((le1 - 50) / 40) ** 2 + 0.4 * ((le2 - 40) / 40) ** 2
+                  + 0.2 * ((te1 + 40) / 60) ** 2 + 0.2 * ((te2 - 20) / 60) ** 2 + 0.5 * (brk - 0.3) ** 2)
+        return length ** 1.5 * span ** 2 * heavy, draggy / (length ** 3 * span ** 2)
+
+    weight, drag = factors({**_NTOP_BASE, **values})
+    base_weight, base_drag = factors(_NTOP_BASE)
+    return weight / base_weight, drag / base_drag
+
+
+class _Blob:
+    """File contents: stored bytes, or bytes generated from a seed on read."""
+
+    def __init__(self, data=None, size=None, seed=None):
+        self.data = data
+        self.size = len(data) if data is not None else size
+        self.seed = seed
+
+    def read(self):
+        if self.data is not None:
+            return self.data
+        return random.Random(self.seed).randbytes(self.size)
+
+
+class _Revision(SimpleNamespace):
+    """A file revision whose read_bytes()/read_text() go through the stand-in."""
+
+    @property
+    def revision_id(self):
+        return self.id  # as on snapshot revision items
+
+    def read_bytes(self):
+        return self._service._download(self)
+
+    def read_text(self, encoding="utf-8"):
+        return self.read_bytes().decode(encoding)
+
+
+class _Resource(SimpleNamespace):
+    """A model or artifact; `revision` is the latest revision of its file."""
+
+    @property
+    def revision(self):
+        return self.file.revisions[-1]
+
+    def read_bytes(self):
+        return self.revision.read_bytes()
+
+    def read_text(self, encoding="utf-8"):
+        return self.revision.read_text(encoding)
+
+
+class LocalIstari:
+    """In-memory Istari stand-in with per-request latency and call counts."""
+
+    def __init__(self, latency_ms=0.0, seed=0, systems=20, configs=3, files=6, snapshots=4,
+                 job_seconds=2.0, agents=(), agent_slots=1, stats=None):
+        self.latency = latency_ms / 1000.0
+        self.job_seconds = job_seconds
+        self.requests = Counter()
+        self.started = perf_counter()
+        self._lock = threading.RLock()
+        self._rng = random.Random(seed)
+        self._blobs = {}  # content sha -> _Blob
+        self._files = {}
+        self._revisions = {}
+        self._models = {}  # models and artifacts, by ID
+        self._systems = {}
+        self._configs = {}
+        self._snapshots = {}
+        self._jobs = {}
+        self._access = {}  # resource ID -> {email: relation}
+        self._uploads = {}  # multipart upload ID -> {part number: bytes}
+        self._model_by_file = {}
+        self._agents = {}
+        self.user = SimpleNamespace(
+            id=self._id(), display_name="Local Stand-in", email="stand-in@localhost"
+        )
+        self._seed_demo()
+        for i in range(systems):
+            self._seed_filler(i, configs, files, snapshots)
+        for i, speed in enumerate(agents):
+            self.add_agent(f"rhel8-agent-{i + 1}", speed=speed, slots=agent_slots)
+        if stats:
+            atexit.register(self.write_stats, stats)
+
+    @classmethod
+    def from_url(cls, url):
+        """Build from a local://?latency_ms=..&seed=.. registry URL."""
+        options = dict(parse_qsl(urlparse(url).query))
+        kwargs = {}
+        for name, cast in [("latency_ms", float), ("seed", int), ("systems", int),
+                           ("configs", int), ("files", int), ("snapshots", int),
+                           ("job_seconds", float), ("agent_slots", int), ("stats", str)]:
+            if name in options:
+                kwargs[name] = cast(options[name])
+        if options.get("agents"):
+            kwargs["agents"] = [float(speed) for speed in options["agents"].split(",")]
+        return cls(**kwargs)
+
+    # Bookkeeping
+
+    def _id(self):
+        return str(uuid.UUID(int=self._rng.getrandbits(128), version=4))
+
+    def _request(self, name):
+        with self._lock:
+            self.requests[name] += 1
+        if self.latency:
+            sleep(self.latency)
+
+    def stats(self):
+        """Request counts so far, plus the process's peak memory where available."""
+        result = {
+            "requests": sum(self.requests.values()),
+            "by_method": dict(sorted(self.requests.items())),
+            "seconds": round(perf_counter() - self.started, 3),
+        }
+        try:
+            import resource
+            import sys
+
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Linux reports KiB, macOS bytes
+            result["peak_rss_mb"] = round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+        except ImportError:
+            pass
+        return result
+
+    def write_stats(self, path):
+        Path(path).write_text(json.dumps(self.stats(), indent=2))
+
+    # Dataset
+
+    def _store(self, blob, salt=None, sha=None):
+        salt = salt or self._id().replace("-", "")
+        if sha is None:
+            sha = hashlib.sha384(blob.read() + salt.encode()).hexdigest()
+        self._blobs[sha] = blob
+        return SimpleNamespace(id=self._id(), created=_now(), sha=sha, salt=salt)
+
+    def _new_revision(self, file, name, blob, salt=None, sha=None, sources=None,
+                      description=None, version_name=None, display_name=None):
+        revision = _Revision(
+            id=self._id(), created=_now(), file_id=file.id, name=name,
+            extension=Path(name).suffix.lstrip("."), size=blob.size,
+            content_token=self._store(blob, salt, sha), description=description,
+            version_name=version_name, display_name=display_name, sources=sources or [],
+            _service=self,
+        )
+        self._revisions[revision.id] = revision
+        file.revisions.append(revision)
+        return revision
+
+    def _new_file(self):
+        file = SimpleNamespace(id=self._id(), revisions=[])
+        self._files[file.id] = file
+        return file
+
+    def _new_model(self, name, blob, model_id=None, display_name=None, sha=None, **kwargs):
+        file = self._new_file()
+        self._new_revision(file, name, blob, sha=sha, display_name=display_name, **kwargs)
+        model = _Resource(
+            id=model_id or self._id(), display_name=display_name or name, file=file,
+            artifacts=[], created=_now(),
+        )
+        self._models[model.id] = model
+        self._model_by_file[file.id] = model
+        return model
+
+    def _new_artifact(self, model, name, data, job_id=None):
+        file = self._new_file()
+        sources = []
+        if job_id:
+            sources.append(SimpleNamespace(
+                revision_id=model.revision.id, file_id=model.file.id,
+                resource_type="Job", resource_id=job_id, relationship_identifier=None,
+            ))
+        self._new_revision(file, name, _Blob(data), salt=model.revision.content_token.salt,
+                           sources=sources)
+        artifact = _Resource(id=self._id(), file=file, model_id=model.id, created=_now())
+        self._models[artifact.id] = artifact
+        model.artifacts.append(artifact)
+        return artifact
+
+    def _new_system(self, name, description, system_id=None):
+        system = SimpleNamespace(
+            id=system_id or self._id(), name=name, description=description,
+            archive_status="active", configurations=[], models=[],
+        )
+        self._systems[system.id] = system
+        return system
+
+    def _new_config(self, system, name, models, config_id=None):
+        config = SimpleNamespace(
+            id=config_id or self._id(), name=name, system_id=system.id,
+            tracked=[m.file.id for m in models], snapshots=[],
+        )
+        self._configs[config.id] = config
+        system.configurations.append(config)
+        return config
+
+    def _snapshot(self, config):
+        """Capture the latest revision of every tracked file; None if unchanged."""
+        revisions = []
+        for file_id in config.tracked:
+            model = self._model_by_file[file_id]
+            revisions.append(model.revision.id)
+            revisions += [a.revision.id for a in model.artifacts]
+        if config.snapshots and config.snapshots[0].revisions == revisions:
+            return None
+        snapshot = SimpleNamespace(
+            id=self._id(), configuration_id=config.id, created=_now(), revisions=revisions, tags=[],
+        )
+        self._snapshots[snapshot.id] = snapshot
+        config.snapshots.insert(0, snapshot)  # newest first, as the registry lists them
+        return snapshot
+
+    def _seed_demo(self):
+        sysml = self._new_model(
+            "group3_uas_requirements.sysml",
+            _Blob((CHECK_DESIGN / "example-input" / "group3_uas_requirements.sysml").read_bytes()),
+            model_id=DEMO_SYSML_MODEL_ID, display_name="Group3 UAS Requirements",
+        )
+        for name in ["output_requirements.json", "output_parts.json"]:
+            self._new_artifact(sysml, name, (CHECK_DESIGN / "example-output" / name).read_bytes())
+        ntop = self._new_model(
+            "Group3-UAS-Wing-v8.ntop", _Blob(size=2 * 1024 * 1024, seed="ntop"),
+            model_id=DEMO_NTOP_MODEL_ID, display_name="Group3-UAS-Wing-v8",
+            sha=hashlib.sha384(b"Group3-UAS-Wing-v8").hexdigest(),
+        )
+        self._ntop_outputs(ntop, job_id=None)
+        system = self._new_system(
+            "Example: Check Design Meets Requirements",
+            "SysML requirements and nTop wing CAD tracked together",
+            system_id=DEMO_SYSTEM_ID,
+        )
+        system.models += [sysml.id, ntop.id]
+        config = self._new_config(system, "Baseline", [sysml, ntop], config_id=DEMO_CONFIG_ID)
+        self._snapshot(config).tags.append("baseline")
+
+    def _seed_filler(self, index, configs, files, snapshots):
+        rng = self._rng
+        system = self._new_system(f"System {index + 1:03d}", f"Seeded system {index + 1}")
+        for c in range(configs):
+            models = []
+            for f in range(files):
+                ext = rng.choice(FILLER_EXTENSIONS)
+                size = int(min(rng.lognormvariate(12, 1.5), 50e6))  # median ~160 KB
+                seed = rng.getrandbits(64)
+                model = self._new_model(
+                    f"part_{index:03d}_{c}_{f}.{ext}", _Blob(size=size, seed=seed),
+                    sha=hashlib.sha384(f"{seed}:{size}".encode()).hexdigest(),
+                )
+                system.models.append(model.id)
+                models.append(model)
+            config = self._new_config(system, f"Configuration {c + 1}", models)
+            for s in range(snapshots):
+                # Each snapshot after the first follows a new revision of one model
+                if s:
+                    model = rng.choice(models)
+                    seed = rng.getrandbits(64)
+                    self._new_revision(
+                        model.file, model.revision.name, _Blob(size=model.revision.size, seed=seed),
+                        sha=hashlib.sha384(f"{seed}".encode()).hexdigest(),
+                    )
+                snapshot = self._snapshot(config)
+                if snapshot and rng.random() < 0.5:
+                    snapshot.tags.append(f"v{s + 1}")
+
+    # Users, systems, configurations, snapshots, tags
+
+    def get_current_user(self):
+        self._request("get_current_user")
+        return self.user
+
+    def _get(self, table, resource_id, kind):
+        try:
+            return table[resource_id]
+        except KeyError:
+            raise LocalApiError(404, f"{kind} {resource_id} not found") from None
+
+    def list_systems(self, archive_status="active", page=1, size=100, **kwargs):
+        self._request("list_systems")
+        systems = [s for s in self._systems.values()
+                   if archive_status == "all" or s.archive_status == archive_status]
+        return _page(systems, page, size)
+
+    def get_system(self, system_id):
+        self._request("get_system")
+        return self._get(self._systems, system_id, "System")
+
+    def list_system_configurations(self, system_id, page=1, size=100, **kwargs):
+        self._request("list_system_configurations")
+        return _page(self._get(self._systems, system_id, "System").configurations, page, size)
+
+    def list_tracked_files(self, configuration_id, page=1, size=100, **kwargs):
+        self._request("list_tracked_files")
+        config = self._get(self._configs, configuration_id, "Configuration")
+        tracked = [SimpleNamespace(file_id=file_id, specifier_type=SimpleNamespace(value="Latest"))
+                   for file_id in config.tracked]
+        return _page(tracked, page, size)
+
+    def list_snapshots(self, configuration_id=None, tag=None, page=1, size=100, **kwargs):
+        self._request("list_snapshots")
+        snapshots = self._get(self._configs, configuration_id, "Configuration").snapshots
+        if tag is not None:
+            snapshots = [s for s in snapshots if tag in s.tags]
+        return _page(snapshots, page, size)
+
+    def list_tags(self, snapshot_id=None, page=1, size=100, **kwargs):
+        self._request("list_tags")
+        snapshot = self._get(self._snapshots, snapshot_id, "Snapshot")
+        tags = [SimpleNamespace(tag=tag, snapshot_id=snapshot.id) for tag in snapshot.tags]
+        return _page(tags, page, size)
+
+    def list_snapshot_revisions(self, snapshot_id, page=1, size=100, **kwargs):
+        self._request("list_snapshot_revisions")
+        snapshot = self._get(self._snapshots, snapshot_id, "Snapshot")
+        return _page([self._revisions[r] for r in snapshot.revisions], page, size)
+
+    def create_snapshot(self, configuration_id, new_snapshot=None):
+        self._request("create_snapshot")
+        with self._lock:
+            snapshot = self._snapshot(self._get(self._configs, configuration_id, "Configuration"))
+        # No new snapshot when nothing changed (the registry's NoOp response)
+        return SimpleNamespace(actual_instance=snapshot or SimpleNamespace(message="No changes"))
+
+    def create_tag(self, snapshot_id, new_tag):
+        self._request("create_tag")
+        snapshot = self._get(self._snapshots, snapshot_id, "Snapshot")
+        snapshot.tags.append(new_tag.tag)
+        return SimpleNamespace(tag=new_tag.tag, snapshot_id=snapshot.id)
+
+    # Files, models and artifacts
+
+    def get_file(self, file_id):
+        self._request("get_file")
+        return self._get(self._files, file_id, "File")
+
+    def get_revision(self, revision_id):
+        self._request("get_revision")
+        return self._get(self._revisions, revision_id, "Revision")
+
+    def get_model(self, model_id):
+        self._request("get_model")
+        return self._get(self._models, model_id, "Model")
+
+    def get_artifact(self, artifact_id):
+        self._request("get_artifact")
+        return self._get(self._models, artifact_id, "Artifact")
+
+    def list_models(self, system_id=None, page=1, size=100, **kwargs):
+        self._request("list_models")
+        if system_id:
+            ids = self._get(self._systems, system_id, "System").models
+        else:
+            ids = [m.id for m in self._models.values() if getattr(m, "model_id", None) is None]
+        return _page([self._models[i] for i in ids], page, size)
+
+    def list_model_artifacts(self, model_id, page=1, size=10, sort=None, **kwargs):
+        self._request("list_model_artifacts")
+        items = list(self._get(self._models, model_id, "Model").artifacts)
+        if sort == "-created":
+            items.reverse()
+        return _page(items, page, size)
+
+    def _download(self, revision):
+        self._request("download")
+        return self._blobs[revision.content_token.sha].read()
+
+    def add_model(self, path, sources=None, *, description=None, version_name=None,
+                  external_identifier=None, display_name=None, source_job_id=None):
+        self._request("add_model")
+        path = Path(path)
+        with self._lock:
+            return self._new_model(
+                path.name, _Blob(path.read_bytes()), display_name=display_name,
+                description=description, version_name=version_name,
+            )
+
+    def update_model(self, model_id, path, sources=None, *, description=None, version_name=None,
+                     external_identifier=None, display_name=None, source_job_id=None):
+        self._request("update_model")
+        path = Path(path)
+        with self._lock:
+            model = self._get(self._models, model_id, "Model")
+            self._new_revision(
+                model.file, path.name, _Blob(path.read_bytes()),
+                salt=model.revision.content_token.salt, description=description,
+                version_name=version_name, display_name=display_name,
+            )
+        return model
+
+    # Multipart storage calls used by istari_upload.UploadManager
+
+    def create_multipart_upload(self, request):
+        self._request("create_multipart_upload")
+        if request.sha in self._blobs:
+            raise LocalApiError(409, "Sha already exists")
+        upload_id = uuid.uuid4().hex
+        self._uploads[upload_id] = {}
+        expires = _now() + timedelta(hours=1)
+        return SimpleNamespace(upload_id=upload_id, upload_urls={
+            str(n): SimpleNamespace(url=f"local://upload/{upload_id}/{n}", expires=expires)
+            for n in range(1, request.num_parts + 1)
+        })
+
+    def _upload_multipart_chunk(self, upload_url, chunk_data):
+        self._request("upload_part")
+        upload_id, number = upload_url.url.rsplit("/", 2)[-2:]
+        self._uploads[upload_id][int(number)] = chunk_data
+        etag = hashlib.md5(chunk_data).hexdigest()
+        return SimpleNamespace(status=200, getheader=lambda name: f'"{etag}"' if name == "ETag" else None)
+
+    def finalize_multipart_upload(self, request):
+        self._request("finalize_multipart_upload")
+        parts = self._uploads.pop(request.upload_id, {})
+        if request.completed_parts:
+            data = b"".join(parts[p.part_number] for p in request.completed_parts)
+            self._blobs[request.sha] = _Blob(data)
+
+    def _upload_properties(self, token, data):
+        self._request("upload_properties")
+
+    def _create_model(self, file_revision, source_job_id=None):
+        self._request("add_model")
+        with self._lock:
+            file = self._new_file()
+            return self._attach_uploaded(file, file_revision, self._id())
+
+    def _update_model(self, model_id, file_revision, source_job_id=None):
+        self._request("update_model")
+        with self._lock:
+            model = self._get(self._models, model_id, "Model")
+            return self._attach_uploaded(model.file, file_revision, model_id)
+
+    def _attach_uploaded(self, file, file_revision, model_id):
+        token = file_revision.content_token
+        revision = _Revision(
+            id=self._id(), created=_now(), file_id=file.id, name=file_revision.name,
+            extension=file_revision.extension, size=file_revision.size,
+            content_token=SimpleNamespace(id=token.id, created=token.created, sha=token.sha, salt=token.salt),
+            description=file_revision.description, version_name=file_revision.version_name,
+            display_name=file_revision.display_name, sources=[], _service=self,
+        )
+        self._revisions[revision.id] = revision
+        file.revisions.append(revision)
+        if model_id not in self._models:
+            self._models[model_id] = self._model_by_file[file.id] = _Resource(
+                id=model_id, display_name=file_revision.display_name or file_revision.name,
+                file=file, artifacts=[], created=_now(),
+            )
+        return self._models[model_id]
+
+    # Agents
+
+    def add_agent(self, display_name, operating_system="RHEL 8", speed=1.0, slots=1):
+        """Add an agent whose jobs take `speed` x job_seconds, `slots` at a time."""
+        agent = SimpleNamespace(
+            id=self._id(), created=_now(), display_name=display_name, host_os=operating_system,
+            speed=speed, free_at=[0.0] * slots, jobs=[], archive_status="active",
+        )
+        self._agents[agent.id] = agent
+        return agent
+
+    def _agent_view(self, agent):
+        now = monotonic()
+        busy = any(job._start_at <= now < job._finish_at for job in agent.jobs)
+        status = AgentStatusName.EXECUTINGJOB if busy else AgentStatusName.IDLE
+        return SimpleNamespace(
+            id=agent.id, created=agent.created, archive_status=agent.archive_status,
+            display_name_history=[SimpleNamespace(display_name=agent.display_name, created=agent.created)],
+            information_history=[SimpleNamespace(host_os=agent.host_os, agent_version="local",
+                                                 created=agent.created)],
+            status_history=[SimpleNamespace(name=status, created=_now(), message=None)],
+        )
+
+    def list_agents(self, host_os=None, page=1, size=100, **kwargs):
+        self._request("list_agents")
+        with self._lock:
+            agents = [self._agent_view(a) for a in self._agents.values()
+                      if host_os is None or a.host_os == host_os]
+        return _page(agents, page, size)
+
+    def get_agent(self, agent_id):
+        self._request("get_agent")
+        with self._lock:
+            return self._agent_view(self._get(self._agents, agent_id, "Agent"))
+
+    def _claim(self, job, assigned_agent_id, operating_system):
+        """Queue a job on its agent: the assigned one, else whichever frees up first.
+
+        Each agent runs its jobs first come, first served, so a job's start and
+        finish are known when it is submitted.
+        """
+        now = monotonic()
+        if assigned_agent_id:
+            agents = [self._get(self._agents, assigned_agent_id, "Agent")]
+        else:
+            wanted = getattr(operating_system, "value", operating_system)  # OS enum or plain string
+            agents = [a for a in self._agents.values() if wanted is None or a.host_os == wanted]
+            if not agents:
+                raise LocalApiError(422, f"No agent runs {operating_system}")
+        agent, slot = min(((a, i) for a in agents for i in range(len(a.free_at))),
+                          key=lambda pair: pair[0].free_at[pair[1]])
+        job.agent_id = agent.id
+        job._start_at = max(now, agent.free_at[slot])
+        job._finish_at = agent.free_at[slot] = job._start_at + self.job_seconds * agent.speed
+        agent.jobs = [j for j in agent.jobs if j._finish_at > now] + [job]
+
+    # Jobs
+
+    def add_job(self, model_id, function, *, parameters=None, tool_name=None, tool_version=None,
+                operating_system=None, assigned_agent_id=None, **kwargs):
+        self._request("add_job")
+        model = self._get(self._models, model_id, "Model")
+        now = monotonic()
+        job = SimpleNamespace(
+            id=str(uuid.uuid4()), model_id=model.id, function=function,
+            parameters=parameters or {}, tool_name=tool_name, tool_version=tool_version,
+            operating_system=operating_system, assigned_agent_id=assigned_agent_id, agent_id=None,
+            created=_now(), status=SimpleNamespace(name=JobStatusName.PENDING),
+            status_history=[SimpleNamespace(name=JobStatusName.PENDING, created=_now(), message=None)],
+            _start_at=now + self.job_seconds * 0.2, _finish_at=now + self.job_seconds,
+        )
+        with self._lock:
+            if self._agents:
+                self._claim(job, assigned_agent_id, operating_system)
+            self._jobs[job.id] = job
+        return job
+
+    def get_job(self, job_id):
+        self._request("get_job")
+        job = self._get(self._jobs, job_id, "Job")
+        with self._lock:
+            self._advance(job)
+        return job
+
+    def _advance(self, job):
+        """Move a job along PENDING → RUNNING → COMPLETED by elapsed time."""
+        if job.status.name in (JobStatusName.COMPLETED, JobStatusName.FAILED):
+            return
+        now = monotonic()
+        if now >= job._finish_at:
+            status = JobStatusName.COMPLETED
+            try:
+                self._run_function(job)
+            except Exception as e:
+                status = JobStatusName.FAILED
+                job.status_history.append(SimpleNamespace(name=status, created=_now(), message=str(e)))
+        elif now >= job._start_at:
+            status = JobStatusName.RUNNING
+        else:
+            return
+        if status != job.status.name:
+            job.status = SimpleNamespace(name=status)
+            if status != JobStatusName.FAILED:
+                # Stamped with when it happened, not when it was polled, as the server would
+                at = job._finish_at if status == JobStatusName.COMPLETED else job._start_at
+                created = _now() - timedelta(seconds=now - at)
+                job.status_history.append(SimpleNamespace(name=status, created=created, message=None))
+
+    def _run_function(self, job):
+        model = self._models[job.model_id]
+        if job.function == "@ntop:run_model":
+            self._ntop_outputs(model, job.id, job.parameters.get("ntop_input_json"))
+        elif job.function == "@istari:extract_sysmlv2":
+            from istari_sysml import extract_text
+
+            requirements, parts = extract_text(model.read_text())
+            for name, data in [("output_requirements.json", requirements), ("output_parts.json", parts)]:
+                self._new_artifact(model, name, json.dumps(data, indent=2).encode(), job.id)
+        else:
+            summary = {"function": job.function, "input": model.revision.name}
+            self._new_artifact(model, "output.json", json.dumps(summary).encode(), job.id)
+
+    def _ntop_outputs(self, model, job_id, inputs=None):
+        """The example nTop outputs, with weight, range and speed varied by the inputs."""
+        metrics = json.loads((NTOP_OUTPUT / "grp3-uas_v6_aerodeck_metrics.json").read_text())
+        output = json.loads((NTOP_OUTPUT / "grp3-uas_v6_output.json").read_text())
+        values = {i["name"]: float(i["value"]) for i in (inputs or {}).get("inputs", [])
+                  if isinstance(i.get("value"), (int, float))}
+        weight, drag = _ntop_response(values)
+        metrics["range_mission"]["range_nm"] = round(metrics["range_mission"]["range_nm"] / drag, 1)
+        metrics["range_mission"]["cruise_speed_kts"] = round(metrics["range_mission"]["cruise_speed_kts"]
+                                                             / drag ** 0.25, 1)
+        empty = metrics["mass_properties"]["empty_weight_lbm"]
+        metrics["mass_properties"]["empty_weight_lbm"] = round(empty * weight ** 0.5, 2)
+        for key in ["Weight_Composite (lbm)", "Weight_Metal (lbm)"]:
+            output[key] *= weight
+        self._new_artifact(model, "grp3-uas_v6_aerodeck_metrics.json",
+                           json.dumps(metrics, indent=2).encode(), job_id)
+        self._new_artifact(model, "grp3-uas_v6_output.json", json.dumps(output, indent=4).encode(), job_id)
+        views = [f"{view}.png" for view in ["iso", "top", "front", "right", "left", "back", "bottom"]]
+        for name in ["grp3-uas_v6_aerodeck.json", *views]:
+            self._new_artifact(model, name, (NTOP_OUTPUT / name).read_bytes(), job_id)
+
+    # Access
+
+    def list_access(self, resource_type, resource_id, **kwargs):
+        self._request("list_access")
+        return [
+            SimpleNamespace(subject_info=SimpleNamespace(email=email), relation=relation)
+            for email, relation in self._access.get(resource_id, {}).items()
+        ]
+
+    def create_access_by_email(self, resource_id, subject_type=None, subject_email=None,
+                               relation=AccessRelation.VIEWER, **kwargs):
+        self._request("create_access_by_email")
+        with self._lock:
+            grants = self._access.setdefault(resource_id, {})
+            if grants.get(subject_email.lower()) == relation:
+                raise LocalApiError(409, "Access already exists")
+            grants[subject_email.lower()] = relation
+        return SimpleNamespace(resource_id=resource_id, relation=relation)
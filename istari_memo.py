@@ -0,0 +1,160 @@
+"""Memoized job submission: reuse a finished job instead of running it again.
+
+A job's outputs depend only on the input file contents, the function, the
+tool (name, version, OS) and the parameters. submit_job() hashes those into
+a key and keeps a local SQLite index of key -> job ID. When the same key is
+submitted again and that job completed with its artifacts still on the
+model, the earlier job is returned and no new job is queued. A job from the
+index that is still running is returned too, so repeated submissions attach
+to it rather than starting a duplicate.
+
+Usage:
+    from istari_memo import submit_job
+
+    job = submit_job(
+        client,
+        model_id=MODEL_ID,
+        function="@istari:extract",
+        tool_name="open_pdf",
+        tool_version="1.0.0",
+        operating_system="Ubuntu 22.04",
+        parameters={},
+    )                                   # same call with the same input: no new job
+    job = submit_job(client, ..., force=True)   # always run
+
+Settings (environment):
+    ISTARI_JOB_INDEX  Index file (default: ~/.cache/istari/jobs.sqlite)
+    ISTARI_JOB_MEMO   Set to 0 to always submit new jobs
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from time import time
+
+from istari_digital_client import JobStatusName
+from istari_jobs import TERMINAL_STATUSES, job_artifacts
+
+DEFAULT_INDEX = Path.home() / ".cache" / "istari" / "jobs.sqlite"
+
+
+def canonical_parameters(parameters):
+    """Parameters as a stable string: key order and whitespace do not matter."""
+    return json.dumps(parameters or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def input_hash(model):
+    """Content hash of a model's current revision (revision ID if the hash is unknown)."""
+    revision = model.revision
+    token = getattr(revision, "content_token", None)
+    return getattr(token, "sha", None) or f"rev-{revision.id}"
+
+
+def job_key(content_hash, function, tool_name, tool_version, operating_system, parameters,
+            namespace=""):
+    """Memoization key for one job configuration on one input."""
+    fields = [namespace, content_hash, function, tool_name, tool_version, operating_system,
+              canonical_parameters(parameters)]
+    return hashlib.sha256("\x1f".join(str(f) for f in fields).encode()).hexdigest()
+
+
+class JobIndex:
+    """Local key -> job ID index, shared by every script on this machine."""
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.getenv("ISTARI_JOB_INDEX") or DEFAULT_INDEX)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "key TEXT PRIMARY KEY, job_id TEXT, model_id TEXT, function TEXT, created REAL)"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT job_id FROM jobs WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, job_id, model_id, function):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?)",
+                (key, job_id, model_id, function, time()),
+            )
+            self._db.commit()
+
+    def forget(self, key):
+        with self._lock:
+            self._db.execute("DELETE FROM jobs WHERE key = ?", (key,))
+            self._db.commit()
+
+
+_default_index = None
+
+
+def get_index():
+    """Return the process-wide index configured from the environment."""
+    global _default_index
+    if _default_index is None:
+        _default_index = JobIndex()
+    return _default_index
+
+
+def find_job(client, model, key, index):
+    """A reusable job for this key, or None.
+
+    Completed jobs count only while their artifacts are still on the model;
+    failed or cancelled jobs are dropped from the index.
+    """
+    job_id = index.get(key)
+    if not job_id:
+        return None
+    try:
+        job = client.get_job(job_id)
+    except Exception:
+        index.forget(key)
+        return None
+    status = job.status.name
+    if status == JobStatusName.COMPLETED and job_artifacts(model, job_id):
+        return job
+    if status not in TERMINAL_STATUSES:
+        return job  # still queued or running — attach to it
+    index.forget(key)
+    return None
+
+
+def submit_job(client, model_id, function, tool_name, tool_version, operating_system,
+               parameters=None, assigned_agent_id=None, force=False, index=None):
+    """add_job() that returns an earlier identical job when one can be reused.
+
+    `force=True` (or ISTARI_JOB_MEMO=0) always submits a new job; the new
+    job then becomes the one reused by later calls.
+    """
+    index = index or get_index()
+    model = client.get_model(model_id)
+    key = job_key(
+        input_hash(model), function, tool_name, tool_version, operating_system, parameters,
+        namespace=getattr(client, "namespace", ""),
+    )
+    if not force and os.getenv("ISTARI_JOB_MEMO", "1") != "0":
+        job = find_job(client, model, key, index)
+        if job is not None:
+            state = "completed" if job.status.name == JobStatusName.COMPLETED else "running"
+            print(f"  Reusing {state} job {job.id} (same input, tool and parameters)")
+            return job
+
+    job = client.add_job(
+        model_id=model_id,
+        function=function,
+        tool_name=tool_name,
+        tool_version=tool_version,
+        assigned_agent_id=assigned_agent_id,
+        operating_system=operating_system,
+        parameters=parameters or {},
+    )
+    index.put(key, job.id, model_id, function)
+    return job
@@ -0,0 +1,324 @@
+"""Opt-in per-call instrumentation for the Istari SDK client.
+
+When enabled, get_client() wraps the SDK client so every call records its
+count, latency histogram, errors and bytes transferred, per method.
+Downloads made through model/artifact `read_bytes()` and the artifact store
+are counted too.
+Wrap a workflow step in `span()` to see its total cost, including the calls
+made inside it. Spans nest per thread.
+
+Output, written at exit:
+  <prefix>.json    counters, histograms and span totals
+  <prefix>.prom    Prometheus text exposition (node_exporter textfile format)
+  <prefix>.folded  collapsed stacks for flamegraph.pl / speedscope / inferno
+
+Usage:
+    ISTARI_METRICS=1 python ntop/run_ntop_model.py --model-id <MODEL_ID>
+    ISTARI_METRICS=runs/ntop ISTARI_METRICS_PORT=9464 python ...   # also serve /metrics
+
+    from istari_metrics import span
+
+    with span("extract"):
+        reqs, parts = extract_model(client.get_model(model_id))
+
+    flamegraph.pl istari_metrics.folded > istari_metrics.svg
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+
+# Latency histogram upper bounds in seconds (Prometheus-style, cumulative on export)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Byte-level transfer methods on the SDK client (and the local stand-in).
+# They are patched on the client instance itself, because model objects call
+# them directly rather than through the wrapper.
+TRANSFER_METHODS = ("_download", "_upload", "_upload_multipart_chunk", "_upload_properties")
+
+_BYTES = (bytes, bytearray, memoryview)
+_active = None
+
+
+class _CallStats:
+    __slots__ = ("count", "errors", "seconds", "bytes_in", "bytes_out", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last one is +Inf
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 6),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], self.buckets)),
+        }
+
+
+class Metrics:
+    """Thread-safe call and span statistics.
+
+    Calls and spans share one per-thread stack. Each frame's self time (its
+    duration minus its children's) is added to the collapsed-stack totals,
+    so the .folded output adds up to the wall time spent in the client.
+    """
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.calls = defaultdict(_CallStats)
+        self.spans = defaultdict(lambda: [0, 0.0])  # "a/b" -> [count, seconds]
+        self.folded = defaultdict(float)  # "a;b;method" -> self seconds
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push(self, name, is_call):
+        stack = self._stack()
+        # Only the outermost call counts bytes: SDK transfers call each other
+        outermost = is_call and not any(frame[3] for frame in stack)
+        frame = [name, perf_counter(), 0.0, is_call, outermost]
+        stack.append(frame)
+        return frame
+
+    def _pop(self, frame):
+        stack = self._stack()
+        elapsed = perf_counter() - frame[1]
+        path = ";".join(f[0] for f in stack)
+        stack.pop()
+        if stack:
+            stack[-1][2] += elapsed
+        with self._lock:
+            self.folded[path] += max(elapsed - frame[2], 0.0)
+        return elapsed
+
+    @contextmanager
+    def span(self, name):
+        """Time a block; calls made inside it are nested under `name`."""
+        key = "/".join([*(f[0] for f in self._stack() if not f[3]), name])
+        frame = self._push(name, False)
+        try:
+            yield
+        finally:
+            elapsed = self._pop(frame)
+            with self._lock:
+                totals = self.spans[key]
+                totals[0] += 1
+                totals[1] += elapsed
+
+    def wrap(self, name, method):
+        """Return `method` instrumented under `name`."""
+
+        def instrumented(*args, **kwargs):
+            frame = self._push(name, True)
+            failed, result = False, None
+            try:
+                result = method(*args, **kwargs)
+                return result
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed = self._pop(frame)
+                sent = received = 0
+                if frame[4]:
+                    sent = sum(len(a) for a in (*args, *kwargs.values()) if isinstance(a, _BYTES))
+                    received = len(result) if isinstance(result, _BYTES) else 0
+                self.record(name, elapsed, failed, received, sent)
+
+        instrumented.__name__ = getattr(method, "__name__", name)
+        instrumented.__doc__ = getattr(method, "__doc__", None)
+        return instrumented
+
+    def record(self, name, seconds, failed=False, bytes_in=0, bytes_out=0):
+        """Count one call of `name` made outside wrap(), e.g. a streamed download."""
+        with self._lock:
+            stats = self.calls[name]
+            stats.count += 1
+            stats.errors += failed
+            stats.seconds += seconds
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+            stats.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "seconds": round(perf_counter() - self.started, 6),
+                "calls": {name: s.as_dict() for name, s in sorted(self.calls.items())},
+                "spans": {name: {"count": c, "seconds": round(t, 6)}
+                          for name, (c, t) in sorted(self.spans.items())},
+            }
+
+    def prometheus(self):
+        """Prometheus text exposition (format 0.0.4)."""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            calls = sorted(self.calls.items())
+            spans = sorted(self.spans.items())
+        family("istari_client_calls_total", "counter", "SDK calls by method.")
+        lines += [f'istari_client_calls_total{{method="{m}"}} {s.count}' for m, s in calls]
+        family("istari_client_errors_total", "counter", "SDK calls that raised, by method.")
+        lines += [f'istari_client_errors_total{{method="{m}"}} {s.errors}' for m, s in calls]
+        family("istari_client_bytes_total", "counter", "Bytes transferred by method and direction.")
+        for m, s in calls:
+            if s.bytes_in or s.bytes_out:
+                lines.append(f'istari_client_bytes_total{{method="{m}",direction="in"}} {s.bytes_in}')
+                lines.append(f'istari_client_bytes_total{{method="{m}",direction="out"}} {s.bytes_out}')
+        family("istari_client_call_seconds", "histogram", "SDK call latency by method.")
+        for m, s in calls:
+            cumulative = 0
+            for bound, n in zip([*map(str, BUCKETS), "+Inf"], s.buckets):
+                cumulative += n
+                lines.append(f'istari_client_call_seconds_bucket{{method="{m}",le="{bound}"}} {cumulative}')
+            lines.append(f'istari_client_call_seconds_sum{{method="{m}"}} {s.seconds:.6f}')
+            lines.append(f'istari_client_call_seconds_count{{method="{m}"}} {s.count}')
+        family("istari_span_seconds_total", "counter", "Time spent in each workflow span.")
+        lines += [f'istari_span_seconds_total{{span="{n}"}} {t:.6f}' for n, (_, t) in spans]
+        family("istari_span_count_total", "counter", "Times each workflow span ran.")
+        lines += [f'istari_span_count_total{{span="{n}"}} {c}' for n, (c, _) in spans]
+        return "\n".join(lines) + "\n"
+
+    def folded_stacks(self):
+        """Collapsed stacks with self time in microseconds, one per line."""
+        with self._lock:
+            items = sorted(self.folded.items())
+        return "".join(f"{path} {round(seconds * 1e6)}\n" for path, seconds in items if seconds > 0)
+
+    def summary(self, top=10):
+        """Short table of the methods with the most total time."""
+        with self._lock:
+            calls = sorted(self.calls.items(), key=lambda item: -item[1].seconds)[:top]
+        lines = [f"{'Method':<32}{'Calls':>8}{'Errors':>8}{'Total (s)':>11}{'Mean (ms)':>11}{'MB':>9}"]
+        for name, s in calls:
+            mb = (s.bytes_in + s.bytes_out) / 1e6
+            lines.append(f"{name:<32}{s.count:>8}{s.errors:>8}{s.seconds:>11.3f}"
+                         f"{1000 * s.seconds / s.count:>11.1f}{mb:>9.1f}")
+        return "\n".join(lines)
+
+    def write(self, prefix):
+        """Write <prefix>.json, <prefix>.prom and <prefix>.folded."""
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{prefix}.json", "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+        with open(f"{prefix}.prom", "w") as f:
+            f.write(self.prometheus())
+        with open(f"{prefix}.folded", "w") as f:
+            f.write(self.folded_stacks())
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve the Prometheus exposition on http://host:port/metrics in the background."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus().encode()
+                self.send_response(200 if self.path.rstrip("/") in ("", "/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class InstrumentedClient:
+    """Client wrapper that records every method call in `metrics`.
+
+    All SDK methods are available unchanged. The byte-level transfer methods
+    in TRANSFER_METHODS are patched on the wrapped client instance so that
+    downloads through `model.read_bytes()` are recorded as well.
+    """
+
+    def __init__(self, client, metrics=None):
+        self.client = client
+        self.metrics = metrics or Metrics()
+        for name in TRANSFER_METHODS:
+            method = getattr(client, name, None)
+            if callable(method):
+                setattr(client, name, self.metrics.wrap(name, method))
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not callable(attr) or name.startswith("__") or name in TRANSFER_METHODS:
+            return attr
+        return self.metrics.wrap(name, attr)
+
+
+def current():
+    """The Metrics installed by get_client(), or None when instrumentation is off."""
+    return _active
+
+
+def span(name):
+    """Time a workflow step under `name`; a no-op when instrumentation is off."""
+    if _active is None:
+        return _noop()
+    return _active.span(name)
+
+
+@contextmanager
+def _noop():
+    yield
+
+
+def instrument(client, prefix=None, port=None):
+    """Wrap `client` and install its Metrics as the process-wide one.
+
+    With `prefix`, results are written to <prefix>.json/.prom/.folded at exit
+    and a summary is printed to stderr. With `port`, /metrics is served while
+    the process runs.
+    """
+    global _active
+    if _active is None:
+        _active = Metrics()
+        if prefix:
+            atexit.register(_finish, _active, prefix)
+        if port:
+            _active.serve(int(port))
+    return InstrumentedClient(client, _active)
+
+
+def _finish(metrics, prefix):
+    metrics.write(prefix)
+    if metrics.calls:
+        print(f"\nIstari client calls ({prefix}.json/.prom/.folded):", file=sys.stderr)
+        print(metrics.summary(), file=sys.stderr)
+
+
+def settings():
+    """(enabled, prefix, port) from ISTARI_METRICS / ISTARI_METRICS_PORT."""
+    value = os.getenv("ISTARI_METRICS", "")
+    port = os.getenv("ISTARI_METRICS_PORT")
+    if value in ("", "0"):
+        return bool(port), None, port
+    return True, "istari_metrics" if value == "1" else value, port
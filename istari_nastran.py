@@ -0,0 +1,588 @@
+"""Local NASTRAN bulk-data (.bdf) reader that loads cards into NumPy arrays.
+
+Gives quick mesh, material, property, load and constraint summaries of a
+deck without an upload or a remote `@istari:extract_input` job. Grids and
+element connectivity become compact arrays (int32 IDs, float64 coordinates),
+not one Python object per card. Materials, properties, loads and constraints
+become one float64 table per card type, with NaN where a field is blank or
+not a number. Other cards are only counted.
+
+The file is memory-mapped and read in one pass, a chunk of whole cards at a
+time. Cards of one or two lines in fixed small-field (8 column) or
+large-field (16 column) format are parsed a chunk at a time with NumPy: the
+fields are sliced out of a padded byte matrix and converted in one call.
+That covers almost every card in a large deck. Free-field (comma) cards,
+lines with tabs, and cards longer than two lines go through a per-card
+parser. Mapped pages are released once their chunk is parsed, so memory
+stays at the arrays plus one chunk.
+
+Usage:
+    from istari_nastran import read_bdf
+
+    bulk = read_bdf("model.bdf")
+    bulk.grids.xyz                      # (n, 3) float64, as written in each grid's CP
+    bulk.elements["CQUAD4"].nodes       # (n, 4) int32
+    bulk.tables["MAT1"]                 # (n, fields) float64: MID, E, G, NU, RHO, ...
+    bulk.summary()                      # dict, ready for json.dump
+
+    python istari_nastran.py model.bdf
+    python istari_nastran.py model.bdf --out fem_summary.json
+"""
+import argparse
+import json
+import math
+import mmap
+import re
+from collections import Counter, defaultdict, namedtuple
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+CHUNK_SIZE = 2 * 1024 * 1024
+
+# Element card -> number of grid fields after EID and PID
+ELEMENT_NODES = {
+    "CROD": 2, "CTUBE": 2, "CBAR": 2, "CBEAM": 2, "CBUSH": 2,
+    "CTRIA3": 3, "CTRIAR": 3, "CTRIA6": 6,
+    "CQUAD4": 4, "CQUADR": 4, "CSHEAR": 4, "CQUAD8": 8,
+    "CTETRA": 10, "CPENTA": 15, "CHEXA": 20,
+}
+MATERIALS = {"MAT1", "MAT2", "MAT4", "MAT5", "MAT8", "MAT9", "MAT10"}
+PROPERTIES = {"PSHELL", "PCOMP", "PCOMPG", "PSOLID", "PBAR", "PBARL", "PBEAM", "PBEAML",
+              "PROD", "PTUBE", "PSHEAR", "PBUSH", "PELAS"}
+LOADS = {"FORCE", "MOMENT", "PLOAD", "PLOAD2", "PLOAD4", "GRAV", "LOAD", "TEMP", "TEMPD"}
+CONSTRAINTS = {"SPC", "SPC1", "SPCADD", "SPCD"}
+TABLES = MATERIALS | PROPERTIES | LOADS | CONSTRAINTS
+TRACKED = {"GRID"} | set(ELEMENT_NODES) | TABLES
+
+# Cards with non-numeric fields that change the meaning of the rest ("THRU")
+PER_CARD = {"SPC1"}
+
+_IMPLICIT_EXPONENT = re.compile(r"^([+-]?(?:\d+\.?\d*|\.\d+))([+-]\d+)$")
+_LINE = 80
+_SPACE, _TAB, _LF, _CR = 32, 9, 10, 13
+_COMMA, _STAR, _DOLLAR = 44, 42, 36
+_SPACES = np.frombuffer(b" " * 8, dtype=np.uint64)[0]
+_MAX_FREE_FIELD = 16
+_MARGIN = _LINE  # a field window can start up to one line past a line start
+_LOW_BYTES = np.array([(1 << 8 * k) - 1 for k in range(9)], dtype=np.uint64)  # lowest k bytes set
+
+Grids = namedtuple("Grids", "ids cp xyz cd")
+Elements = namedtuple("Elements", "ids pids nodes")
+
+
+
+def _codes(names):
+    """Card names as uint64: their 8 characters, space padded, as one word."""
+    return np.frombuffer(b"".join(name.encode().ljust(8) for name in names), dtype=np.uint64)
+
+
+def _name(code):
+    return np.uint64(code).tobytes().decode("latin-1").strip()
+
+
+_TRACKED = _codes(sorted(TRACKED))
+_PER_CARD = _codes(sorted(PER_CARD))
+
+
+def _number(text):
+    """Float value of a NASTRAN field: 1.5, 1.5E-3, 1.5-3, 1.5D-3; NaN if blank or text."""
+    text = text.strip().upper().replace("D", "E")
+    if not text:
+        return math.nan
+    try:
+        return float(text)
+    except ValueError:
+        match = _IMPLICIT_EXPONENT.match(text)
+        return float(f"{match[1]}e{match[2]}") if match else math.nan
+
+
+def _windows(data, width):
+    """Every `width`-byte window of `data` as an S{width} array, without copying."""
+    return np.ndarray((len(data) - width + 1,), dtype=f"S{width}", buffer=data, strides=(1,))
+
+
+def _gather(windows, starts, lengths, right=False):
+    """The texts at `starts` (any shape), with bytes past `lengths` blanked.
+
+    With `right`, each text is moved to the end of its window, as fixed-format
+    fields usually are, with blanks in front.
+    """
+    width = windows.dtype.itemsize
+    lengths = np.clip(lengths, 0, width)
+    text = windows[starts + lengths - width if right else starts]
+    words = text.view(np.uint64).reshape(text.shape + (width // 8,))
+    for j in range(width // 8):  # blank whole bytes of each 8-byte word with a mask
+        if right:
+            blank = _LOW_BYTES[np.clip(width - lengths - 8 * j, 0, 8)]
+        else:
+            blank = ~_LOW_BYTES[np.clip(lengths - 8 * j, 0, 8)]
+        words[..., j] = (words[..., j] & ~blank) | (_SPACES & blank)
+    return text
+
+
+def _integers(words):
+    """Right-justified integer fields (up to 8 digits) from (m, width / 8) uint64 words; -1 elsewhere.
+
+    Eight characters are checked and converted at once, as one 64-bit word.
+    """
+    u = np.uint64
+    y = words[:, -1] ^ u(0x3030303030303030)  # digits -> 0..9, spaces -> 0x10
+    space = (y >> u(4)) & u(0x0101010101010101)  # 1 in each space byte
+    low = y & u(0x0F0F0F0F0F0F0F0F)
+    ok = (y & u(0xE0E0E0E0E0E0E0E0)) == 0
+    ok &= ((low + u(0x0606060606060606)) & u(0x1010101010101010)) == 0  # low nibble <= 9
+    ok &= (low & (space * u(0x0F))) == 0  # a 0x10 byte is exactly a space
+    spaces = space * u(0xFF)
+    ok &= (spaces & (spaces + u(1))) == 0  # spaces only before the digits (the low bytes)
+    ok &= (space >> u(56)) == 0  # the last character is a digit
+    if words.shape[1] > 1:
+        ok &= (words[:, :-1] == _SPACES).all(axis=1)
+    value = (low * u(10) + (low >> u(8))) & u(0x00FF00FF00FF00FF)
+    value = (value * u(100) + (value >> u(16))) & u(0x0000FFFF0000FFFF)
+    value = (value * u(10000) + (value >> u(32))) & u(0x00000000FFFFFFFF)
+    return np.where(ok, value.astype(np.int64), -1)
+
+
+def _values(text):
+    """Field texts (an S8 or S16 array) -> float64 of the same shape, NaN if blank or text."""
+    flat = text.ravel()
+    width = flat.dtype.itemsize
+    out = np.full(len(flat), np.nan)
+    words = flat.view(np.uint64).reshape(len(flat), -1)
+    filled = np.flatnonzero((words != _SPACES).any(axis=1))
+    # Most fields are IDs: plain integers are converted with arithmetic
+    integers = _integers(words[filled])
+    is_integer = integers >= 0
+    out[filled[is_integer]] = integers[is_integer]
+    filled = filled[~is_integer]
+    chars = flat[filled].view(np.uint8).reshape(-1, width)
+    # 1.5-3 style exponents and D exponents need the per-field parser
+    prev = chars[:, :-1]
+    sign = (chars[:, 1:] == ord("+")) | (chars[:, 1:] == ord("-"))
+    after_digit = ((prev >= ord("0")) & (prev <= ord("9"))) | (prev == ord("."))
+    odd = (sign & after_digit).any(axis=1) | ((chars | 0x20) == ord("d")).any(axis=1)
+    plain = filled[~odd]
+    try:
+        out[plain] = flat[plain].astype(np.float64)
+    except ValueError:  # text in a numeric position
+        odd[:] = True
+    for i in filled[odd]:
+        out[i] = _number(flat[i].decode("latin-1"))
+    return out.reshape(text.shape)
+
+
+def _card_fields(lines):
+    """(name, [field text]) for one card of any format, given its decoded lines."""
+    name, fields = None, []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        line = line.split("$", 1)[0]
+        if "," in line:
+            parts = line.split(",")
+            head, data = parts[0].strip(), parts[1:]
+            per_line = 4 if head.endswith("*") else 8
+            rest = data[per_line:]
+            if rest and math.isnan(_number(rest[0])):
+                rest = rest[1:]  # the continuation field, blank or a marker like +C1
+            # Fields past it continue the card, as if on the next line
+            data = data[:per_line] + rest
+            data += [""] * (-len(data) % per_line)
+        else:
+            line = line.expandtabs(8)
+            head = line[:8].strip()
+            large = "*" in head
+            width = 16 if large else 8
+            data = [line[start:start + width] for start in range(8, 72, width)]
+        if name is None:
+            name = head.rstrip("*").strip().upper()
+        fields += [field.strip() for field in data]
+    while fields and not fields[-1]:
+        fields.pop()
+    return name, fields
+
+
+def _spc1_rows(fields):
+    """SPC1 as (SID, components, grid) rows, with GRID THRU GRID expanded."""
+    sid, components, grids = _number(fields[0]), _number(fields[1]), fields[2:]
+    if len(grids) >= 3 and grids[1].upper() == "THRU":
+        ids = range(int(_number(grids[0])), int(_number(grids[2])) + 1)
+    else:
+        ids = [int(v) for v in map(_number, grids) if not math.isnan(v)]
+    return [[sid, components, g] for g in ids]
+
+
+def _reduce(name, values):
+    """Shrink a card type's (n, fields) float64 values to what is kept for it."""
+    if name == "GRID":
+        return _pad(values, 6, np.nan)[:, :6]
+    if name in ELEMENT_NODES:
+        kept = _pad(values, 2 + ELEMENT_NODES[name], np.nan)[:, :2 + ELEMENT_NODES[name]]
+        return np.nan_to_num(kept, nan=0).astype(np.int32)
+    return values
+
+
+def _pad(block, width, fill):
+    if block.shape[1] >= width:
+        return block
+    padding = np.full((len(block), width - block.shape[1]), fill, dtype=block.dtype)
+    return np.hstack([block, padding])
+
+
+class BulkData:
+    """Arrays of one deck's bulk data."""
+
+    def __init__(self, path, size, seconds, grids, elements, tables, cards):
+        self.path = path
+        self.size = size  # bytes
+        self.seconds = seconds  # read time
+        self.grids = grids
+        self.elements = elements  # {card: Elements}
+        self.tables = tables  # {card: (n, fields) float64}
+        self.cards = cards  # Counter of every bulk data card
+
+    def summary(self):
+        """Mesh, materials, properties, loads and constraints as plain data."""
+        xyz = self.grids.xyz
+        by_property = Counter()
+        for elements in self.elements.values():
+            pids, counts = np.unique(elements.pids, return_counts=True)
+            by_property.update(dict(zip(pids.tolist(), counts.tolist())))
+        mesh = {
+            "grids": len(self.grids.ids),
+            "bounds": {"min": xyz.min(axis=0).tolist(), "max": xyz.max(axis=0).tolist()} if len(xyz) else None,
+            "elements": {name: len(e.ids) for name, e in sorted(self.elements.items())},
+            "elements_by_property": {str(pid): n for pid, n in sorted(by_property.items())},
+        }
+        return _json_safe({
+            "file": Path(self.path).name,
+            "size_bytes": self.size,
+            "cards": dict(self.cards.most_common()),
+            "mesh": mesh,
+            "materials": self._rows(MATERIALS, {"MAT1": [("E", float), ("G", float), ("nu", float), ("rho", float)]}),
+            "properties": self._rows(PROPERTIES, {"PSHELL": [("material", int), ("thickness", float)]}),
+            "loads": self._loads(),
+            "constraints": self._constraints(),
+        })
+
+    def _rows(self, cards, named):
+        rows = []
+        for card in sorted(cards & self.tables.keys()):
+            names = named.get(card)
+            for values in self.tables[card]:
+                row = {"card": card, "id": int(values[0])}
+                if names:
+                    for (key, kind), value in zip(names, values[1:].tolist()):
+                        row[key] = None if math.isnan(value) else kind(value)
+                else:
+                    row["fields"] = values[1:].tolist()
+                rows.append(row)
+        return rows
+
+    def _loads(self):
+        loads = {}
+        for card in sorted(LOADS & self.tables.keys()):
+            table = self.tables[card]
+            sets = []
+            for sid in np.unique(table[:, 0]):
+                rows = table[table[:, 0] == sid]
+                entry = {"set": int(sid), "count": len(rows)}
+                if card in ("FORCE", "MOMENT"):  # SID, G, CID, scale, N1, N2, N3
+                    rows = _pad(rows, 7, np.nan)
+                    entry["resultant"] = np.nansum(rows[:, 3:4] * rows[:, 4:7], axis=0).tolist()
+                sets.append(entry)
+            loads[card] = sets
+        return loads
+
+    def _constraints(self):
+        constraints = {}
+        for card in sorted(CONSTRAINTS & self.tables.keys()):
+            table = self.tables[card]
+            sets = []
+            for sid in np.unique(table[:, 0]):
+                rows = table[table[:, 0] == sid]
+                entry = {"set": int(sid), "count": len(rows)}
+                if card == "SPC1":  # SID, components, grid
+                    entry["grids"] = len(np.unique(rows[:, 2]))
+                    entry["components"] = sorted({str(int(c)) for c in rows[:, 1] if not math.isnan(c)})
+                sets.append(entry)
+            constraints[card] = sets
+        return constraints
+
+
+def _json_safe(value):
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(v) for v in value]
+    return value
+
+
+def _file_order(offsets):
+    """The permutation that puts rows back in file order, or None if they already are.
+
+    Each chunk appends its vectorized groups before its per-card rows, so a
+    card type's blocks can interleave.
+    """
+    offsets = np.concatenate(offsets)
+    if len(offsets) < 2 or (np.diff(offsets) >= 0).all():
+        return None
+    return np.argsort(offsets, kind="stable")
+
+
+class _Reader:
+    """Parses chunks of whole cards and collects the arrays."""
+
+    def __init__(self):
+        self.blocks = defaultdict(list)  # card -> [(file offsets, reduced arrays)]
+        self.cards = Counter()
+
+    def feed(self, chunk, final, offset=0):
+        """Parse the whole cards in `chunk` (a uint8 array); return the bytes consumed.
+
+        Unless `final`, the last card is left for the next chunk, since its
+        continuation lines may not be in this one. `offset` is the chunk's
+        position in the file, which keeps the rows in file order.
+        """
+        size = len(chunk)
+        # Blank margins, so windows can reach before the first and after the last line
+        padded = np.full(size + 2 * _MARGIN, _SPACE, dtype=np.uint8)
+        padded[_MARGIN:_MARGIN + size] = chunk
+        data = padded[_MARGIN:]
+        newlines = np.flatnonzero(chunk == _LF)
+        starts = np.concatenate(([0], newlines + 1))
+        ends = np.append(newlines, size)
+        if not final:  # the text after the last newline is a partial line
+            starts, ends = starts[:-1], ends[:-1]
+        lengths = ends - starts
+        lengths -= (lengths > 0) & (data[np.maximum(ends - 1, 0)] == _CR)
+        first = np.where(lengths > 0, data[starts], _SPACE)
+
+        skip = (lengths == 0) | (first == _DOLLAR)
+        for i in np.flatnonzero(~skip & ((first == _SPACE) | (first == _TAB))):
+            skip[i] = not bytes(chunk[starts[i]:starts[i] + lengths[i]]).strip()
+        kept = np.flatnonzero(~skip)
+        upper = first[kept] & 0xDF
+        card_start = kept[(upper >= ord("A")) & (upper <= ord("Z"))]
+        if len(card_start) == 0:  # comments and orphan continuation lines only
+            return size if final else (int(newlines[-1]) + 1 if len(newlines) else 0)
+        if final:
+            cards, consumed = card_start, size
+        else:
+            if len(card_start) == 1:
+                return 0  # one card longer than the chunk: the caller reads a bigger one
+            cards, consumed = card_start[:-1], int(starts[card_start[-1]])
+
+        # Lines of each card: from its first line to the next card's
+        first_pos = np.searchsorted(kept, cards)
+        stop_pos = np.searchsorted(kept, card_start[len(cards)]) if len(cards) < len(card_start) else len(kept)
+        line_count = np.diff(np.append(first_pos, stop_pos))
+        second = kept[np.minimum(first_pos + 1, len(kept) - 1)]
+        two = line_count == 2
+
+        # Commas mark free-field lines; tabs, inline comments and long lines need the per-card parser
+        line_end = starts[-1] + lengths[-1] if len(starts) else 0
+        commas = np.flatnonzero(chunk[:line_end] == _COMMA)
+        comma_line = np.searchsorted(starts, commas, side="right") - 1
+        comma_count = np.bincount(comma_line, minlength=len(starts))
+        special = lengths > _LINE
+        odd_chars = np.flatnonzero((chunk[:line_end] == _TAB) | (chunk[:line_end] == _DOLLAR))
+        special[np.searchsorted(starts, odd_chars, side="right") - 1] = True
+
+        fixed_line = (comma_count == 0) & ~special
+        fixed = (line_count <= 2) & fixed_line[cards] & (~two | fixed_line[second])
+        # A tenth field (a continuation marker, or data that continues the card) is the per-card parser's
+        free = (line_count == 1) & ~special[cards] & (comma_count[cards] > 0) & (comma_count[cards] <= 8)
+        first_comma = commas[np.minimum(np.searchsorted(comma_line, cards), max(len(commas) - 1, 0))] \
+            if len(commas) else np.zeros(len(cards), dtype=np.int64)
+        name_length = np.where(free, first_comma - starts[cards], np.minimum(lengths[cards], 8))
+        free &= name_length <= 8
+
+        names = _gather(_windows(padded, 8), _MARGIN + starts[cards], name_length)
+        chars = names.view(np.uint8).reshape(-1, 8)
+        star = chars == _STAR
+        large = star.any(axis=1)
+        chars[star] = _SPACE
+        chars[(chars >= ord("a")) & (chars <= ord("z"))] -= 32
+        names = names.view(np.uint64)
+        fixed &= ~two | (large == (first[second] == _STAR))
+        free &= ~large
+        per_card = np.isin(names, _PER_CARD)
+        fixed &= ~per_card
+        free &= ~per_card
+
+        # Free-field fields lie between commas: (cards, 8) start and end offsets
+        free_cards = np.flatnonzero(free)
+        if len(free_cards):
+            line_ends = (starts + lengths)[cards[free_cards]]
+            bounds = np.repeat(line_ends[:, None], 9, axis=1)
+            first_index = np.searchsorted(comma_line, cards[free_cards])
+            count = comma_count[cards[free_cards]]
+            for k in range(9):
+                has = count > k
+                bounds[has, k] = commas[first_index[has] + k]
+            free_starts, free_lengths = bounds[:, :8] + 1, bounds[:, 1:9] - bounds[:, :8] - 1
+            fits = (free_lengths <= _MAX_FREE_FIELD).all(axis=1)
+            free[free_cards[~fits]] = False
+            free_cards, free_starts, free_lengths = free_cards[fits], free_starts[fits], free_lengths[fits]
+
+        fast = fixed | free
+        unique, counts = np.unique(names[fast], return_counts=True)
+        self.cards.update({_name(code): n for code, n in zip(unique, counts.tolist())})
+        tracked = np.isin(names, _TRACKED)
+
+        groups = []
+        for lines, is_large in ((1, False), (1, True), (2, False), (2, True)):
+            group = np.flatnonzero(tracked & fixed & (line_count == lines) & (large == is_large))
+            if len(group):
+                width = 16 if is_large else 8
+                offsets = np.arange(8, 72, width)
+                windows = _windows(padded, width)
+                card_lines = [cards[group], second[group]][:lines]
+                values = np.hstack([
+                    _values(_gather(windows, _MARGIN + starts[i][:, None] + offsets, lengths[i][:, None] - offsets))
+                    for i in card_lines
+                ])
+                groups.append((group, values))
+        if tracked[free_cards].any():
+            keep = tracked[free_cards]
+            text = _gather(_windows(padded, _MAX_FREE_FIELD), _MARGIN + free_starts[keep], free_lengths[keep],
+                           right=True)
+            groups.append((free_cards[keep], _values(text)))
+        for group, values in groups:
+            group_names = names[group]
+            for code in np.unique(group_names):
+                name = _name(code)
+                subset = group_names == code
+                self.blocks[name].append((offset + starts[cards[group[subset]]], _reduce(name, values[subset])))
+
+        rows, row_offsets = defaultdict(list), defaultdict(list)
+        for k in np.flatnonzero(~fast):
+            text = [bytes(chunk[starts[i]:starts[i] + lengths[i]]).decode("latin-1")
+                    for i in kept[first_pos[k]:first_pos[k] + line_count[k]]]
+            name, fields = _card_fields(text)
+            self.cards[name] += 1
+            if name == "SPC1":
+                new = _spc1_rows(fields)
+            elif name in TRACKED:
+                new = [[_number(field) for field in fields]]
+            else:
+                continue
+            rows[name] += new
+            row_offsets[name] += [offset + int(starts[cards[k]])] * len(new)
+        for name, values in rows.items():
+            if not values:
+                continue
+            width = max(len(row) for row in values)
+            values = np.array([row + [math.nan] * (width - len(row)) for row in values]).reshape(len(values), width)
+            self.blocks[name].append((np.array(row_offsets[name], dtype=np.int64), _reduce(name, values)))
+        return consumed
+
+    def arrays(self, name):
+        """All of a card type's values, padded to one width. Its blocks are released."""
+        blocks = self.blocks.pop(name, None)
+        if not blocks:
+            return None
+        order = _file_order([offsets for offsets, _ in blocks])
+        width = max(block.shape[1] for _, block in blocks)
+        values = np.vstack([_pad(block, width, 0 if block.dtype.kind == "i" else np.nan) for _, block in blocks])
+        return values if order is None else values[order]
+
+    def result(self, path, size, seconds):
+        # Column by column, so the grids are never held twice over
+        blocks = self.blocks.pop("GRID", None) or [(np.empty(0, dtype=np.int64), np.empty((0, 6)))]
+        order = _file_order([offsets for offsets, _ in blocks])
+        ids, cp, cd = (np.nan_to_num(np.concatenate([b[:, i] for _, b in blocks]), nan=0).astype(np.int32)
+                       for i in (0, 1, 5))
+        xyz = np.concatenate([b[:, 2:5] for _, b in blocks])
+        del blocks
+        if order is not None:
+            ids, cp, xyz, cd = ids[order], cp[order], xyz[order], cd[order]
+        grids = Grids(ids, cp, xyz, cd)
+        elements = {}
+        for name in ELEMENT_NODES:
+            values = self.arrays(name)
+            if values is not None:
+                elements[name] = Elements(values[:, 0].copy(), values[:, 1].copy(),
+                                          np.ascontiguousarray(values[:, 2:]))
+        tables = {}
+        for name in sorted(TABLES):
+            values = self.arrays(name)
+            if values is not None:
+                tables[name] = values
+        return BulkData(path, size, seconds, grids, elements, tables, self.cards)
+
+
+def _bulk_range(mm):
+    """(start, end) byte offsets of the bulk data: after BEGIN BULK, before ENDDATA."""
+    begin = re.search(rb"(?im)^[ \t]*BEGIN[ \t]+BULK[^\n]*\n", mm)
+    start = begin.end() if begin else 0  # no executive/case control: all bulk data
+    end = mm.rfind(b"\nENDDATA", start)
+    if end < 0:
+        end = mm.rfind(b"\nenddata", start)
+    return start, (end + 1 if end >= 0 else len(mm))
+
+
+def read_bdf(path, chunk_size=CHUNK_SIZE):
+    """Read a deck's bulk data into a BulkData. INCLUDE files are not followed."""
+    started = perf_counter()
+    path = Path(path)
+    reader = _Reader()
+    size = path.stat().st_size
+    if size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos, end = _bulk_range(mm)
+            released = 0
+            length = chunk_size
+            while pos < end:
+                stop = min(pos + length, end)
+                consumed = reader.feed(np.frombuffer(mm[pos:stop], dtype=np.uint8), final=stop == end, offset=pos)
+                if consumed == 0:
+                    length *= 2
+                    continue
+                pos, length = pos + consumed, chunk_size
+                # The parsed pages are no longer needed; let them go from memory
+                page_end = pos // mmap.PAGESIZE * mmap.PAGESIZE
+                if hasattr(mm, "madvise") and page_end > released:
+                    mm.madvise(mmap.MADV_DONTNEED, released, page_end - released)
+                    released = page_end
+    return reader.result(str(path), size, perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a NASTRAN bulk data file locally")
+    parser.add_argument("bdf", help="Path to a .bdf/.dat/.nas file")
+    parser.add_argument("--out", default=None, help="Write the summary JSON to this file")
+    args = parser.parse_args()
+
+    bulk = read_bdf(args.bdf)
+    mb = bulk.size / (1024 * 1024)
+    print(f"Read {Path(args.bdf).name}: {mb:.1f} MB in {bulk.seconds:.2f}s "
+          f"({mb / max(bulk.seconds, 1e-9):.0f} MB/s)")
+    summary = bulk.summary()
+    mesh = summary["mesh"]
+    print(f"\nMesh: {mesh['grids']} grids")
+    for name, count in mesh["elements"].items():
+        print(f"  {name:<8} {count}")
+    print(f"\nMaterials: {len(summary['materials'])}   Properties: {len(summary['properties'])}")
+    for card, sets in {**summary["loads"], **summary["constraints"]}.items():
+        for entry in sets:
+            extra = f", resultant {entry['resultant']}" if "resultant" in entry else ""
+            extra += f", {entry['grids']} grids, DOF {'/'.join(entry['components'])}" if "grids" in entry else ""
+            print(f"{card} set {entry['set']}: {entry['count']} card(s){extra}")
+    other = {name: n for name, n in summary["cards"].items() if name not in TRACKED}
+    if other:
+        print(f"\nOther cards (counted only): {other}")
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(summary, indent=2))
+        print(f"\nSaved {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Lazy, auto-paginating iterators over the SDK's list_* calls.
+
+Every list_* method returns one page at a time. These helpers walk all pages,
+fetching page N+1 in the background while page N is being consumed, and stop
+as soon as the caller does.
+
+Usage:
+    from istari_client import get_client
+    from istari_pagination import paginate
+
+    client = get_client()
+    configs = paginate(client.list_system_configurations, system_id)
+    print(f"Configurations ({configs.total}):")
+    for config in configs:
+        print(config.name)
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+# Server-side cap on `size` for every list_* endpoint
+MAX_PAGE_SIZE = 100
+
+
+def iter_pages(list_fn, *args, size=MAX_PAGE_SIZE, limit=None, prefetch=True, **kwargs):
+    """Yield successive pages from a list_* call.
+
+    Page size is clamped to the server maximum (and to `limit`, if given, so a
+    short listing is a single small request). With `prefetch`, the next page
+    is requested in a background thread while the current one is yielded.
+    Closing the generator early cancels any outstanding fetch.
+    """
+    size = max(1, min(size, MAX_PAGE_SIZE, limit or MAX_PAGE_SIZE))
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+    def fetch(number):
+        if executor:
+            return executor.submit(list_fn, *args, page=number, size=size, **kwargs)
+        return list_fn(*args, page=number, size=size, **kwargs)
+
+    try:
+        number, seen = 1, 0
+        pending = fetch(number)
+        while True:
+            page = pending.result() if executor else pending
+            seen += len(page.items)
+            if _has_next(page, number, size, seen, limit):
+                number += 1
+                if executor:
+                    pending = fetch(number)
+                    yield page
+                else:
+                    yield page  # fetch the next page only if the caller asks for it
+                    pending = fetch(number)
+            else:
+                yield page
+                return
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _has_next(page, number, size, seen, limit):
+    """Decide whether another page exists, using whatever the server reported."""
+    if not page.items or (limit and seen >= limit):
+        return False
+    pages = getattr(page, "pages", None)
+    if pages is not None:
+        return number < pages
+    total = getattr(page, "total", None)
+    if total is not None:
+        return seen < total
+    return len(page.items) >= size
+
+
+def iter_items(list_fn, *args, limit=None, **kwargs):
+    """Yield every item from a list_* call, across all pages."""
+    count = 0
+    for page in iter_pages(list_fn, *args, limit=limit, **kwargs):
+        for item in page.items:
+            if limit and count >= limit:
+                return
+            count += 1
+            yield item
+
+
+class Paginated:
+    """All items of a list_* call, with the same `.total`/`.items` shape as a page.
+
+    Iterating streams items page by page. `.total` only needs the first page.
+    `.items` materializes (and caches) the full list for code that indexes it.
+    """
+
+    def __init__(self, list_fn, *args, limit=None, **kwargs):
+        self._pages = iter_pages(list_fn, *args, limit=limit, **kwargs)
+        self._limit = limit
+        self._fetched = []
+        self._started = False
+        self._done = False
+        self._total = None
+
+    def _next_page(self):
+        try:
+            page = next(self._pages)
+        except StopIteration:
+            self._done = True
+            return False
+        if not self._started:
+            self._started = True
+            self._total = getattr(page, "total", None)
+        self._fetched.extend(page.items)
+        if self._limit:
+            del self._fetched[self._limit:]
+        return True
+
+    @property
+    def total(self):
+        if not self._started:
+            self._next_page()
+        return self._total
+
+    @property
+    def items(self):
+        while not self._done:
+            self._next_page()
+        return self._fetched
+
+    def __iter__(self):
+        index = 0
+        while True:
+            while index < len(self._fetched):
+                yield self._fetched[index]
+                index += 1
+            if self._done or not self._next_page():
+                return
+
+    def __len__(self):
+        return len(self.items)
+
+
+def paginate(list_fn, *args, **kwargs):
+    """Wrap a list_* call so it covers every page. See Paginated."""
+    return Paginated(list_fn, *args, **kwargs)
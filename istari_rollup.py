@@ -0,0 +1,261 @@
+"""Hierarchical mass, power and cost roll-ups over extracted SysML parts.
+
+output_parts.json is flat, keyed by qualified name
+('Complex Drone System'::Drone::'Propulsion System'::engine). Here the
+names become a tree: each node keeps its own values and the total of its
+subtree, as Cameo's MassRollUpPattern / PowerRollUpPattern compute them
+(a part's total is its own value plus its subparts' totals). Ancestors that
+are not parts themselves (packages, the system) are nodes too.
+
+The tree is compact: name segments are interned, parents and depths are
+flat int arrays, values are NumPy arrays, and child lists are one index
+array with per-node offsets, instead of a dict per node. Building it sums level by level.
+Changing a part adjusts only the totals on its path to the root.
+
+Usage:
+    from istari_rollup import RollupTree
+
+    tree = RollupTree(parts)                       # mass, power and cost
+    tree.total()                                    # whole model: {"mass": ..., "power": ..., "cost": ...}
+    tree.total("'Complex Drone System'::Drone::'Propulsion System'")["mass"]
+    tree.update({qualified_name: changed_part})     # ancestors' subtotals adjusted
+    print(tree.format(depth=3))
+
+    python istari_rollup.py output_parts.json --depth 3
+    python istari_rollup.py model.sysml --rollup mass=mass --rollup thrust=maxThrust
+"""
+import argparse
+import json
+import sys
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+# Roll-up name -> part attribute holding each part's own value
+ROLLUPS = {"mass": "mass", "power": "powerConsumption", "cost": "cost"}
+
+_ROOT = 0
+_PART, _GROUP, _REMOVED = 1, 0, -1  # node kinds: a part, only an ancestor of parts, gone
+
+
+def split_name(qualified_name):
+    """Segments of a qualified name: "'A B'::C" -> ["'A B'", "C"]. Quoted names may contain "::"."""
+    pieces = qualified_name.split("::")
+    if "'" not in qualified_name:
+        return pieces
+    segments = []
+    for piece in pieces:
+        if segments and segments[-1].count("'") % 2:  # still inside a quoted name
+            segments[-1] += "::" + piece
+        else:
+            segments.append(piece)
+    return segments
+
+
+def part_value(part, attribute):
+    """A part's own value of a roll-up attribute; 0 where unset or not a number."""
+    value = part.get("attributes", {}).get(attribute, {}).get("value")
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _values(part, attributes):
+    """A part's own value of each roll-up attribute, as part_value()."""
+    return [part_value(part, attribute) for attribute in attributes]
+
+
+class RollupTree:
+    """Per-node roll-up totals over the qualified-name tree of a parts dict.
+
+    Node 0 is the root above every top-level name; `total()` without a name
+    is the whole model. `rollups` maps roll-up names to part attributes.
+    """
+
+    def __init__(self, parts, rollups=ROLLUPS):
+        self.rollups = list(rollups)
+        self.attributes = [rollups[name] for name in self.rollups]
+        self._index = {}  # qualified name -> node
+        self._names = [""]  # node -> interned last segment
+        self._parent = array("i", [-1])
+        self._depth = array("i", [0])
+        self._kind = array("b", [_GROUP])
+        self._own = self._total = None  # (nodes, roll-ups) once built
+        self._children = None  # (starts, child nodes) for all nodes, built on demand
+        nodes, values = [], []
+        for qualified_name, part in parts.items():
+            node = self._add(qualified_name)
+            self._kind[node] = _PART
+            nodes.append(node)
+            values.append(_values(part, self.attributes))
+        self._own = np.zeros((len(self._parent), len(self.rollups)))
+        if nodes:
+            self._own[nodes] = values
+        self._total = self._own.copy()
+        self._sum_levels()
+
+    def _sum_levels(self):
+        """Totals from own values, deepest level first: one vector sum per level."""
+        depth = np.frombuffer(self._depth, dtype=np.int32)
+        parent = np.frombuffer(self._parent, dtype=np.int32)
+        order = np.argsort(depth, kind="stable")
+        bounds = np.searchsorted(depth[order], np.arange(int(depth.max()) + 2))
+        for level in range(len(bounds) - 2, 0, -1):
+            nodes = order[bounds[level]:bounds[level + 1]]
+            np.add.at(self._total, parent[nodes], self._total[nodes])
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, qualified_name):
+        return qualified_name in self._index
+
+    def node(self, qualified_name=None):
+        """Node index of a qualified name (the root for None); KeyError if absent."""
+        return _ROOT if qualified_name is None else self._index[qualified_name]
+
+    def qualified_name(self, node):
+        segments = []
+        while node != _ROOT:
+            segments.append(self._names[node])
+            node = self._parent[node]
+        return "::".join(reversed(segments))
+
+    def is_part(self, node):
+        return self._kind[node] == _PART
+
+    def total(self, qualified_name=None):
+        """{roll-up: total} over a node's subtree (the whole model for None)."""
+        return dict(zip(self.rollups, self._total[self.node(qualified_name)].tolist()))
+
+    def own(self, qualified_name):
+        """{roll-up: value} of the part itself."""
+        return dict(zip(self.rollups, self._own[self.node(qualified_name)].tolist()))
+
+    def children(self, node=_ROOT):
+        """Child nodes of a node, in the order their parts were first seen."""
+        if self._children is None:
+            parent = np.array(self._parent, dtype=np.int32)
+            order = np.argsort(parent[1:], kind="stable") + 1
+            order = order[np.array(self._kind, dtype=np.int8)[order] != _REMOVED]
+            starts = np.searchsorted(parent[order], np.arange(len(parent) + 1))
+            self._children = (starts, order)
+        starts, order = self._children
+        return order[starts[node]:starts[node + 1]]
+
+    def _add(self, qualified_name):
+        """Node for a name, adding it and any missing ancestors with zero values."""
+        node = self._index.get(qualified_name)
+        if node is not None:
+            return node
+        head, _, name = qualified_name.rpartition("::")
+        if name.count("'") % 2:  # "::" inside a quoted name
+            segments = split_name(qualified_name)
+            head, name = "::".join(segments[:-1]), segments[-1]
+        parent = self._add(head) if head else _ROOT
+        node = len(self._parent)
+        self._index[qualified_name] = node
+        self._names.append(sys.intern(name))
+        self._parent.append(parent)
+        self._depth.append(self._depth[parent] + 1)
+        self._kind.append(_GROUP)
+        if self._own is not None and node >= len(self._own):  # added after the build: grow the values
+            grown = max(node + 1, 2 * len(self._own))
+            self._own = np.resize(self._own, (grown, len(self.rollups)))
+            self._total = np.resize(self._total, (grown, len(self.rollups)))
+            self._own[node:] = self._total[node:] = 0
+        self._children = None
+        return node
+
+    def _ancestry(self, node):
+        """A node and all its ancestors up to the root."""
+        path = [node]
+        while node != _ROOT:
+            node = self._parent[node]
+            path.append(node)
+        return path
+
+    def _set(self, node, values):
+        """Give a node new own values and move its ancestors' totals by the difference."""
+        values = np.asarray(values, dtype=float)
+        delta = values - self._own[node]
+        if not delta.any():
+            return False
+        self._own[node] = values
+        self._total[self._ancestry(node)] += delta
+        return True
+
+    def update(self, changed, removed=()):
+        """Apply changed or added parts and removed names. Returns the roll-ups whose model total moved.
+
+        Each part costs one walk up its ancestor path, not a re-sum.
+        """
+        before = self._total[_ROOT].copy()
+        for qualified_name, part in changed.items():
+            node = self._add(qualified_name)
+            self._kind[node] = _PART
+            self._set(node, _values(part, self.attributes))
+        for qualified_name in removed:
+            node = self._index.get(qualified_name)
+            if node is None or self._kind[node] != _PART:
+                continue
+            self._set(node, np.zeros(len(self.rollups)))
+            self._kind[node] = _GROUP
+            self._prune(node)
+        return {name for name, old, new in zip(self.rollups, before, self._total[_ROOT]) if old != new}
+
+    def _prune(self, node):
+        """Drop a node that is no longer a part and has nothing under it, then its bare ancestors."""
+        while node != _ROOT and self._kind[node] == _GROUP and not len(self.children(node)):
+            del self._index[self.qualified_name(node)]
+            self._kind[node] = _REMOVED
+            self._children = None
+            node = self._parent[node]
+
+    def rows(self, depth=None, qualified_name=None):
+        """(qualified name, level, {roll-up: total}) for a subtree, parents before children."""
+        start = self.node(qualified_name)
+        stack = [(start, 0)] if start != _ROOT else [(child, 1) for child in reversed(self.children())]
+        while stack:
+            node, level = stack.pop()
+            yield self.qualified_name(node), level, dict(zip(self.rollups, self._total[node].tolist()))
+            if depth is None or level < depth:
+                stack.extend((child, level + 1) for child in reversed(self.children(node)))
+
+    def format(self, depth=2, qualified_name=None):
+        """Indented table of subtotals down to `depth` levels."""
+        header = f"{'':<48}" + "".join(f"{name:>12}" for name in self.rollups)
+        lines = [header]
+        for name, level, totals in self.rows(depth, qualified_name):
+            label = "  " * (level - 1) + split_name(name)[-1]
+            lines.append(f"{label:<48}" + "".join(f"{totals[r]:>12.1f}" for r in self.rollups))
+        total = self.total(qualified_name)
+        lines.append(f"{'Total':<48}" + "".join(f"{total[r]:>12.1f}" for r in self.rollups))
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mass/power/cost roll-up of SysML parts by qualified name")
+    parser.add_argument("path", help="output_parts.json, or a .sysml file to extract first")
+    parser.add_argument("--depth", type=int, default=3, help="Levels to show (default: 3)")
+    parser.add_argument("--rollup", action="append", default=None, metavar="NAME=ATTRIBUTE",
+                        help="Roll up this part attribute (repeatable; default: mass, power, cost)")
+    parser.add_argument("--under", default=None, help="Only the subtree under this qualified name")
+    args = parser.parse_args()
+
+    if args.path.endswith(".sysml"):
+        from istari_sysml import extract_file
+
+        _, parts = extract_file(args.path)
+    else:
+        parts = json.loads(Path(args.path).read_text())
+    rollups = dict(item.split("=", 1) for item in args.rollup) if args.rollup else ROLLUPS
+    tree = RollupTree(parts, rollups)
+    print(f"{args.path}: {len(parts)} parts, {len(tree)} nodes\n")
+    print(tree.format(args.depth, args.under))
+
+
+if __name__ == "__main__":
+    main()
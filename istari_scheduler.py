@@ -0,0 +1,351 @@
+"""Client-side placement of Istari jobs on agents.
+
+Left to the platform (assigned_agent_id=None) or pinned to one agent, a
+batch of jobs can queue behind one busy agent while others sit idle. An
+AgentScheduler keeps jobs in a local queue and assigns each to the agent
+expected to finish it first:
+
+    expected completion = time until one of the agent's slots frees
+                          + the agent's expected run time for the function
+
+Run times (submission to finish, so they include any queueing on the agent)
+are learned per agent and function from jobs that finish. An agent reported
+busy when the scheduler has nothing on it is assumed to be half way through
+someone else's job. The queue is planned as a whole, each job taking the
+slot it would finish on first after those ahead of it, and only the jobs
+planned onto a slot that is open now are submitted; the rest stay queued
+rather than going to a slower agent. No agent gets more than its limit of
+jobs. Users take turns: the next job comes from the user with the fewest
+jobs in flight.
+
+Usage:
+    from istari_scheduler import AgentScheduler, JobSpec, discover_agents
+
+    agents = discover_agents(client, operating_system="RHEL 8")
+    scheduler = AgentScheduler(client, agents, limit=2)
+    for params in variants:
+        scheduler.submit(JobSpec(model_id, "@ntop:run_model", {"ntop_input_json": params},
+                                 "ntopcl", "5.30", "RHEL 8"), user="alice")
+    for done in scheduler.run():
+        print(done.spec.description, done.agent.name, done.status.value)
+
+    # One job on whichever of several agents is free
+    agent_id = choose_agent(client, ["<A1>", "<A2>"], spec)
+
+    python istari_scheduler.py --os "RHEL 8"    # list agents and whether they are busy
+"""
+import argparse
+import statistics
+from collections import Counter, defaultdict, deque, namedtuple
+from itertools import count
+from time import monotonic, sleep
+
+from istari_digital_client import AgentStatusName, JobStatusName
+from istari_jobs import JobWatcher, TERMINAL_STATUSES
+from istari_pagination import iter_items
+from istari_throttle import retry_call
+
+# Agent statuses that mean a job is on the agent
+BUSY_STATUSES = {AgentStatusName.CLAIMINGJOB, AgentStatusName.VALIDATINGJOB,
+                 AgentStatusName.EXECUTINGJOB, AgentStatusName.UPLOADINGJOB}
+UNAVAILABLE_STATUSES = {AgentStatusName.PAUSED, AgentStatusName.UPDATINGAGENT,
+                        AgentStatusName.UPDATINGMODULE}
+
+Agent = namedtuple("Agent", ["id", "name", "operating_system", "busy"])
+JobSpec = namedtuple(
+    "JobSpec",
+    ["model_id", "function", "parameters", "tool_name", "tool_version", "operating_system", "description"],
+    defaults=[None, None, None, None, None],
+)
+Finished = namedtuple("Finished", ["ticket", "spec", "user", "job", "agent", "status", "seconds"])
+
+
+def _latest(history):
+    return max(history, key=lambda entry: entry.created) if history else None
+
+
+def _agent(resource):
+    info = _latest(getattr(resource, "information_history", None))
+    name = _latest(getattr(resource, "display_name_history", None))
+    status = _latest(getattr(resource, "status_history", None))
+    return Agent(
+        id=resource.id,
+        name=name.display_name if name else resource.id[:8],
+        operating_system=info.host_os if info else None,
+        busy=None if status is None else status.name in BUSY_STATUSES,
+    ), status.name if status else None
+
+
+def _run_seconds(job, observed):
+    """Submission to finish from the job's own timestamps, else as observed by polling."""
+    history = [s for s in getattr(job, "status_history", None) or [] if getattr(s, "created", None)]
+    created = getattr(job, "created", None)
+    if created and history:
+        seconds = (_latest(history).created - created).total_seconds()
+        if seconds >= 0:
+            return seconds
+    return observed
+
+
+def discover_agents(client, operating_system=None):
+    """Active agents that can take jobs, optionally only those on one OS."""
+    agents = []
+    for resource in iter_items(client.list_agents):
+        agent, status = _agent(resource)
+        if status in UNAVAILABLE_STATUSES:
+            continue
+        if operating_system and agent.operating_system not in (None, operating_system):
+            continue
+        agents.append(agent)
+    return agents
+
+
+def get_agents(client, agent_ids):
+    """Agents for the given IDs, with their current busy status where readable."""
+    agents = []
+    for agent_id in agent_ids:
+        try:
+            agent, _ = _agent(retry_call(client.get_agent, agent_id))
+        except Exception:  # not readable with this token: schedule on it blind
+            agent = Agent(agent_id, agent_id[:8], None, None)
+        agents.append(agent)
+    return agents
+
+
+def choose_agent(client, agent_ids, spec):
+    """The one of `agent_ids` to run a single job on now: an idle one if any.
+
+    Returns None for no IDs (the platform picks) and the ID itself for one.
+    """
+    if len(agent_ids or []) < 2:
+        return agent_ids[0] if agent_ids else None
+    return AgentScheduler(client, get_agents(client, agent_ids), refresh=0).place(spec).id
+
+
+class _Placed:
+    """A job the scheduler has submitted and is waiting on."""
+
+    def __init__(self, ticket, spec, user, agent):
+        self.ticket = ticket
+        self.spec = spec
+        self.user = user
+        self.agent = agent
+        self.submitted = monotonic()
+
+
+class AgentScheduler:
+    """Queue jobs locally and place each on the agent expected to finish it first.
+
+    `agents` are Agent tuples (see discover_agents and get_agents), all able
+    to run the jobs queued. `limit` caps jobs in flight per agent (a dict
+    maps agent IDs to their own caps); `max_in_flight` caps them overall.
+    `refresh` is how often, in seconds, agents' busy status is re-read; 0
+    never re-reads it.
+    """
+
+    DEFAULT_SECONDS = 60.0  # run time assumed for a function never seen to finish
+
+    def __init__(self, client, agents, limit=1, max_in_flight=None, watcher=None, refresh=30.0):
+        if not agents:
+            raise ValueError("No agents to schedule on")
+        self.client = client
+        self.agents = {a.id: a for a in agents}
+        self.limits = limit if isinstance(limit, dict) else {}
+        self.limit = 1 if isinstance(limit, dict) else limit
+        self.max_in_flight = max_in_flight
+        self.watcher = watcher or JobWatcher(client)
+        self.refresh = refresh
+        self.refreshed = monotonic()
+        self.queues = defaultdict(deque)  # user -> deque of (ticket, spec)
+        self.in_flight = {}  # job_id -> _Placed
+        self.runtimes = defaultdict(lambda: deque(maxlen=20))  # (agent_id, function) -> seconds
+        self.served = defaultdict(int)  # user -> dispatch sequence of their latest job
+        self._tickets = count(1)
+        self._sequence = count(1)
+
+    def submit(self, spec, user="default"):
+        """Queue a job; returns its ticket, which its Finished record carries."""
+        ticket = next(self._tickets)
+        self.queues[user].append((ticket, spec))
+        return ticket
+
+    @property
+    def queued(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+    # Estimates
+
+    def expected_seconds(self, agent_id, function):
+        """Median observed run time on this agent, else on any agent, else a default."""
+        observed = self.runtimes.get((agent_id, function))
+        if observed:
+            return statistics.median(observed)
+        anywhere = [s for (_, f), seconds in self.runtimes.items() if f == function for s in seconds]
+        if anywhere:
+            return statistics.median(anywhere)
+        return self.watcher.expected_duration(function) or self.DEFAULT_SECONDS
+
+    def _limit(self, agent_id):
+        return self.limits.get(agent_id, self.limit)
+
+    def _running(self, agent_id):
+        return [p for p in self.in_flight.values() if p.agent.id == agent_id]
+
+    def _slots(self):
+        """[seconds until free, agent, open now, someone else's job on it] per agent slot."""
+        now = monotonic()
+        slots = []
+        for agent in self.agents.values():
+            remaining = sorted(
+                max(0.0, self.expected_seconds(agent.id, p.spec.function) - (now - p.submitted))
+                for p in self._running(agent.id)
+            )
+            limit = self._limit(agent.id)
+            external = bool(agent.busy) and not remaining
+            slots += [[0.0, agent, True, external] for _ in range(limit - len(remaining))]
+            slots += [[seconds, agent, False, False] for seconds in remaining[max(0, len(remaining) - limit):]]
+        return slots
+
+    def plan(self, specs):
+        """The agent each of `specs` should start on now, in order; None for those that wait.
+
+        Each job in turn takes the slot it would finish on first, after the
+        jobs planned ahead of it, so a queue spills over to slower agents only
+        once waiting for a faster one would take longer.
+        """
+        slots = self._slots()
+        expected = {}
+
+        def finish(slot, function):
+            start, agent, _, external = slot
+            if (agent.id, function) not in expected:
+                expected[agent.id, function] = self.expected_seconds(agent.id, function)
+            seconds = expected[agent.id, function]
+            # Busy with someone else's job: assume it is half done
+            return start + (seconds / 2 if external else 0.0) + seconds
+
+        agents = []
+        for spec in specs:
+            slot = min(slots, key=lambda s: finish(s, spec.function))
+            agents.append(slot[1] if slot[2] else None)
+            slot[:] = [finish(slot, spec.function), slot[1], False, False]
+        return agents
+
+    def place(self, spec):
+        """The agent to run `spec` on now, or None to keep it queued."""
+        return self.plan([spec])[0]
+
+    # Dispatch
+
+    def _order(self):
+        """Queued (user, ticket, spec) in dispatch order.
+
+        Users take turns: the next job is always from the user with the fewest
+        jobs in flight or ahead in the order, then the one served longest ago.
+        """
+        in_flight = Counter(p.user for p in self.in_flight.values())
+        served = dict(self.served)
+        queues = {user: iter(queue) for user, queue in self.queues.items() if queue}
+        order = []
+        while queues:
+            user = min(queues, key=lambda u: (in_flight[u], served.get(u, 0)))
+            item = next(queues[user], None)
+            if item is None:
+                del queues[user]
+                continue
+            order.append((user, *item))
+            in_flight[user] += 1
+            served[user] = len(order) + max(served.values(), default=0)
+        return order
+
+    def _dispatch(self):
+        """Submit the queued jobs whose best agent has a slot open now."""
+        room = float("inf") if self.max_in_flight is None else self.max_in_flight - len(self.in_flight)
+        if room <= 0 or not self.queued:
+            return 0
+        order = self._order()
+        submitted = 0
+        for (user, ticket, spec), agent in zip(order, self.plan([spec for _, _, spec in order])):
+            if agent is None:
+                continue
+            self.queues[user].remove((ticket, spec))
+            job = retry_call(
+                self.client.add_job,
+                model_id=spec.model_id,
+                function=spec.function,
+                parameters=spec.parameters,
+                tool_name=spec.tool_name,
+                tool_version=spec.tool_version,
+                operating_system=spec.operating_system,
+                assigned_agent_id=agent.id,
+            )
+            self.started(job.id, spec, agent, user, ticket)
+            submitted += 1
+            if submitted >= room:
+                break
+        return submitted
+
+    def started(self, job_id, spec, agent, user="default", ticket=None):
+        """Count a job submitted outside the queue (or earlier) against its agent."""
+        agent = self.agents[getattr(agent, "id", agent)]
+        self.in_flight[job_id] = _Placed(ticket, spec, user, agent)
+        self.served[user] = next(self._sequence)
+        self.watcher.watch(job_id, function=spec.function, description=spec.description)
+
+    def finished(self, job_id, job):
+        """Release a finished job's slot and learn its run time; returns its Finished record."""
+        placed = self.in_flight.pop(job_id)
+        status = job.status.name
+        seconds = _run_seconds(job, monotonic() - placed.submitted)
+        if status == JobStatusName.COMPLETED:
+            self.runtimes[(placed.agent.id, placed.spec.function)].append(seconds)
+        return Finished(placed.ticket, placed.spec, placed.user, job, placed.agent, status, seconds)
+
+    def _refresh(self):
+        if not self.refresh or monotonic() - self.refreshed < self.refresh:
+            return
+        self.refreshed = monotonic()
+        for agent_id, agent in self.agents.items():
+            try:
+                fresh, _ = _agent(retry_call(self.client.get_agent, agent_id))
+            except Exception:
+                continue
+            self.agents[agent_id] = agent._replace(busy=fresh.busy)
+
+    def step(self):
+        """Submit what can go now, poll due jobs; returns the jobs that finished."""
+        self._refresh()
+        self._dispatch()
+        finished = []
+        for change in self.watcher.poll_due():
+            if change.new in TERMINAL_STATUSES and change.job_id in self.in_flight:
+                finished.append(self.finished(change.job_id, change.job))
+        if finished:
+            self._dispatch()
+        return finished
+
+    def run(self):
+        """Yield a Finished record for each job until the queue is empty and all have finished."""
+        while self.queued or self.in_flight:
+            yield from self.step()
+            waiting = [self.watcher.jobs[job_id] for job_id in self.in_flight]
+            delay = min((t.next_poll for t in waiting), default=monotonic() + 0.2) - monotonic()
+            sleep(min(max(delay, 0.0), 1.0))
+
+
+def main():
+    from istari_client import get_client
+
+    parser = argparse.ArgumentParser(description="List the agents jobs can be scheduled on")
+    parser.add_argument("--os", dest="operating_system", default=None, help='Only agents on this OS, e.g. "RHEL 8"')
+    args = parser.parse_args()
+
+    agents = discover_agents(get_client(), args.operating_system)
+    print(f"{len(agents)} agent(s) available")
+    for agent in agents:
+        state = {True: "busy", False: "idle", None: "unknown"}[agent.busy]
+        print(f"  {agent.id}  {agent.name:<24} {agent.operating_system or '?':<10} {state}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Compare snapshots: which files were added, removed or changed between them.
+
+Each snapshot's file list is fetched with list_snapshot_revisions. All the
+pages of all the snapshots are requested concurrently, and each page is
+reduced to a small entry per file (IDs, content hash, name, size). Snapshots
+with tens of thousands of files stay cheap to hold. Files are matched by
+file ID, and the added/removed/common sets come from set operations. A
+common file is modified when its content hash differs, and "same content"
+when only the revision changed.
+
+Text diffs are optional and produced one file at a time. Content comes from
+the local artifact store, so only the two versions of the file being diffed
+are in memory.
+
+Usage:
+    from istari_snapshot_diff import compare, fetch_snapshots, text_diff
+
+    files = fetch_snapshots(client, [old_id, new_id])
+    diff = compare(files[old_id], files[new_id])
+    print(diff.summary())
+    for old, new in diff.modified:
+        for line in text_diff(client, old, new):
+            print(line, end="")
+"""
+import difflib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from istari_artifact_store import get_store
+from istari_pagination import MAX_PAGE_SIZE
+
+DEFAULT_WORKERS = 8
+
+# Files larger than this are reported as modified but not diffed
+MAX_DIFF_BYTES = 5 * 1024 * 1024
+
+Entry = namedtuple("Entry", "file_id revision_id sha name size")
+
+
+def _entry(item):
+    token = getattr(item, "content_token", None)
+    return Entry(
+        file_id=getattr(item, "file_id", None),
+        revision_id=item.revision_id,
+        sha=getattr(token, "sha", None),
+        name=getattr(item, "name", None) or "",
+        size=getattr(item, "size", None),
+    )
+
+
+def _key(entry):
+    return entry.file_id or entry.name
+
+
+def _page_count(page):
+    pages = getattr(page, "pages", None)
+    if pages is not None:
+        return pages
+    total = getattr(page, "total", None)
+    if total is not None:
+        return max(1, -(-total // MAX_PAGE_SIZE))
+    return None
+
+
+def fetch_snapshots(client, snapshot_ids, workers=DEFAULT_WORKERS):
+    """{snapshot ID: {file key: Entry}} for every snapshot, fetched concurrently.
+
+    The first page of every snapshot is requested at once. It gives the page
+    count, and the remaining pages are then requested on the same pool.
+    """
+    snapshot_ids = list(dict.fromkeys(snapshot_ids))
+    files = {snapshot_id: {} for snapshot_id in snapshot_ids}
+
+    def add(snapshot_id, page):
+        entries = files[snapshot_id]
+        for item in page.items:
+            entry = _entry(item)
+            entries[_key(entry)] = entry
+
+    def fetch(snapshot_id, number):
+        return [client.list_snapshot_revisions(snapshot_id, page=number, size=MAX_PAGE_SIZE)]
+
+    def fetch_from(snapshot_id, number):
+        # No page count reported: read pages in order until a short one
+        pages = []
+        while True:
+            pages += fetch(snapshot_id, number)
+            if len(pages[-1].items) < MAX_PAGE_SIZE:
+                return pages
+            number += 1
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        first = {s: pool.submit(fetch, s, 1) for s in snapshot_ids}
+        rest = []
+        for snapshot_id, future in first.items():
+            page = future.result()[0]
+            add(snapshot_id, page)
+            pages = _page_count(page)
+            if pages is None and len(page.items) == MAX_PAGE_SIZE:
+                rest.append((snapshot_id, pool.submit(fetch_from, snapshot_id, 2)))
+            elif pages:
+                rest += [(snapshot_id, pool.submit(fetch, snapshot_id, n)) for n in range(2, pages + 1)]
+        for snapshot_id, future in rest:
+            for page in future.result():
+                add(snapshot_id, page)
+    return files
+
+
+class SnapshotDiff:
+    """Differences between two snapshots' file entries."""
+
+    def __init__(self, added, removed, modified, same_content, unchanged):
+        self.added = added  # [Entry]
+        self.removed = removed  # [Entry]
+        self.modified = modified  # [(old Entry, new Entry)], content differs
+        self.same_content = same_content  # [(old Entry, new Entry)], new revision, same bytes
+        self.unchanged = unchanged  # count of files with the same revision
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified)
+
+    def summary(self):
+        return (f"{len(self.added)} added, {len(self.removed)} removed, {len(self.modified)} modified, "
+                f"{len(self.same_content)} re-uploaded unchanged, {self.unchanged} unchanged")
+
+
+def compare(old, new):
+    """Diff two {file key: Entry} maps from fetch_snapshots()."""
+    old_keys, new_keys = old.keys(), new.keys()
+    by_name = lambda entry: entry.name.lower()
+    added = sorted((new[k] for k in new_keys - old_keys), key=by_name)
+    removed = sorted((old[k] for k in old_keys - new_keys), key=by_name)
+    modified, same_content, unchanged = [], [], 0
+    for key in old_keys & new_keys:
+        before, after = old[key], new[key]
+        if before.revision_id == after.revision_id:
+            unchanged += 1
+        elif before.sha and before.sha == after.sha:
+            same_content.append((before, after))
+        else:
+            modified.append((before, after))
+    modified.sort(key=lambda pair: by_name(pair[1]))
+    same_content.sort(key=lambda pair: by_name(pair[1]))
+    return SnapshotDiff(added, removed, modified, same_content, unchanged)
+
+
+def compare_chain(files, snapshot_ids):
+    """[(old ID, new ID, SnapshotDiff)] for each consecutive pair of snapshots."""
+    return [(a, b, compare(files[a], files[b])) for a, b in zip(snapshot_ids, snapshot_ids[1:])]
+
+
+def _lines(path):
+    with open(path, "rb") as f:
+        head = f.read(8192)
+        if b"\0" in head:
+            return None  # binary
+        f.seek(0)
+        return [line.decode("utf-8", errors="replace") for line in f]
+
+
+def text_diff(client, old, new, context=3, max_bytes=MAX_DIFF_BYTES):
+    """Yield unified-diff lines between two entries' contents.
+
+    Yields a single note instead for binary files or files over `max_bytes`.
+    """
+    if max((old.size or 0), (new.size or 0)) > max_bytes:
+        yield f"  (not diffed: larger than {max_bytes // (1024 * 1024)} MB)\n"
+        return
+    store = get_store()
+    paths = [store.path(client.get_revision(e.revision_id)) for e in (old, new)]
+    before, after = (_lines(p) for p in paths)
+    if before is None or after is None:
+        yield "  (binary file changed)\n"
+        return
+    yield from difflib.unified_diff(
+        before, after, fromfile=f"{old.name}@{old.revision_id[:8]}",
+        tofile=f"{new.name}@{new.revision_id[:8]}", n=context,
+    )
+
+
+def resolve(client, ref, configuration_id=None):
+    """A snapshot ID for `ref`: a tag name within `configuration_id`, or an ID as is."""
+    if configuration_id:
+        page = client.list_snapshots(configuration_id=configuration_id, tag=ref, page=1, size=1)
+        if page.items:
+            return page.items[0].id
+    return ref
@@ -0,0 +1,268 @@
+"""Local SysML v2 requirements/parts extractor.
+
+Produces the same output_requirements.json and output_parts.json that the
+`@istari:extract_sysmlv2` job returns, without an upload or a remote agent.
+The source is read once, line by line, so memory stays flat on large models.
+Diagrams still need the remote job.
+
+Usage:
+    from istari_sysml import extract_file, extract_text, extract_model
+
+    requirements, parts = extract_file("model.sysml")
+    requirements, parts = extract_text(sysml_text)
+    requirements, parts = extract_model(model)        # via the local artifact store
+
+    python istari_sysml.py model.sysml --out-dir extracted/
+    python istari_sysml.py model.sysml --compare use-cases/explore-sysml-model/example-output
+"""
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+# Statement terminators, strings and comments; everything else is statement text
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|//|/\*|\*/|[{};]')
+_HEADER = re.compile(
+    r"^(?:(?:private|public|protected|abstract|variation)\s+)*"
+    r"(package|part|requirement)(\s+def)?\s+('(?:[^'\\]|\\.)*'|[\w.]+)"
+)
+_ATTRIBUTE = re.compile(
+    r"^attribute\s+(?:redefines\s+)?('(?:[^'\\]|\\.)*'|\w+)\s*"
+    r"(?::\s*[\w:]+\s*)?(?:(?::=|=)\s*(.+?))?\s*$",
+    re.S,
+)
+_INTEGER = re.compile(r"^[+-]?\d+$")
+_REAL = re.compile(r"^[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?$")
+
+REQUIREMENTS_FILE = "output_requirements.json"
+PARTS_FILE = "output_parts.json"
+
+
+def _unquote(name):
+    return name[1:-1] if name.startswith("'") and name.endswith("'") else name
+
+
+def _literal(text):
+    """(value, type) for an attribute's value text, as the extractor reports them."""
+    if text is None:
+        return None, "unset"
+    if text.startswith('"') and text.endswith('"'):
+        return text[1:-1], "string"
+    if text in ("true", "false"):
+        return text.capitalize(), "boolean"
+    if _INTEGER.match(text):
+        return text, "integer"
+    if _REAL.match(text):
+        return text, "real"
+    return text, "expression"
+
+
+class _Scope:
+    __slots__ = ("kind", "qualified_name", "is_def", "entry")
+
+    def __init__(self, kind, qualified_name, is_def, entry=None):
+        self.kind = kind  # "package", "part", "requirement" or None for other blocks
+        self.qualified_name = qualified_name
+        self.is_def = is_def  # inside a part/requirement definition
+        self.entry = entry  # output dict for part and requirement usages
+
+
+class SysMLExtractor:
+    """Single-pass extractor; feed lines, then read `requirements` and `parts`."""
+
+    def __init__(self):
+        self.requirements = {}
+        self.parts = {}
+        self._stack = [_Scope(None, "", False)]
+        self._pending = []  # text of the statement being read
+        self._in_comment = False
+        self._comment = []
+        self.lines = 0
+
+    def feed(self, line):
+        self.lines += 1
+        pos = 0
+        if self._in_comment:
+            end = line.find("*/")
+            if end < 0:
+                self._comment.append(line)
+                return
+            self._comment.append(line[:end])
+            self._end_comment()
+            pos = end + 2
+        for match in _TOKEN.finditer(line, pos):
+            if match.start() < pos:
+                continue
+            token = match.group()
+            if token.startswith('"'):
+                continue  # string literal stays part of the statement text
+            self._pending.append(line[pos:match.start()])
+            pos = match.end()
+            if token == "//":
+                pos = len(line)
+                break
+            if token == "/*":
+                end = line.find("*/", pos)
+                if end < 0:
+                    self._in_comment = True
+                    self._comment = [line[pos:]]
+                    return
+                self._comment = [line[pos:end]]
+                self._end_comment()
+                pos = end + 2
+            elif token == "{":
+                self._open(self._take())
+            elif token == "}":
+                self._take()
+                self._close()
+            elif token == ";":
+                self._statement(self._take())
+        self._pending.append(line[pos:])
+
+    def _take(self):
+        text = " ".join("".join(self._pending).split())
+        self._pending = []
+        return text
+
+    def _end_comment(self):
+        self._in_comment = False
+        text = " ".join("".join(self._comment).split())
+        if "".join(self._pending).strip() == "doc":
+            self._pending = []
+            entry = self._stack[-1].entry
+            if entry is not None and self._stack[-1].kind == "requirement":
+                entry["description"] = text
+
+    def _declare(self, header):
+        """Register a part/requirement usage; returns (kind, qualified name, is_def, entry)."""
+        parent = self._stack[-1]
+        match = _HEADER.match(header)
+        if not match:
+            return None, parent.qualified_name, parent.is_def, None
+        kind, is_def, name = match.group(1), bool(match.group(2)), match.group(3)
+        qualified_name = f"{parent.qualified_name}::{name}" if parent.qualified_name else name
+        is_def = is_def or parent.is_def
+        entry = None
+        if kind == "part" and not is_def:
+            entry = {"declared_name": _unquote(name), "attributes": {}}
+            self.parts[qualified_name] = entry
+        elif kind == "requirement" and not is_def:
+            entry = {
+                "id": None,
+                "name": _unquote(name),
+                "description": None,
+                "qualified_name": qualified_name,
+            }
+            if parent.kind == "requirement" and parent.entry is not None:
+                entry["parent"] = parent.qualified_name
+            self.requirements[qualified_name] = entry
+        return kind, qualified_name, is_def, entry
+
+    def _open(self, header):
+        self._stack.append(_Scope(*self._declare(header)))
+
+    def _close(self):
+        scope = self._stack.pop()
+        if scope.kind == "requirement" and scope.entry is not None:
+            if not scope.entry.get("attributes"):
+                scope.entry.pop("attributes", None)
+
+    def _statement(self, text):
+        if text.startswith("attribute"):
+            match = _ATTRIBUTE.match(text)
+            scope = self._stack[-1]
+            if not match or scope.entry is None:
+                return
+            name = _unquote(match.group(1))
+            value, kind = _literal(match.group(2))
+            if scope.kind == "part":
+                scope.entry["attributes"][name] = {
+                    "name": name, "value": value, "code": f"{text};", "type": kind,
+                }
+            else:
+                scope.entry.setdefault("attributes", {})[name] = value
+        elif text.startswith(("part", "requirement")) or _HEADER.match(text):
+            self._declare(text)  # usage without a body, e.g. `part x : X;`
+
+
+def extract_lines(lines):
+    """Extract from an iterable of source lines. Returns (requirements, parts)."""
+    extractor = SysMLExtractor()
+    for line in lines:
+        extractor.feed(line)
+    return extractor.requirements, extractor.parts
+
+
+def extract_file(path):
+    """Extract from a .sysml file, streaming it line by line."""
+    with open(path, encoding="utf-8") as f:
+        return extract_lines(f)
+
+
+def extract_text(text):
+    """Extract from SysML source text (e.g. `model.read_text()`)."""
+    return extract_lines(text.splitlines())
+
+
+def extract_model(resource):
+    """Extract from an Istari model, artifact or revision via the local artifact store."""
+    from istari_artifact_store import get_store
+
+    return extract_file(get_store().path(resource))
+
+
+def write_outputs(requirements, parts, out_dir):
+    """Write output_requirements.json and output_parts.json like the remote job."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / REQUIREMENTS_FILE).write_text(json.dumps(requirements, indent=2))
+    (out_dir / PARTS_FILE).write_text(json.dumps(parts, indent=2))
+
+
+def compare(extracted, expected_path):
+    """Differences between extracted JSON and an expected output file, as messages."""
+    expected = json.loads(Path(expected_path).read_text())
+    problems = []
+    for key in expected.keys() - extracted.keys():
+        problems.append(f"missing {key}")
+    for key in extracted.keys() - expected.keys():
+        problems.append(f"unexpected {key}")
+    for key in expected.keys() & extracted.keys():
+        if expected[key] != extracted[key]:
+            problems.append(f"differs {key}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract requirements and parts from SysML v2 locally")
+    parser.add_argument("path", help="Path to a .sysml file")
+    parser.add_argument("--out-dir", default=None, help="Write output_requirements.json / output_parts.json here")
+    parser.add_argument(
+        "--compare",
+        default=None,
+        help="Directory with expected output_requirements.json / output_parts.json to validate against",
+    )
+    args = parser.parse_args()
+
+    requirements, parts = extract_file(args.path)
+    print(f"{args.path}: {len(requirements)} requirements, {len(parts)} parts")
+
+    if args.out_dir:
+        write_outputs(requirements, parts, args.out_dir)
+        print(f"  Wrote {REQUIREMENTS_FILE} and {PARTS_FILE} to {args.out_dir}")
+
+    if args.compare:
+        failed = False
+        for extracted, name in [(requirements, REQUIREMENTS_FILE), (parts, PARTS_FILE)]:
+            problems = compare(extracted, Path(args.compare) / name)
+            failed = failed or bool(problems)
+            print(f"  {name}: {'matches' if not problems else f'{len(problems)} difference(s)'}")
+            for problem in problems[:20]:
+                print(f"    {problem}")
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Rate limiting and retry helpers for bulk Istari API work.
+
+Usage:
+    from istari_throttle import TokenBucket, retry_call
+
+    bucket = TokenBucket(rate=10)          # at most ~10 calls/second, shared by all threads
+    bucket.acquire()
+    retry_call(client.get_model, model_id)
+"""
+import random
+import threading
+from time import monotonic, sleep
+
+# HTTP statuses worth retrying: timeouts, throttling, transient server errors
+TRANSIENT_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available, then take them."""
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            sleep(wait)
+
+
+def status_of(exc):
+    """HTTP status carried by an SDK exception, if any."""
+    for attr in ("status", "status_code"):
+        status = getattr(exc, attr, None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_transient(exc):
+    """True for errors a retry can fix: throttling, 5xx, dropped connections."""
+    status = status_of(exc)
+    if status is not None:
+        return status in TRANSIENT_STATUSES
+    return isinstance(exc, (ConnectionError, TimeoutError)) or type(exc).__name__ in {
+        "APIConnectionError",
+        "RateLimitError",
+        "InternalServerError",
+    }
+
+
+def backoff_delay(attempt, base_delay=0.5, max_delay=30.0):
+    """Full-jitter exponential backoff for the given attempt (0-based)."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def retry_call(fn, *args, retries=5, base_delay=0.5, max_delay=30.0,
+               retry_on=is_transient, **kwargs):
+    """Call fn, retrying transient failures with jittered exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == retries or not retry_on(e):
+                raise
+            sleep(backoff_delay(attempt, base_delay, max_delay))
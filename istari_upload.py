@@ -0,0 +1,379 @@
+"""Chunked, parallel, resumable uploads for add_model / update_model.
+
+The SDK sends files below 2 GB in a single request and larger ones part by
+part in sequence. A dropped connection means starting over. UploadManager
+splits the file into parts instead and uploads several at once. Each part
+is retried on its own and checked against its MD5 (the storage ETag). A
+journal on local disk records the finished parts, so an interrupted upload
+resumes where it stopped the next time the same file is uploaded.
+
+Usage:
+    from istari_upload import UploadManager
+
+    uploads = UploadManager(client)
+    model = uploads.add_model("wing.ntop", display_name="Wing")
+    model = uploads.update_model(model.id, "wing_v2.ntop", version_name="v2")
+    print(uploads.last_stats)
+
+Settings (environment):
+    ISTARI_UPLOAD_JOURNAL    Journal directory (default: ~/.cache/istari/uploads)
+    ISTARI_UPLOAD_PART_MB    Part size in MB (default: 32)
+    ISTARI_UPLOAD_WORKERS    Parts uploaded at once (default: 6)
+"""
+import hashlib
+import json
+import os
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from time import perf_counter, sleep
+
+from istari_digital_client.legacy.storage.models.completed_part_type_def import CompletedPartTypeDef
+from istari_digital_client.legacy.storage.models.create_multipart_upload_request import (
+    CreateMultipartUploadRequest,
+)
+from istari_digital_client.legacy.storage.models.finalize_multipart_upload_action import (
+    FinalizeMultipartUploadAction,
+)
+from istari_digital_client.legacy.storage.models.finalize_multipart_upload_request import (
+    FinalizeMultipartUploadRequest,
+)
+from istari_digital_client.legacy.storage.models.temporary_url import TemporaryURL
+from istari_digital_client.legacy.v2.models.archive_status_name import ArchiveStatusName
+from istari_digital_client.legacy.v2.models.file_revision import FileRevision
+from istari_digital_client.legacy.v2.models.file_revision_archive_status import (
+    FileRevisionArchiveStatus,
+)
+from istari_digital_client.legacy.v2.models.properties import Properties
+from istari_digital_client.legacy.v2.models.source import Source
+from istari_digital_client.legacy.v2.models.token import Token
+
+DEFAULT_JOURNAL_DIR = Path.home() / ".cache" / "istari" / "uploads"
+DEFAULT_PART_MB = 32
+DEFAULT_WORKERS = 6
+MAX_PARTS = 10000  # storage limit on parts per upload
+HASH_BLOCK = 8 * 1024 * 1024
+
+UploadStats = namedtuple(
+    "UploadStats", ["bytes", "parts", "resumed_parts", "retries", "seconds", "deduplicated"]
+)
+
+
+def throughput(stats):
+    """MB/s actually sent in an upload (resumed parts excluded)."""
+    if not stats.seconds:
+        return 0.0
+    sent = stats.bytes * (stats.parts - stats.resumed_parts) / max(stats.parts, 1)
+    return sent / 1e6 / stats.seconds
+
+
+class UploadJournal:
+    """Progress of one file's upload, saved as JSON after every finished part."""
+
+    def __init__(self, path, state):
+        self.path = Path(path)
+        self.state = state
+        self._lock = Lock()
+
+    @classmethod
+    def load(cls, directory, key):
+        path = Path(directory) / f"{key}.json"
+        try:
+            return cls(path, json.loads(path.read_text()))
+        except (OSError, ValueError):
+            return None
+
+    def save(self):
+        with self._lock:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.state))
+            os.replace(tmp, self.path)
+
+    def part_done(self, number, etag):
+        with self._lock:
+            self.state["done"][str(number)] = etag
+        self.save()
+
+    def remove(self):
+        self.path.unlink(missing_ok=True)
+
+
+class UploadManager:
+    """Uploads model files in parallel parts with per-part retries and resume.
+
+    Files no larger than one part go through the SDK's normal upload.
+    `part_size` is in bytes; `workers` is how many parts are in flight.
+    """
+
+    def __init__(self, client, part_size=None, workers=None, retries=5, backoff=0.5,
+                 journal_dir=None, verbose=True):
+        self.client = client
+        # Storage calls bypass the metadata cache wrapper (see istari_cache.py)
+        self.storage = getattr(client, "client", client)
+        part_mb = int(os.getenv("ISTARI_UPLOAD_PART_MB", DEFAULT_PART_MB))
+        self.part_size = part_size or part_mb * 1024 * 1024
+        self.workers = workers or int(os.getenv("ISTARI_UPLOAD_WORKERS", DEFAULT_WORKERS))
+        self.retries = retries
+        self.backoff = backoff  # seconds before the first retry; doubles each time
+        self.journal_dir = Path(journal_dir or os.getenv("ISTARI_UPLOAD_JOURNAL") or DEFAULT_JOURNAL_DIR)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.verbose = verbose
+        self.last_stats = None
+
+    def add_model(self, path, sources=None, *, description=None, version_name=None,
+                  external_identifier=None, display_name=None, source_job_id=None):
+        """Same arguments and result as client.add_model()."""
+        path = Path(path)
+        if path.stat().st_size <= self.part_size:
+            return self.client.add_model(
+                path, sources, description=description, version_name=version_name,
+                external_identifier=external_identifier, display_name=display_name,
+                source_job_id=source_job_id,
+            )
+        revision = self._revision(path, None, sources, description, version_name,
+                                  external_identifier, display_name)
+        model = self.storage._create_model(file_revision=revision, source_job_id=source_job_id)
+        self._invalidate("model", "file")
+        return model
+
+    def update_model(self, model_id, path, sources=None, *, description=None, version_name=None,
+                     external_identifier=None, display_name=None, source_job_id=None):
+        """Same arguments and result as client.update_model()."""
+        path = Path(path)
+        if path.stat().st_size <= self.part_size:
+            return self.client.update_model(
+                model_id, path, sources, description=description, version_name=version_name,
+                external_identifier=external_identifier, display_name=display_name,
+                source_job_id=source_job_id,
+            )
+        # New revisions keep the model's salt, as client.update_model() does
+        salt = self.client.get_model(model_id).revision.content_token.salt
+        revision = self._revision(path, salt, sources, description, version_name,
+                                  external_identifier, display_name, model_id=model_id)
+        model = self.storage._update_model(
+            model_id=model_id, file_revision=revision, source_job_id=source_job_id
+        )
+        self._invalidate("model", "artifact", "file")
+        return model
+
+    def _invalidate(self, *kinds):
+        invalidate = getattr(self.client, "cache_invalidate", None)
+        if invalidate:
+            invalidate(*kinds)
+
+    def _revision(self, path, salt, sources, description, version_name, external_identifier,
+                  display_name, model_id=None):
+        """Upload content and properties; return the FileRevision the SDK would build."""
+
+        properties = Properties.from_path(
+            path=path, description=description, version_name=version_name,
+            external_identifier=external_identifier, display_name=display_name,
+        )
+        properties_bytes = properties.to_bytes()
+        properties_token = Token.from_bytes(properties_bytes, salt)
+        sha, salt = self.upload_content(path, salt, model_id=model_id)
+        self.storage._upload_properties(properties_token, properties_bytes)
+
+        now = datetime.now(timezone.utc)
+        revision_id = str(uuid.uuid4())
+        return FileRevision(
+            id=revision_id,
+            created=now,
+            file_id=None,
+            content_token=Token(id=str(uuid.uuid4()), created=now, sha=sha, salt=salt),
+            properties_token=properties_token,
+            archive_status_history=[FileRevisionArchiveStatus(
+                id=str(uuid.uuid4()), created=now, name=ArchiveStatusName.ACTIVE,
+                reason="Initial", created_by_id=None, file_revision_id=revision_id,
+            )],
+            name=properties.file_name,
+            extension=properties.extension,
+            size=properties.size,
+            description=properties.description,
+            mime=properties.mime,
+            version_name=properties.version_name,
+            external_identifier=properties.external_identifier,
+            display_name=properties.display_name,
+            sources=[
+                Source(
+                    revision_id=s if isinstance(s, str) else s.revision_id,
+                    file_id=None, resource_type=None, resource_id=None,
+                    relationship_identifier=None if isinstance(s, str) else s.relationship_identifier,
+                )
+                for s in (sources or [])
+            ],
+            products=None,
+            created_by_id=None,
+            updated=None,
+        )
+
+    def _journal_key(self, path, model_id):
+        stat = path.stat()
+        ident = f"{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{model_id or ''}"
+        return hashlib.sha256(ident.encode()).hexdigest()[:24]
+
+    def _hash_file(self, path, salt, part_size):
+        """Content SHA-384 (with salt) and each part's MD5, in one read of the file."""
+        content = hashlib.sha384()
+        md5s = []
+        with open(path, "rb") as f:
+            while True:
+                part = hashlib.md5()
+                remaining = part_size
+                while remaining:
+                    block = f.read(min(HASH_BLOCK, remaining))
+                    if not block:
+                        break
+                    content.update(block)
+                    part.update(block)
+                    remaining -= len(block)
+                if remaining == part_size:
+                    break
+                md5s.append(part.hexdigest())
+        content.update(salt.encode())
+        return content.hexdigest(), md5s
+
+    def _start(self, path, key, salt, model_id):
+        """A new journal: hash the file and open a multipart upload for it."""
+
+        size = path.stat().st_size
+        part_size = max(self.part_size, -(-size // MAX_PARTS))
+        salt = salt or uuid.uuid4().hex
+        sha, md5s = self._hash_file(path, salt, part_size)
+        state = {"path": str(path.resolve()), "size": size, "part_size": part_size,
+                 "salt": salt, "sha": sha, "md5": md5s, "done": {}}
+        try:
+            created = self.storage.create_multipart_upload(
+                CreateMultipartUploadRequest(sha=sha, num_parts=len(md5s), model_id=model_id)
+            )
+        except Exception as e:
+            if "Sha already exists" in str(e):
+                return UploadJournal(self.journal_dir / f"{key}.json", dict(state, exists=True))
+            raise
+        state["upload_id"] = created.upload_id
+        state["urls"] = {
+            n: {"url": u.url, "expires": u.expires.isoformat() if u.expires else None}
+            for n, u in created.upload_urls.items()
+        }
+        journal = UploadJournal(self.journal_dir / f"{key}.json", state)
+        journal.save()
+        return journal
+
+    def _expired(self, journal):
+        now = datetime.now(timezone.utc)
+        pending = [u for n, u in journal.state["urls"].items() if n not in journal.state["done"]]
+        return any(u["expires"] and datetime.fromisoformat(u["expires"]) <= now for u in pending)
+
+    def _cancel(self, state):
+
+        try:
+            self.storage.finalize_multipart_upload(FinalizeMultipartUploadRequest(
+                action=FinalizeMultipartUploadAction.CANCEL, sha=state["sha"],
+                upload_id=state["upload_id"], completed_parts=None,
+            ))
+        except Exception:
+            pass  # the storage service expires abandoned uploads on its own
+
+    def _upload_part(self, path, state, number):
+        """Upload one part with retries; returns (ETag, retries used)."""
+
+        part_size = state["part_size"]
+        with open(path, "rb") as f:
+            f.seek((number - 1) * part_size)
+            data = f.read(part_size)
+        expected = state["md5"][number - 1]
+        url = state["urls"][str(number)]
+        temp_url = TemporaryURL(
+            url=url["url"], expires=datetime.fromisoformat(url["expires"]) if url["expires"] else None
+        )
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.storage._upload_multipart_chunk(temp_url, data)
+                if response.status == 201:
+                    return "N/A", attempt  # Azure block storage returns no ETag
+                if response.status != 200:
+                    raise IOError(f"part {number}: HTTP {response.status}")
+                etag = (response.getheader("ETag") or "").strip('"')
+                # Plain S3 ETags are the part's MD5; anything else (e.g. KMS) is unverifiable
+                if len(etag) == 32 and etag != expected:
+                    raise IOError(f"part {number}: checksum mismatch")
+                if not etag:
+                    raise IOError(f"part {number}: no ETag in response")
+                return etag, attempt
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                sleep(min(30.0, self.backoff * 2 ** attempt))
+
+    def upload_content(self, path, salt=None, model_id=None):
+        """Upload a file's content in parallel parts; returns (sha, salt).
+
+        If a previous upload of the same file was interrupted, only the parts
+        it had not finished are sent. Stats are kept in `last_stats`.
+        """
+
+        path = Path(path)
+        key = self._journal_key(path, model_id)
+        start = perf_counter()
+        journal = UploadJournal.load(self.journal_dir, key)
+        if journal and (salt and journal.state["salt"] != salt or self._expired(journal)):
+            self._cancel(journal.state)
+            journal.remove()
+            journal = None
+        if journal is None:
+            journal = self._start(path, key, salt, model_id)
+        state = journal.state
+        parts = len(state["md5"])
+        if state.get("exists"):
+            journal.remove()
+            self.last_stats = UploadStats(state["size"], parts, parts, 0, perf_counter() - start, True)
+            self._log(f"  Content already stored ({state['size'] / 1e6:,.1f} MB), nothing to upload")
+            return state["sha"], state["salt"]
+
+        resumed = len(state["done"])
+        if resumed:
+            self._log(f"  Resuming upload: {resumed}/{parts} parts already sent")
+        todo = [n for n in range(1, parts + 1) if str(n) not in state["done"]]
+        retries = 0
+        sent = 0
+        failure = None
+        send_start = perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._upload_part, path, state, n): n for n in todo}
+            for future in as_completed(futures):
+                number = futures[future]
+                try:
+                    etag, used = future.result()
+                except Exception as e:
+                    failure = failure or e  # keep recording the other parts
+                    continue
+                journal.part_done(number, etag)
+                retries += used
+                sent += min(state["part_size"], state["size"] - (number - 1) * state["part_size"])
+                rate = sent / 1e6 / max(perf_counter() - send_start, 1e-9)
+                self._log(f"  Part {number}/{parts} ({len(state['done'])} done, {rate:,.1f} MB/s)")
+        if failure:
+            missing = parts - len(state["done"])
+            raise IOError(f"{missing} part(s) failed; run the upload again to resume") from failure
+
+        self.storage.finalize_multipart_upload(FinalizeMultipartUploadRequest(
+            action=FinalizeMultipartUploadAction.COMPLETE,
+            sha=state["sha"],
+            upload_id=state["upload_id"],
+            completed_parts=[
+                CompletedPartTypeDef(ETag=state["done"][str(n)], PartNumber=n)
+                for n in range(1, parts + 1)
+            ],
+        ))
+        journal.remove()
+        self.last_stats = UploadStats(state["size"], parts, resumed, retries, perf_counter() - start, False)
+        self._log(f"  Uploaded {state['size'] / 1e6:,.1f} MB in {parts} parts "
+                  f"({throughput(self.last_stats):,.1f} MB/s, {retries} retries)")
+        return state["sha"], state["salt"]
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
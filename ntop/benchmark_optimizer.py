@@ -0,0 +1,107 @@
+"""Compare the surrogate optimizer with sweep-based search on the local stand-in.
+
+Runs three searches for a light wing that meets the demo requirements,
+against istari_local.py's nTop job (a smooth made-up response in which the
+range requirement binds on light wings; see _ntop_response there):
+
+  surrogate  optimize_ntop_wing.py: Latin hypercube, then surrogate batches
+  lhs        run_ntop_sweep.py --lhs with the same job budget
+  grid       run_ntop_sweep.py --grid, two levels per input (128 jobs)
+
+Each search runs once per seed, in process, with jobs that finish at once.
+For each it reports the lightest feasible structure weight found, the job
+that first met every requirement, and how many jobs it took to match the
+lightest design of the 128-job grid.
+
+Usage:
+    python ntop/benchmark_optimizer.py
+    python ntop/benchmark_optimizer.py --seeds 10 --max-jobs 25 --batch 4
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from istari_jobs import JobWatcher
+from istari_local import DEMO_NTOP_MODEL_ID, LocalIstari
+from optimize_ntop_wing import BOUNDS, COLUMNS, WEIGHT, DesignSpace, _feasible, fetch_outputs, optimize, read_rows
+from run_ntop_sweep import Journal, ResultsTable, grid_points, run_sweep
+
+BASE_INPUT = json.loads((Path(__file__).resolve().parent / "v4_input.json").read_text())
+
+
+def _run(strategy, seed, max_jobs, batch, work, run):
+    """One search in a fresh stand-in; its results rows in run order."""
+    client = LocalIstari(job_seconds=0, seed=run)  # its own IDs, as the lineage index is shared
+    watcher = JobWatcher(client, min_interval=0.01)
+    space = DesignSpace(BOUNDS)
+    path = work / f"{strategy}-{seed}.csv"
+    results = ResultsTable(path, metric_columns=COLUMNS)
+    journal = Journal(path.with_suffix(".jobs.jsonl"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        if strategy == "surrogate":
+            optimize(client, DEMO_NTOP_MODEL_ID, BASE_INPUT, space, results, journal,
+                     max_jobs=max_jobs, batch=batch, seed=seed, watcher=watcher)
+        else:
+            if strategy == "lhs":
+                points = space.initial(max_jobs, seed)
+            else:
+                points = grid_points({name: [lo + (hi - lo) * f for f in (0.25, 0.75)]
+                                      for name, (lo, hi, _) in BOUNDS.items()})
+            run_sweep(client, DEMO_NTOP_MODEL_ID, BASE_INPUT, points, results, journal,
+                      max_in_flight=batch, watcher=watcher, fetch=fetch_outputs)
+    results.close()
+    journal.close()
+    return read_rows(path)
+
+
+def _jobs_to(rows, target):
+    """Jobs until a feasible design at or under `target` lb, or None."""
+    for i, row in enumerate(rows, 1):
+        if _feasible(row) and row[WEIGHT] <= target:
+            return i
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the surrogate wing optimizer on the local stand-in")
+    parser.add_argument("--seeds", type=int, default=5, help="Runs per strategy (default: 5)")
+    parser.add_argument("--max-jobs", type=int, default=25, help="Job budget of each search (default: 25)")
+    parser.add_argument("--batch", type=int, default=4, help="Jobs in flight together (default: 4)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ntop-opt-bench-") as tmp:
+        work = Path(tmp)
+        os.environ["ISTARI_LINEAGE_INDEX"] = str(work / "lineage.sqlite")
+        os.environ["ISTARI_ARTIFACT_STORE"] = str(work / "artifacts")
+        runs, count = {}, 0
+        for strategy in ("surrogate", "lhs", "grid"):
+            runs[strategy] = []
+            for seed in range(args.seeds) if strategy != "grid" else [0]:
+                count += 1
+                runs[strategy].append(_run(strategy, seed, args.max_jobs, args.batch, work, count))
+                print(f"  {strategy} run {len(runs[strategy])}: {len(runs[strategy][-1])} jobs")
+
+    grid_best = min(row[WEIGHT] for row in runs["grid"][0] if _feasible(row))
+    print(f"\nGrid search: lightest feasible design {grid_best:.1f} lb after {len(runs['grid'][0])} jobs\n")
+    print(f"{'strategy':<11}{'runs':>5}{'jobs':>6}{'best lb (median)':>18}{'first feasible':>16}"
+          f"{'matched grid':>14}{'jobs to match':>15}")
+    for strategy, all_rows in runs.items():
+        best = [min((r[WEIGHT] for r in rows if _feasible(r)), default=float("nan")) for rows in all_rows]
+        first = [n for n in (_jobs_to(rows, float("inf")) for rows in all_rows) if n is not None]
+        matched = [n for n in (_jobs_to(rows, grid_best) for rows in all_rows) if n is not None]
+        jobs = median(len(rows) for rows in all_rows)
+        print(f"{strategy:<11}{len(all_rows):>5}{jobs:>6.0f}{median(best):>18.1f}"
+              f"{(f'{median(first):.0f}' if first else '-'):>16}"
+              f"{f'{len(matched)}/{len(all_rows)}':>14}{(f'{median(matched):.0f}' if matched else '-'):>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""Optimize the nTop wing against the demo requirements in a few batches of jobs.
+
+Instead of spending one @ntop:run_model job per hand-picked guess, this fits
+a Gaussian-process surrogate (NumPy only) to every result so far: structure
+weight, range and cruise speed as functions of the seven wing inputs. It
+then proposes the next batch by expected improvement in structure weight,
+weighted by the probability that a point meets every requirement. Each
+batch runs in parallel through the sweep runner, so the results CSV, job
+journal and resume-on-rerun work as in run_ntop_sweep.py.
+
+The requirements and slider ranges are those of the AIAA demo
+(demos/aiaa_wing_optimization.ipynb): structure weight <= 275 lb, payload
+(400 lb MTOW less structure) >= 125 lb, range >= 1,000 nm and cruise speed
+>= 100 kts. The first batches are a Latin hypercube; the job budget defaults
+to the demo's 25 jobs per model.
+
+Usage:
+    python ntop/optimize_ntop_wing.py --model-id <ID>
+    python ntop/optimize_ntop_wing.py --model-id <ID> --max-jobs 25 --batch 4 --initial 8 --agent-id <A1> --agent-id <A2>
+    python ntop/optimize_ntop_wing.py --model-id <ID> --fix "Span=144" --range "LOA In=80:140" --best-input best.json
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from istari_client import get_client
+from istari_artifact_store import read_text
+from istari_lineage import get_lineage
+from istari_throttle import retry_call
+from run_ntop_sweep import (
+    METRIC_COLUMNS, PARAMETERS, Journal, ResultsTable,
+    _parse_assignments, apply_point, fetch_metrics, lhs_points, point_id, run_sweep,
+)
+
+OUTPUT_FILE = "grp3-uas_v6_output.json"
+
+# Demo requirements
+MTOW_LB = 400.0
+MAX_STRUCTURE_WEIGHT_LB = 275.0
+MIN_PAYLOAD_LB = 125.0
+MIN_RANGE_NM = 1000.0
+MIN_CRUISE_SPEED_KTS = 100.0
+MAX_JOBS_PER_MODEL = 25
+
+# Demo slider ranges: name -> (low, high, step)
+BOUNDS = {
+    "LOA In": (72, 192, 1),
+    "Span": (140, 150, 1),
+    "LE Sweep P1": (0, 65, 1),
+    "LE Sweep P2": (-20, 60, 1),
+    "TE Sweep P1": (-60, 60, 1),
+    "TE Sweep P2": (-60, 60, 1),
+    "Panel Break Span %": (0.1, 0.75, 0.05),
+}
+
+WEIGHT = "structure.weight_lbm"
+Requirement = namedtuple("Requirement", ["column", "op", "limit", "label"])
+REQUIREMENTS = [
+    # Payload is MTOW less structure, so both limits bound the structure weight
+    Requirement(WEIGHT, "<=", min(MAX_STRUCTURE_WEIGHT_LB, MTOW_LB - MIN_PAYLOAD_LB), "structure weight"),
+    Requirement("range_mission.range_nm", ">=", MIN_RANGE_NM, "range"),
+    Requirement("range_mission.cruise_speed_kts", ">=", MIN_CRUISE_SPEED_KTS, "cruise speed"),
+]
+COLUMNS = [WEIGHT, *METRIC_COLUMNS]
+
+_erf = np.vectorize(math.erf, otypes=[float])
+
+
+def _cdf(z):
+    return 0.5 * (1 + _erf(z / math.sqrt(2)))
+
+
+def _pdf(z):
+    return np.exp(-0.5 * z * z) / math.sqrt(2 * math.pi)
+
+
+# --- Surrogate ---
+
+class GaussianProcess:
+    """Gaussian-process regression with an anisotropic squared-exponential kernel.
+
+    Inputs are expected in the unit cube; outputs are standardized. One
+    length scale per input and the noise level are chosen by marginal
+    likelihood, from a coarse search that is cheap at the few dozen points
+    an optimization run sees. Pass `params` to reuse another fit's.
+    """
+
+    NOISE = (1e-6, 1e-4, 1e-2)
+    LENGTHS = (0.1, 0.2, 0.35, 0.6, 1.0, 2.0)
+
+    def __init__(self, x, y, params=None):
+        self.x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.mean, self.scale = y.mean(), y.std() or 1.0
+        self.y = (y - self.mean) / self.scale
+        self.params = params or self._fit()
+        self._factor()
+
+    def _kernel(self, a, b, lengths):
+        d = (a[:, None, :] - b[None, :, :]) / lengths
+        return np.exp(-0.5 * np.einsum("ijk,ijk->ij", d, d))
+
+    def _likelihood(self, lengths, noise):
+        k = self._kernel(self.x, self.x, lengths) + noise * np.eye(len(self.x))
+        try:
+            chol = np.linalg.cholesky(k)
+        except np.linalg.LinAlgError:
+            return -np.inf
+        alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, self.y))
+        return -0.5 * self.y @ alpha - np.log(np.diag(chol)).sum()
+
+    def _fit(self):
+        dims = self.x.shape[1]
+        best = max(((np.full(dims, length), noise) for length in self.LENGTHS for noise in self.NOISE),
+                   key=lambda p: self._likelihood(*p))
+        lengths, noise = best[0].copy(), best[1]
+        score = self._likelihood(lengths, noise)
+        # Then each input on its own: long scales for inputs that barely matter
+        for _ in range(2):
+            for i in range(dims):
+                for factor in (0.5, 2.0, 4.0):
+                    trial = lengths.copy()
+                    trial[i] = min(trial[i] * factor, 10.0)
+                    trial_score = self._likelihood(trial, noise)
+                    if trial_score > score:
+                        lengths, score = trial, trial_score
+        return lengths, noise
+
+    def _factor(self):
+        lengths, noise = self.params
+        k = self._kernel(self.x, self.x, lengths) + noise * np.eye(len(self.x))
+        self._chol = np.linalg.cholesky(k)
+        self._alpha = np.linalg.solve(self._chol.T, np.linalg.solve(self._chol, self.y))
+
+    def predict(self, x):
+        """Mean and standard deviation at the rows of `x`, in output units."""
+        lengths, noise = self.params
+        k = self._kernel(np.asarray(x, dtype=float), self.x, lengths)
+        mean = k @ self._alpha
+        v = np.linalg.solve(self._chol, k.T)
+        var = np.maximum(1 + noise - (v * v).sum(axis=0), 1e-12)
+        return self.mean + self.scale * mean, self.scale * np.sqrt(var)
+
+    def with_points(self, x, y):
+        """This fit's kernel, conditioned on extra (x, y) rows."""
+        return GaussianProcess(np.vstack([self.x, x]), np.append(self.y * self.scale + self.mean, y),
+                               params=self.params)
+
+
+# --- Design space ---
+
+class DesignSpace:
+    """The searched inputs, scaled to the unit cube, snapped to slider steps."""
+
+    def __init__(self, bounds, fixed=None):
+        self.fixed = dict(fixed or {})
+        self.names = [name for name in PARAMETERS if name in bounds and name not in self.fixed]
+        self.bounds = {name: bounds[name] for name in self.names}
+
+    def to_unit(self, points):
+        return np.array([[(p[n] - lo) / (hi - lo) for n, (lo, hi, _) in self.bounds.items()] for p in points])
+
+    def to_point(self, u):
+        point = dict(self.fixed)
+        for value, (name, (lo, hi, step)) in zip(u, self.bounds.items()):
+            value = lo + round((min(max(value, 0), 1) * (hi - lo)) / step) * step
+            point[name] = round(min(max(value, lo), hi), 4)
+        return point
+
+    def initial(self, n, seed):
+        """Latin hypercube over the ranges, snapped to the slider steps."""
+        sample = lhs_points({name: (lo, hi) for name, (lo, hi, _) in self.bounds.items()}, n, seed=seed)
+        return [self.to_point(self.to_unit([p])[0]) for p in sample]
+
+
+def _feasible(row):
+    return all(row[r.column] <= r.limit if r.op == "<=" else row[r.column] >= r.limit for r in REQUIREMENTS)
+
+
+def best_feasible(rows):
+    """The lightest row that meets every requirement, or None."""
+    return min((row for row in rows if _feasible(row)), key=lambda row: row[WEIGHT], default=None)
+
+
+def propose(rows, n, space, seed=0, candidates=4000):
+    """Next `n` points by constrained expected improvement.
+
+    One surrogate per requirement column (weight doubles as the objective).
+    Points are picked one at a time; each pick is then treated as observed
+    at its predicted values ("kriging believer"), so a batch spreads out
+    instead of crowding the same optimum.
+    """
+    rng = np.random.default_rng(seed + len(rows))
+    x = space.to_unit(rows)
+    # Weight, range and speed are positive and roughly power laws of the inputs: model their logs
+    models = {r.column: GaussianProcess(x, np.log([row[r.column] for row in rows])) for r in REQUIREMENTS}
+    best = best_feasible(rows)
+
+    # Random candidates, plus local moves around the best and most promising points
+    ranked = sorted(rows, key=lambda row: (not _feasible(row), row[WEIGHT]))[:5]
+    centers = space.to_unit(ranked)
+    local = centers[rng.integers(len(centers), size=candidates)] + rng.normal(
+        scale=rng.choice([0.03, 0.1, 0.25], size=(candidates, 1)), size=(candidates, len(space.names)))
+    pool = [space.to_point(u) for u in np.vstack([rng.random((candidates, len(space.names))), local])]
+    seen = {point_id(row_point(row)) for row in rows}
+    unique = {}
+    for point in pool:
+        unique.setdefault(point_id(point), point)
+    pool = [p for pid, p in unique.items() if pid not in seen]
+
+    chosen = []
+    for _ in range(n):
+        if not pool:
+            break
+        u = space.to_unit(pool)
+        feasible = np.ones(len(pool))
+        predictions = {}
+        for r in REQUIREMENTS:
+            mean, std = models[r.column].predict(u)
+            predictions[r.column] = mean
+            limit = math.log(r.limit)
+            z = (limit - mean) / std if r.op == "<=" else (mean - limit) / std
+            feasible *= _cdf(z)
+        if best is None:
+            score = feasible  # nothing feasible yet: look for it first
+        else:
+            mean, std = models[WEIGHT].predict(u)
+            target = math.log(best[WEIGHT])
+            z = (target - mean) / std
+            score = ((target - mean) * _cdf(z) + std * _pdf(z)) * feasible
+        i = int(np.argmax(score))
+        chosen.append(pool.pop(i))
+        for r in REQUIREMENTS:
+            models[r.column] = models[r.column].with_points(u[i:i + 1], predictions[r.column][i:i + 1])
+    return chosen
+
+
+# --- Jobs and results ---
+
+def structure_weight(output):
+    """Composite plus metal weight from an nTop output JSON (flat or "JSON Out" list form)."""
+    if isinstance(output, list):
+        output = next((item["value"]["jsonObject"] for item in output
+                       if isinstance(item, dict) and item.get("type") == "json"), {})
+    return output["Weight_Composite (lbm)"] + output["Weight_Metal (lbm)"]
+
+
+def fetch_outputs(client, model_id, job_id):
+    """Aerodeck metrics of a finished job, plus its structure weight."""
+    metrics = fetch_metrics(client, model_id, job_id)
+    for output in get_lineage().outputs(job_id, name=OUTPUT_FILE):
+        data = json.loads(read_text(retry_call(client.get_artifact, output.artifact_id)))
+        metrics["structure"] = {"weight_lbm": round(structure_weight(data), 3)}
+        return metrics
+    raise LookupError(f"Job {job_id} produced no {OUTPUT_FILE}")
+
+
+def row_point(row):
+    return {name: row[name] for name in PARAMETERS if name in row}
+
+
+def read_rows(path):
+    """Completed results with every requirement column present, as floats."""
+    rows = []
+    if not Path(path).exists():
+        return rows
+    with open(path, newline="") as f:
+        for raw in csv.DictReader(f):
+            try:
+                row = {name: float(raw[name]) for name in [*PARAMETERS, *(r.column for r in REQUIREMENTS)]}
+            except (KeyError, TypeError, ValueError):
+                continue  # a run without metrics: nothing to learn from
+            row["job_id"] = raw["job_id"]
+            rows.append(row)
+    return rows
+
+
+def optimize(client, model_id, base_input, space, results, journal, max_jobs=MAX_JOBS_PER_MODEL,
+             batch=4, initial=8, seed=0, agents=None, watcher=None, log=print):
+    """Run batches until `max_jobs` results (or failures) are in. Returns (best row, summary)."""
+    summary = {"jobs": 0, "failed": 0, "batches": 0, "first_feasible": None}
+    initial_points = space.initial(initial, seed)
+    while True:
+        rows = read_rows(results.path)
+        used = len(rows) + summary["failed"]
+        if used >= max_jobs:
+            break
+        n = min(batch, max_jobs - used)
+        if len(rows) < initial:
+            points = [p for p in initial_points if point_id(p) not in results.done][:n]
+            kind = "initial design"
+        else:
+            points = propose(rows, n, space, seed=seed)
+            kind = "surrogate"
+        if not points:
+            break
+        summary["batches"] += 1
+        log(f"\nBatch {summary['batches']} ({kind}): {len(points)} job(s)")
+        counts = run_sweep(client, model_id, base_input, points, results, journal, agents=agents,
+                           max_in_flight=len(points), watcher=watcher, fetch=fetch_outputs)
+        summary["jobs"] += counts["completed"] + counts["failed"]
+        summary["failed"] += counts["failed"]
+        rows = read_rows(results.path)
+        best = best_feasible(rows)
+        if best and summary["first_feasible"] is None:
+            summary["first_feasible"] = next(i for i, row in enumerate(rows) if _feasible(row)) + 1
+        if best:
+            log(f"  Best so far: {best[WEIGHT]:.1f} lb structure, {best['range_mission.range_nm']:.0f} nm, "
+                f"{best['range_mission.cruise_speed_kts']:.0f} kts ({len(rows)} results)")
+        else:
+            log(f"  No design meets every requirement yet ({len(rows)} results)")
+    return best_feasible(read_rows(results.path)), summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize the nTop wing with a surrogate model")
+    parser.add_argument("--model-id", type=str, required=True, help="Istari model ID for the nTop file")
+    parser.add_argument(
+        "--input",
+        type=str,
+        default=str(Path(__file__).resolve().parent / "v4_input.json"),
+        help="Base input parameters JSON (default: ntop/v4_input.json)",
+    )
+    parser.add_argument("--max-jobs", type=int, default=MAX_JOBS_PER_MODEL,
+                        help=f"Job budget, counting earlier results (default: {MAX_JOBS_PER_MODEL})")
+    parser.add_argument("--batch", type=int, default=4, help="Jobs submitted together (default: 4)")
+    parser.add_argument("--initial", type=int, default=8,
+                        help="Latin hypercube points before the surrogate takes over (default: 8)")
+    parser.add_argument("--range", type=str, action="append",
+                        help='Narrow a search range "NAME=low:high" (default: the demo sliders)')
+    parser.add_argument("--fix", type=str, action="append", help='Hold a parameter "NAME=value" fixed')
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--agent-id", type=str, action="append",
+                        help="Agent to run jobs on (repeat to spread jobs across agents)")
+    parser.add_argument("--results", type=str, default="ntop_optimize_results.csv",
+                        help="Results CSV; its .jobs.jsonl journal sits alongside "
+                             "(default: ntop_optimize_results.csv)")
+    parser.add_argument("--best-input", type=str, default=None,
+                        help="Write the best design's input JSON here (for run_ntop_model.py --input)")
+    args = parser.parse_args()
+
+    bounds = dict(BOUNDS)
+    for name, (low, high) in _parse_assignments(
+            args.range, lambda v: tuple(float(x) for x in v.split(":"))).items():
+        bounds[name] = (low, high, bounds[name][2])
+    space = DesignSpace(bounds, _parse_assignments(args.fix, float))
+
+    with open(args.input) as f:
+        base_input = json.load(f)
+
+    client = get_client()
+    results = ResultsTable(args.results, metric_columns=COLUMNS)
+    journal = Journal(Path(args.results).with_suffix(".jobs.jsonl"))
+    print(f"Model ID: {args.model_id}")
+    print(f"Searching {len(space.names)} parameter(s); budget {args.max_jobs} jobs in batches of {args.batch}")
+    print("Requirements: " + ", ".join(f"{r.label} {r.op} {r.limit:g}" for r in REQUIREMENTS))
+    print(f"Results: {args.results}")
+
+    try:
+        best, summary = optimize(client, args.model_id, base_input, space, results, journal,
+                                 max_jobs=args.max_jobs, batch=args.batch, initial=args.initial,
+                                 seed=args.seed, agents=args.agent_id)
+    except KeyboardInterrupt:
+        print("\nInterrupted — re-run the same command to resume; running jobs are kept.")
+        sys.exit(130)
+    finally:
+        results.close()
+        journal.close()
+
+    print(f"\nDone! {summary['jobs']} job(s) this run in {summary['batches']} batch(es), "
+          f"{summary['failed']} failed.")
+    if best is None:
+        print("No design met every requirement. Raise --max-jobs and re-run to continue.")
+        sys.exit(1)
+    print(f"Best design (job {best['job_id']}): {best[WEIGHT]:.1f} lb structure, "
+          f"payload {MTOW_LB - best[WEIGHT]:.1f} lb, {best['range_mission.range_nm']:.0f} nm, "
+          f"{best['range_mission.cruise_speed_kts']:.0f} kts")
+    for name, value in row_point(best).items():
+        print(f"  {name:<20} {value:g}")
+    if args.best_input:
+        with open(args.best_input, "w") as f:
+            json.dump(apply_point(base_input, row_point(best)), f, indent=4)
+        print(f"Input written to {args.best_input}")
+
+
+if __name__ == "__main__":
+    main()
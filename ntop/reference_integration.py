@@ -1,9 +1,9 @@
 import json
 import argparse
+import sys
 from datetime import datetime
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from time import sleep
 # from dotenv import load_dotenv
 from istari_digital_client import (
     Client,
@@ -13,6 +13,11 @@ from istari_digital_client import (
     Model,
 )
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from istari_jobs import monitor_job as watch_job
+from istari_scheduler import JobSpec, choose_agent
+from istari_upload import UploadManager
+
 ###
 # Initial Setup
 ###
@@ -54,17 +59,9 @@ client = Client(config)
 
 
 def monitor_job(job: Job, description: str = "Job") -> bool:
-    """Poll job status until completion or failure."""
-    while True:
-        sleep(5)
-        job = client.get_job(job.id)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] {description} status: {job.status.name.value}")
-        if job.status.name in {
-            JobStatusName.COMPLETED,
-            JobStatusName.FAILED,
-        }:
-            break
+    """Wait for job completion or failure via the shared job watcher."""
+    job = watch_job(client, job.id, description)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     if job.status.name == JobStatusName.COMPLETED:
         print(f"[{timestamp}]{description} completed successfully!")
@@ -83,9 +80,9 @@ def main() -> None:
     parser.add_argument(
         "--agent_id",
         type=str,
-        default=None,
+        action="append",
         help=(
-            "Specific agent ID to assign jobs to "
+            "Agent ID to assign jobs to; repeat to use whichever is free "
             "(default: None for auto-assignment)"
         )
     )
@@ -109,7 +106,8 @@ def main() -> None:
         model_id_to_use = args.model_id
     else:
         print("Uploading nTop model...")
-        ntop_model: Model = client.add_model(
+        # Large .ntop files go up in parallel, resumable parts
+        ntop_model: Model = UploadManager(client).add_model(
             path=NTOP_MODEL_FILE,
             description="nTop Model File",
             display_name=NTOP_MODEL_NAME,
@@ -130,12 +128,15 @@ def main() -> None:
     print("\nStarting @ntop:run_model...")
     print(f"Using model_id: {model_id_to_use}")
 
+    agent_id = choose_agent(client, args.agent_id, JobSpec(
+        model_id_to_use, "@ntop:run_model", None, "ntopcl", "5.30", OPERATING_SYSTEM
+    ))
     run_job: Job = client.add_job(
         model_id=model_id_to_use,
         function="@ntop:run_model",
         tool_name="ntopcl",
         tool_version="5.30",
-        assigned_agent_id=args.agent_id,
+        assigned_agent_id=agent_id,
         operating_system=OPERATING_SYSTEM,
         parameters={"ntop_input_json": input_json_data},
     )
@@ -1,21 +1,26 @@
 """Run an nTopology model via the Istari SDK.
 
 Submits a @ntop:run_model job with configurable wing parameters,
-polls until completion, and lists the resulting artifacts.
+polls until completion, and lists the resulting artifacts. If the same
+model revision already ran with the same parameters, that job's results
+are reused (pass --force to run again).
 
 Usage:
     python ntop/run_ntop_model.py --model-id <MODEL_ID>
     python ntop/run_ntop_model.py --model-id <MODEL_ID> --input ntop/v4_input.json
+    python ntop/run_ntop_model.py --model-id <MODEL_ID> --agent-id <A1> --agent-id <A2>
 """
 import argparse
 import json
 import sys
-from datetime import datetime
 from pathlib import Path
-from time import sleep
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from istari_client import get_client
+from istari_jobs import monitor_job
+from istari_memo import submit_job
+from istari_metrics import span
+from istari_scheduler import JobSpec, choose_agent
 from istari_digital_client import Job, JobStatusName
 
 # nTop job configuration
@@ -25,18 +30,6 @@ TOOL_VERSION = "5.30"
 OPERATING_SYSTEM = "RHEL 8"
 
 
-def monitor_job(client, job_id, poll_interval=5):
-    """Poll job status until completion or failure."""
-    while True:
-        sleep(poll_interval)
-        job = client.get_job(job_id)
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        status = job.status.name.value
-        print(f"  [{timestamp}] {status}")
-        if job.status.name in {JobStatusName.COMPLETED, JobStatusName.FAILED}:
-            return job
-
-
 def main():
     parser = argparse.ArgumentParser(description="Run nTop model in Istari")
     parser.add_argument(
@@ -54,8 +47,13 @@ def main():
     parser.add_argument(
         "--agent-id",
         type=str,
-        default=None,
-        help="Specific agent ID to assign the job to",
+        action="append",
+        help="Agent to assign the job to (repeat to use whichever is free)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Submit a new job even if an identical one already completed",
     )
     args = parser.parse_args()
 
@@ -72,22 +70,32 @@ def main():
         unit = inp.get("units", "")
         print(f"  {inp['name']}: {inp['value']} {unit}")
 
+    agent_id = choose_agent(client, args.agent_id, JobSpec(
+        args.model_id, FUNCTION, None, TOOL_NAME, TOOL_VERSION, OPERATING_SYSTEM
+    ))
+    if agent_id and len(args.agent_id) > 1:
+        print(f"Agent: {agent_id}")
+
     # Submit the job
     print(f"\nSubmitting {FUNCTION} job...")
-    job: Job = client.add_job(
-        model_id=args.model_id,
-        function=FUNCTION,
-        tool_name=TOOL_NAME,
-        tool_version=TOOL_VERSION,
-        assigned_agent_id=args.agent_id,
-        operating_system=OPERATING_SYSTEM,
-        parameters={"ntop_input_json": input_data},
-    )
-    print(f"Job created: {job.id}")
+    with span("submit"):
+        job: Job = submit_job(
+            client,
+            model_id=args.model_id,
+            function=FUNCTION,
+            tool_name=TOOL_NAME,
+            tool_version=TOOL_VERSION,
+            assigned_agent_id=agent_id,
+            operating_system=OPERATING_SYSTEM,
+            parameters={"ntop_input_json": input_data},
+            force=args.force,
+        )
+    print(f"Job: {job.id}")
 
     # Monitor
     print("\nMonitoring...")
-    final_job = monitor_job(client, job.id)
+    with span("monitor"):
+        final_job = monitor_job(client, job.id, "Run", function=FUNCTION)
 
     if final_job.status.name == JobStatusName.COMPLETED:
         print("\nJob completed!")
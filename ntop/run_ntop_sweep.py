@@ -0,0 +1,440 @@
+"""Run a parameter sweep (design of experiments) over an nTopology model.
+
+Generates wing input sets from a grid, a Latin hypercube or a CSV file,
+submits one @ntop:run_model job per point with a cap on jobs in flight
+(placed on whichever given agent should finish it first), and appends
+each finished run's aerodeck metrics to a results CSV as soon as it
+arrives.
+
+Submitted jobs are journaled next to the results file. Re-running the same
+command skips points already in the results and picks up jobs that were
+still running instead of submitting them again.
+
+Usage:
+    python ntop/run_ntop_sweep.py --model-id <ID> --grid "Span=132,144,156" --grid "LE Sweep P1=40,46,52"
+    python ntop/run_ntop_sweep.py --model-id <ID> --lhs 50 --range "Span=120:170" --range "LOA In=80:115"
+    python ntop/run_ntop_sweep.py --model-id <ID> --csv points.csv --agent-id <A1> --agent-id <A2> --max-in-flight 8
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from pathlib import Path
+from time import monotonic, sleep
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from istari_client import get_client
+from istari_artifact_store import read_text
+from istari_jobs import JobWatcher, TERMINAL_STATUSES
+from istari_lineage import get_lineage
+from istari_scheduler import AgentScheduler, JobSpec, get_agents
+from istari_throttle import retry_call
+from istari_digital_client import JobStatusName
+from run_ntop_model import FUNCTION, TOOL_NAME, TOOL_VERSION, OPERATING_SYSTEM
+
+# Wing inputs a sweep may vary (names as in v4_input.json)
+PARAMETERS = [
+    "LOA In",
+    "Span",
+    "LE Sweep P1",
+    "LE Sweep P2",
+    "TE Sweep P1",
+    "TE Sweep P2",
+    "Panel Break Span %",
+]
+
+METRICS_FILE = "grp3-uas_v6_aerodeck_metrics.json"
+
+# Results columns pulled from the metrics JSON (dotted paths)
+METRIC_COLUMNS = [
+    "mass_properties.mass_lbm",
+    "mass_properties.empty_weight_lbm",
+    "mass_properties.fuel_mass_lbm",
+    "mass_properties.wing_loading_lbm_per_ft2",
+    "reference_geometry.S_ref_ft2",
+    "reference_geometry.aspect_ratio",
+    "aerodynamic_performance.LD_max",
+    "aerodynamic_performance.CD_0",
+    "static_stability.longitudinal.static_margin_percent",
+    "range_mission.cruise_speed_kts",
+    "range_mission.range_nm",
+    "range_mission.total_endurance_hr",
+    "stability_summary.overall_stable",
+]
+
+
+# --- Point generation ---
+
+def grid_points(grid):
+    """Full factorial over {name: [values]}."""
+    names = list(grid)
+    return [dict(zip(names, combo)) for combo in itertools.product(*grid.values())]
+
+
+def lhs_points(ranges, n, seed=None):
+    """Latin hypercube sample of n points over {name: (low, high)}.
+
+    Each parameter's range is split into n equal strata and every stratum is
+    used exactly once, so even small samples cover each axis evenly.
+    """
+    rng = random.Random(seed)
+    columns = {}
+    for name, (low, high) in ranges.items():
+        strata = list(range(n))
+        rng.shuffle(strata)
+        columns[name] = [
+            round(low + (s + rng.random()) / n * (high - low), 4) for s in strata
+        ]
+    return [{name: columns[name][i] for name in ranges} for i in range(n)]
+
+
+def csv_points(path):
+    """One point per CSV row; columns are parameter names."""
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    unknown = set(rows[0]) - set(PARAMETERS) if rows else set()
+    if unknown:
+        raise ValueError(f"Unknown parameter column(s) in {path}: {', '.join(sorted(unknown))}")
+    return [{name: float(value) for name, value in row.items() if value != ""} for row in rows]
+
+
+def point_id(point):
+    """Stable ID for a point, so reruns recognize it regardless of order."""
+    canonical = json.dumps({k: float(v) for k, v in sorted(point.items())})
+    return hashlib.sha1(canonical.encode()).hexdigest()[:12]
+
+
+def apply_point(base_input, point):
+    """Copy of the base ntop_input_json with the point's values applied."""
+    input_data = deepcopy(base_input)
+    for inp in input_data.get("inputs", []):
+        if inp["name"] in point:
+            inp["value"] = point[inp["name"]]
+    return input_data
+
+
+def _parse_assignments(items, parse):
+    parsed = {}
+    for item in items or []:
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in PARAMETERS:
+            raise SystemExit(f"Unknown parameter '{name}'. Choose from: {', '.join(PARAMETERS)}")
+        parsed[name] = parse(value)
+    return parsed
+
+
+# --- Results table and journal ---
+
+def _metric(metrics, path):
+    value = metrics
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+class ResultsTable:
+    """Results CSV, one row per completed point, appended as runs finish."""
+
+    def __init__(self, path, metric_columns=METRIC_COLUMNS):
+        self.path = Path(path)
+        self.metric_columns = list(metric_columns)
+        self.columns = ["point_id", *PARAMETERS, *self.metric_columns, "job_id", "agent_id", "seconds"]
+        self.done = set()
+        self._lock = threading.Lock()
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, newline="") as f:
+                self.done = {row["point_id"] for row in csv.DictReader(f)}
+            self._file = open(self.path, "a", newline="")
+            self._writer = csv.DictWriter(self._file, self.columns)
+        else:
+            self._file = open(self.path, "w", newline="")
+            self._writer = csv.DictWriter(self._file, self.columns)
+            self._writer.writeheader()
+
+    def append(self, pid, point, metrics, job_id, agent_id, seconds):
+        row = {"point_id": pid, "job_id": job_id, "agent_id": agent_id or "", "seconds": seconds}
+        row.update(point)
+        row.update({path: _metric(metrics, path) for path in self.metric_columns})
+        with self._lock:
+            self._writer.writerow(row)
+            self._file.flush()
+            self.done.add(pid)
+
+    def close(self):
+        self._file.close()
+
+
+class Journal:
+    """Append-only log of submitted and finished jobs, one JSON object per line."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.running = {}  # point_id -> entry of a job not yet known to be finished
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["event"] == "submitted":
+                    self.running[entry["point_id"]] = entry
+                else:
+                    self.running.pop(entry["point_id"], None)
+        self._file = open(self.path, "a")
+
+    def record(self, event, pid, job_id, agent_id=None):
+        entry = {"event": event, "point_id": pid, "job_id": job_id, "agent_id": agent_id}
+        if event == "submitted":
+            self.running[pid] = entry
+        else:
+            self.running.pop(pid, None)
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+# --- Sweep loop ---
+
+def fetch_metrics(client, model_id, job_id):
+    """Read the aerodeck metrics JSON produced by a job.
+
+    Uses the local provenance index, which syncs only when the job's outputs
+    are not indexed yet, and then fetches only artifacts added since the
+    last sync. Jobs finishing together share that sync.
+    """
+    outputs = retry_call(get_lineage().job_outputs, client, model_id, job_id, name=METRICS_FILE)
+    for output in outputs:
+        return json.loads(read_text(retry_call(client.get_artifact, output.artifact_id)))
+    raise LookupError(f"Job {job_id} produced no {METRICS_FILE}")
+
+
+def run_sweep(client, model_id, base_input, points, results, journal,
+              agents=None, max_in_flight=4, watcher=None, fetch=fetch_metrics, agent_limit=None):
+    """Run every point not already in `results`. Returns a summary dict.
+
+    With `agents`, each job goes to the agent expected to finish it first,
+    at most `agent_limit` (default: max_in_flight) at a time on each (see
+    istari_scheduler.py); without, the platform picks.
+    `fetch(client, model_id, job_id)` returns a finished job's metrics dict.
+    """
+    agents = [agent for agent in agents or [] if agent]
+    watcher = watcher or JobWatcher(client)
+    scheduler = None
+    if agents:
+        scheduler = AgentScheduler(client, get_agents(client, agents),
+                                   limit=agent_limit or max_in_flight, watcher=watcher)
+    spec = JobSpec(model_id, FUNCTION, None, TOOL_NAME, TOOL_VERSION, OPERATING_SYSTEM)
+    in_flight = {}  # job_id -> (point_id, point, agent_id, submitted at)
+    counts = {"completed": 0, "failed": 0, "skipped": 0, "resumed": 0}
+
+    # Unswept parameters keep their base values in the results table
+    defaults = {
+        inp["name"]: inp["value"] for inp in base_input.get("inputs", []) if inp["name"] in PARAMETERS
+    }
+    by_id = {point_id(p): p for p in points}
+    queue = []
+    for pid, point in by_id.items():
+        if pid in results.done:
+            counts["skipped"] += 1
+        elif pid in journal.running:
+            # Submitted by an earlier run: watch it rather than resubmit
+            entry = journal.running[pid]
+            agent = entry["agent_id"]
+            in_flight[entry["job_id"]] = (pid, point, agent, monotonic())
+            if scheduler and agent in scheduler.agents:
+                scheduler.started(entry["job_id"], spec._replace(description=pid), agent)
+            watcher.watch(entry["job_id"], function=FUNCTION, description=pid)
+            counts["resumed"] += 1
+        else:
+            queue.append((pid, point))
+    queue.reverse()  # pop() from the end keeps the original order
+    total = len(queue) + len(in_flight)
+
+    def submit(pid, point, agent=None):
+        job = retry_call(
+            client.add_job,
+            model_id=model_id,
+            function=FUNCTION,
+            tool_name=TOOL_NAME,
+            tool_version=TOOL_VERSION,
+            assigned_agent_id=agent,
+            operating_system=OPERATING_SYSTEM,
+            parameters={"ntop_input_json": apply_point(base_input, point)},
+        )
+        in_flight[job.id] = (pid, point, agent, monotonic())
+        journal.record("submitted", pid, job.id, agent)
+        if scheduler:
+            scheduler.started(job.id, spec._replace(description=pid), agent)
+        watcher.watch(job.id, function=FUNCTION, description=pid)
+
+    def collect(job_id, pid, point, agent, seconds):
+        try:
+            metrics = fetch(client, model_id, job_id)
+        except Exception as e:
+            return job_id, pid, e
+        results.append(pid, {**defaults, **point}, metrics, job_id, agent, round(seconds, 1))
+        return job_id, pid, None
+
+    # Metrics downloads run beside the poll loop so they never hold up submissions
+    downloads = ThreadPoolExecutor(max_workers=4)
+    pending_downloads = []
+    finished = 0
+    try:
+        while queue or in_flight or pending_downloads:
+            if scheduler:
+                # Only the points whose best agent has a slot open now; the rest wait
+                starts = [a.id for a in scheduler.plan([spec] * len(queue)) if a]
+            else:
+                starts = [None] * len(queue)
+            for agent in starts[:max(0, max_in_flight - len(in_flight))]:
+                submit(*queue.pop(), agent)
+
+            for change in watcher.poll_due():
+                if change.new not in TERMINAL_STATUSES or change.job_id not in in_flight:
+                    continue
+                pid, point, agent, started = in_flight.pop(change.job_id)
+                if scheduler and change.job_id in scheduler.in_flight:
+                    scheduler.finished(change.job_id, change.job)
+                if change.new == JobStatusName.COMPLETED:
+                    pending_downloads.append(downloads.submit(
+                        collect, change.job_id, pid, point, agent, monotonic() - started
+                    ))
+                else:
+                    finished += 1
+                    counts["failed"] += 1
+                    journal.record("failed", pid, change.job_id, agent)
+                    print(f"  [{finished}/{total}] {pid}: {change.new.value}")
+
+            for future in [f for f in pending_downloads if f.done()]:
+                pending_downloads.remove(future)
+                job_id, pid, error = future.result()
+                finished += 1
+                if error:
+                    counts["failed"] += 1
+                    journal.record("failed", pid, job_id)
+                    print(f"  [{finished}/{total}] {pid}: no metrics ({error})")
+                else:
+                    counts["completed"] += 1
+                    journal.record("completed", pid, job_id)
+                    print(f"  [{finished}/{total}] {pid}: done")
+
+            if not queue or scheduler or len(in_flight) >= max_in_flight:
+                waiting = [watcher.jobs[j] for j in in_flight]
+                delay = min((t.next_poll for t in waiting), default=monotonic() + 0.2) - monotonic()
+                sleep(min(max(delay, 0.05), 1.0))
+    finally:
+        downloads.shutdown(wait=True, cancel_futures=True)
+
+    counts["api_polls"] = watcher.api_calls
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an nTop parameter sweep in Istari")
+    parser.add_argument("--model-id", type=str, required=True, help="Istari model ID for the nTop file")
+    parser.add_argument(
+        "--input",
+        type=str,
+        default=str(Path(__file__).resolve().parent / "v4_input.json"),
+        help="Base input parameters JSON (default: ntop/v4_input.json)",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--grid",
+        type=str,
+        action="append",
+        help='Grid axis "NAME=v1,v2,..." (repeat for a full factorial)',
+    )
+    source.add_argument("--lhs", type=int, help="Latin hypercube sample size (use with --range)")
+    source.add_argument("--csv", type=str, help="CSV of points, one column per parameter")
+    parser.add_argument(
+        "--range",
+        type=str,
+        action="append",
+        help='Latin hypercube range "NAME=low:high" (repeat per parameter)',
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for --lhs")
+    parser.add_argument(
+        "--agent-id",
+        type=str,
+        action="append",
+        help="Agent to run jobs on (repeat to spread jobs across agents)",
+    )
+    parser.add_argument(
+        "--agent-limit",
+        type=int,
+        default=None,
+        help="Maximum jobs on one agent at once (default: --max-in-flight)",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=4,
+        help="Maximum jobs queued or running at once (default: 4)",
+    )
+    parser.add_argument(
+        "--results",
+        type=str,
+        default="ntop_sweep_results.csv",
+        help="Results CSV; its .jobs.jsonl journal sits alongside (default: ntop_sweep_results.csv)",
+    )
+    args = parser.parse_args()
+
+    if args.grid:
+        points = grid_points(_parse_assignments(
+            args.grid, lambda v: [float(x) for x in v.split(",") if x.strip()]
+        ))
+    elif args.lhs:
+        ranges = _parse_assignments(
+            args.range, lambda v: tuple(float(x) for x in v.split(":"))
+        )
+        if not ranges:
+            parser.error("--lhs needs at least one --range")
+        points = lhs_points(ranges, args.lhs, seed=args.seed)
+    else:
+        points = csv_points(args.csv)
+
+    with open(args.input) as f:
+        base_input = json.load(f)
+
+    client = get_client()
+    results = ResultsTable(args.results)
+    journal = Journal(Path(args.results).with_suffix(".jobs.jsonl"))
+
+    print(f"Model ID: {args.model_id}")
+    print(f"Sweep: {len(points)} points, up to {args.max_in_flight} in flight "
+          + (f"on {len(args.agent_id)} agent(s)" if args.agent_id else "on agents the platform picks"))
+    print(f"Results: {args.results}\n")
+
+    try:
+        summary = run_sweep(
+            client, args.model_id, base_input, points, results, journal,
+            agents=args.agent_id, max_in_flight=args.max_in_flight, agent_limit=args.agent_limit,
+        )
+    except KeyboardInterrupt:
+        print("\nInterrupted — re-run the same command to resume; running jobs are kept.")
+        sys.exit(130)
+    finally:
+        results.close()
+        journal.close()
+
+    print(f"\nDone! {summary['completed']} completed, {summary['failed']} failed, "
+          f"{summary['skipped']} already in results, {summary['resumed']} resumed.")
+    print(f"  {summary['api_polls']} status polls")
+    if summary["failed"]:
+        print("  Re-run the same command to retry failed points.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
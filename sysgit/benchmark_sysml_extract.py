@@ -0,0 +1,90 @@
+"""Validate and benchmark the local SysML v2 extractor (istari_sysml.py).
+
+First checks that extracting the example models reproduces the example
+output_requirements.json / output_parts.json exactly. Then generates a
+synthetic model with many copies of the example subsystems and reports
+extraction throughput and peak memory.
+
+Usage:
+    python sysgit/benchmark_sysml_extract.py
+    python sysgit/benchmark_sysml_extract.py --copies 2000
+"""
+import argparse
+import re
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from istari_sysml import PARTS_FILE, REQUIREMENTS_FILE, compare, extract_file
+
+EXAMPLES = [
+    REPO_ROOT / "use-cases" / "explore-sysml-model",
+    REPO_ROOT / "use-cases" / "check-design-meets-requirements",
+]
+
+
+def validate():
+    """Compare extraction of each example input with its example output."""
+    ok = True
+    for example in EXAMPLES:
+        requirements, parts = extract_file(example / "example-input" / "group3_uas_requirements.sysml")
+        for extracted, name in [(requirements, REQUIREMENTS_FILE), (parts, PARTS_FILE)]:
+            problems = compare(extracted, example / "example-output" / name)
+            ok = ok and not problems
+            status = "matches" if not problems else f"{len(problems)} difference(s)"
+            print(f"  {example.name}/{name}: {status}")
+    return ok
+
+
+def synthetic_model(path, copies):
+    """Write a model whose Drone part is repeated `copies` times under new names."""
+    source = (EXAMPLES[0] / "example-input" / "group3_uas_requirements.sysml").read_text()
+    start = source.index("   part Drone {")
+    end = source.rindex("}")  # closes the top-level package
+    drone = source[start:end]
+    with open(path, "w") as f:
+        f.write(source[:start])
+        for i in range(copies):
+            f.write(re.sub(r"part Drone \{", f"part Drone{i} {{", drone, count=1))
+        f.write("}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and benchmark the local SysML extractor")
+    parser.add_argument("--copies", type=int, default=500, help="Drone copies in the synthetic model (default: 500)")
+    args = parser.parse_args()
+
+    print("Validating against example outputs:")
+    if not validate():
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic.sysml"
+        synthetic_model(path, args.copies)
+        size_mb = path.stat().st_size / 1e6
+
+        start = perf_counter()
+        requirements, parts = extract_file(path)
+        elapsed = perf_counter() - start
+
+        # Second pass for memory; tracing slows extraction too much to time it
+        tracemalloc.start()
+        extract_file(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        with open(path) as f:
+            lines = sum(1 for _ in f)
+
+    print(f"\nSynthetic model: {args.copies} Drone copies, {lines:,} lines, {size_mb:.1f} MB")
+    print(f"  Extracted {len(requirements)} requirements, {len(parts):,} parts in {elapsed:.2f}s")
+    print(f"  {lines / elapsed:,.0f} lines/s, {size_mb / elapsed:.1f} MB/s")
+    print(f"  Peak traced memory: {peak / 1e6:.1f} MB (includes the extracted output)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,36 @@
-"""Download, edit, re-upload, and extract a SysML v2 model.
+"""Download, edit, re-upload, and extract SysML v2 models.
 
 Demonstrates the full SysGit workflow:
-  1. Download a SysML model from Istari
-  2. Make a text edit (e.g. update a requirement value)
-  3. Re-upload as a new revision
-  4. Run @istari:extract_sysmlv2 to regenerate diagrams
+  1. Download a SysML model from Istari (kept in the local artifact store)
+  2. Stream it through one or more find/replace rules, hashing the output
+  3. Re-upload as a new revision — only if the content actually changed
+  4. Extract requirements and parts locally (seconds, no job)
+  5. Run @istari:extract_sysmlv2 to regenerate diagrams and stored artifacts
+     (skipped when this exact revision was already extracted; --force re-runs)
+
+Models whose edit leaves the content unchanged skip steps 3-5 entirely.
+--model-id may be repeated to apply the same edit to many models at once.
 
 Usage:
     python sysgit/update_and_extract_sysml.py --model-id <MODEL_ID>
     python sysgit/update_and_extract_sysml.py --model-id <MODEL_ID> --find "1000" --replace "1500"
+    python sysgit/update_and_extract_sysml.py --model-id <ID_1> --model-id <ID_2> \\
+        --find "275.0" --replace "325.0" --find "Rev A" --replace "Rev B"
+    python sysgit/update_and_extract_sysml.py --model-id <MODEL_ID> --regex \\
+        --find "maxValue : Real = [0-9.]+" --replace "maxValue : Real = 325.0"
+    python sysgit/update_and_extract_sysml.py --model-id <MODEL_ID> --local-only --output-dir extracted/
 """
 import argparse
 import sys
-import tempfile
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from time import sleep
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from istari_client import get_client
+from istari_edit import Rule, edit_model
+from istari_jobs import JobWatcher
+from istari_memo import submit_job
+from istari_sysml import extract_file, extract_model, write_outputs
 from istari_digital_client import JobStatusName
 
 # SysGit extraction configuration
@@ -27,108 +39,166 @@ TOOL_NAME = "sysgit"
 TOOL_VERSION = "0.1.8"
 OPERATING_SYSTEM = "Ubuntu 22.04"
 
+# Concurrent edits/uploads in a batch
+MAX_WORKERS = 4
+
 
-def monitor_job(client, job_id, description="Job", poll_interval=5):
-    """Poll job status until completion or failure."""
-    while True:
-        sleep(poll_interval)
-        job = client.get_job(job_id)
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        status = job.status.name.value
-        print(f"  [{timestamp}] {description}: {status}")
-        if job.status.name in {JobStatusName.COMPLETED, JobStatusName.FAILED}:
-            return job
+def print_edit(name, rules, result):
+    print(f"Model: {name}")
+    print(f"  Streamed {result.size:,} bytes")
+    for rule, count in zip(rules, result.replacements):
+        if count:
+            print(f"  Replaced '{rule.find}' → '{rule.replace}' ({count} occurrences)")
+        else:
+            print(f"  Warning: '{rule.find}' not found in model.")
+    if not result.changed:
+        print("  Content unchanged — skipping upload and extraction")
+    elif result.uploaded:
+        print("  Uploaded as new revision")
+    else:
+        print("  Content would change (dry run, not uploaded)")
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Update and extract a SysML v2 model"
+        description="Update and extract SysML v2 models"
     )
     parser.add_argument(
         "--model-id",
         type=str,
+        action="append",
         required=True,
-        help="Istari model ID for the SysML file",
+        help="Istari model ID for a SysML file (repeat for a batch)",
     )
     parser.add_argument(
         "--find",
         type=str,
-        default=None,
-        help="Text to find in the SysML file",
+        action="append",
+        default=[],
+        help="Text to find in the SysML file (repeat for several rules)",
     )
     parser.add_argument(
         "--replace",
         type=str,
-        default=None,
-        help="Text to replace it with",
+        action="append",
+        default=[],
+        help="Text to replace it with (one per --find, in order)",
+    )
+    parser.add_argument(
+        "--regex",
+        action="store_true",
+        help="Treat every --find as a regular expression (--replace may use \\1 groups)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what the edit would change without uploading or extracting",
     )
     parser.add_argument(
         "--extract-only",
         action="store_true",
         help="Skip editing, just run extraction on current model",
     )
+    parser.add_argument(
+        "--local-only",
+        action="store_true",
+        help="Only extract locally; skip the remote job (no diagrams)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run extraction even if this revision was already extracted",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default=None,
+        help="Write the locally extracted output_requirements.json / output_parts.json here "
+             "(one subfolder per model in a batch)",
+    )
     args = parser.parse_args()
 
-    client = get_client()
+    if len(args.find) != len(args.replace):
+        parser.error("each --find needs a matching --replace")
+    rules = [Rule(f, r, regex=args.regex) for f, r in zip(args.find, args.replace)]
 
-    # Step 1: Download current model
-    model = client.get_model(args.model_id)
-    print(f"Model: {model.display_name}")
-
-    if not args.extract_only:
-        content = model.read_text()
-        print(f"  Downloaded ({len(content):,} chars)")
-
-        if args.find and args.replace:
-            # Step 2: Edit
-            count = content.count(args.find)
-            if count == 0:
-                print(f"  Warning: '{args.find}' not found in model.")
-            else:
-                content = content.replace(args.find, args.replace)
-                print(f"  Replaced '{args.find}' → '{args.replace}' ({count} occurrences)")
-
-            # Step 3: Re-upload as new revision
-            with tempfile.NamedTemporaryFile(
-                suffix=".sysml", mode="w", delete=False
-            ) as tmp:
-                tmp.write(content)
-                tmp_path = Path(tmp.name)
-
-            updated = client.update_model(
-                model_id=args.model_id,
-                path=tmp_path,
-                description=f"Updated: {args.find} → {args.replace}",
-            )
-            tmp_path.unlink()
-            print(f"  Uploaded as new revision")
-        else:
-            print("  No --find/--replace specified, skipping edit.")
-
-    # Step 4: Run extraction
-    print(f"\nSubmitting {EXTRACT_FUNCTION} job...")
-    job = client.add_job(
-        model_id=args.model_id,
-        function=EXTRACT_FUNCTION,
-        tool_name=TOOL_NAME,
-        tool_version=TOOL_VERSION,
-        operating_system=OPERATING_SYSTEM,
-        parameters={},
-    )
-    print(f"Job created: {job.id}")
-
-    final_job = monitor_job(client, job.id, "Extraction")
-
-    if final_job.status.name == JobStatusName.COMPLETED:
-        print("\nExtraction complete!")
-        refreshed = client.get_model(args.model_id)
-        print(f"Artifacts ({len(refreshed.artifacts)}):")
-        for artifact in refreshed.artifacts:
-            rev = artifact.file.revisions[0] if artifact.file.revisions else None
-            name = rev.name if rev else "unknown"
-            print(f"  - {name}")
+    client = get_client()
+    models = {model_id: client.get_model(model_id) for model_id in args.model_id}
+
+    # Steps 1-3: stream each edit and upload only the models that changed
+    local_paths = {}  # model ID -> local file to extract (None: via the store)
+    if args.extract_only or not rules:
+        if not args.extract_only:
+            print("No --find/--replace specified, skipping edit.")
+        local_paths = dict.fromkeys(models)
     else:
-        print("\nExtraction FAILED.")
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            results = list(pool.map(
+                lambda model_id: edit_model(client, model_id, rules, dry_run=args.dry_run),
+                models,
+            ))
+        for result in results:
+            print_edit(models[result.model_id].display_name, rules, result)
+            if result.uploaded:
+                local_paths[result.model_id] = result.path
+        unchanged = sum(1 for r in results if not r.changed)
+        print(f"\n{len(results)} model(s): {len(local_paths)} updated, {unchanged} unchanged")
+        if args.dry_run:
+            return
+
+    # Step 4: Local extraction — requirements and parts without waiting on a job
+    for model_id, path in local_paths.items():
+        name = models[model_id].display_name
+        requirements, parts = extract_file(path) if path else extract_model(models[model_id])
+        print(f"\nLocal extraction ({name}): {len(requirements)} requirements, {len(parts)} parts")
+        if args.output_dir:
+            out_dir = Path(args.output_dir)
+            if len(args.model_id) > 1:
+                out_dir = out_dir / model_id
+            write_outputs(requirements, parts, out_dir)
+            print(f"  Wrote output_requirements.json and output_parts.json to {out_dir}")
+    if args.local_only or not local_paths:
+        return
+
+    # Step 5: Run remote extraction for diagrams, watching every job from one poller
+    watcher = JobWatcher(client)
+    jobs = {}
+    for model_id in local_paths:
+        print(f"\nSubmitting {EXTRACT_FUNCTION} job for {models[model_id].display_name}...")
+        job = submit_job(
+            client,
+            model_id=model_id,
+            function=EXTRACT_FUNCTION,
+            tool_name=TOOL_NAME,
+            tool_version=TOOL_VERSION,
+            operating_system=OPERATING_SYSTEM,
+            parameters={},
+            force=args.force,
+        )
+        print(f"Job: {job.id}")
+        jobs[job.id] = model_id
+        watcher.watch(job.id, function=EXTRACT_FUNCTION, description=models[model_id].display_name)
+
+    def report(change):
+        print(f"  {models[jobs[change.job_id]].display_name}: {change.new.value}")
+
+    finished = watcher.wait(list(jobs), on_change=report)
+
+    failed = 0
+    for job_id, final_job in finished.items():
+        model_id = jobs[job_id]
+        if final_job.status.name == JobStatusName.COMPLETED:
+            refreshed = client.get_model(model_id)
+            print(f"\nExtraction complete for {refreshed.display_name}!")
+            print(f"Artifacts ({len(refreshed.artifacts)}):")
+            for artifact in refreshed.artifacts:
+                rev = artifact.file.revisions[0] if artifact.file.revisions else None
+                name = rev.name if rev else "unknown"
+                print(f"  - {name}")
+        else:
+            print(f"\nExtraction FAILED for {models[model_id].display_name}.")
+            failed += 1
+    if failed:
         sys.exit(1)
 
 
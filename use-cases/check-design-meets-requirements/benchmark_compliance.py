@@ -0,0 +1,136 @@
+"""Benchmark scalar vs batch compliance checks over a synthetic design sweep.
+
+Perturbs the example aerodeck metrics into N design variants, runs
+run_all_checks() once per design, one ComplianceContext re-evaluated per
+design, and run_all_checks_batch() once for all of them, confirms every
+result matches, and prints the timings. Also checks the architecture mass
+roll-up against the flat sum over parts it replaced, on random part masses:
+the rounded value must be the same. After part updates, which add
+differences to the running total instead of re-summing, it may be one
+rounding step (0.1) off the flat sum, but no more.
+
+Usage:
+    python use-cases/check-design-meets-requirements/benchmark_compliance.py
+    python use-cases/check-design-meets-requirements/benchmark_compliance.py --designs 100000
+"""
+import argparse
+import copy
+import json
+import random
+import sys
+from pathlib import Path
+from time import perf_counter
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent.parent))
+from compliance_checks import (
+    ComplianceContext, batch_row, metrics_table, run_all_checks, run_all_checks_batch,
+)
+
+EXAMPLES = HERE / "example-output"
+MASS_CHECK = "Architecture Mass Roll-up"
+
+
+def make_designs(metrics, n, seed=0):
+    """N copies of the metrics with range, weight and speed varied ±30%."""
+    rng = random.Random(seed)
+    designs = []
+    for _ in range(n):
+        m = copy.deepcopy(metrics)
+        m["range_mission"]["range_nm"] = round(metrics["range_mission"]["range_nm"] * rng.uniform(0.7, 1.3), 1)
+        m["mass_properties"]["empty_weight_lbm"] = round(
+            metrics["mass_properties"]["empty_weight_lbm"] * rng.uniform(0.7, 1.3), 2
+        )
+        m["range_mission"]["cruise_speed_kts"] = rng.randint(120, 230)
+        designs.append(m)
+    return designs
+
+
+def flat_mass(parts):
+    """The mass roll-up as check_architecture_mass computed it before the roll-up tree."""
+    total_mass = 0
+    for part in parts.values():
+        val = part.get("attributes", {}).get("mass", {}).get("value")
+        if val is not None:
+            total_mass += float(val)
+    return round(total_mass, 1)
+
+
+def mass_parity(reqs, parts, n, seed=0):
+    """(fresh, updated): random part-mass sets whose mass roll-up differs from flat_mass().
+
+    Fresh counts any difference; after updates only one over a rounding step.
+    """
+    rng = random.Random(seed)
+    names = [qname for qname, part in parts.items() if "mass" in part.get("attributes", {})]
+
+    def with_mass(part, mass):
+        attributes = dict(part["attributes"], mass=dict(part["attributes"]["mass"], value=str(mass)))
+        return dict(part, attributes=attributes)
+
+    fresh = updated = 0
+    for _ in range(n):
+        varied = {q: with_mass(p, round(rng.uniform(0.1, 80), rng.choice([1, 2, 3])))
+                  if q in names else p for q, p in parts.items()}
+        ctx = ComplianceContext(reqs, varied)
+        actual = next(r["actual"] for r in ctx.evaluate(source="parts") if r["check"] == MASS_CHECK)
+        fresh += actual != flat_mass(varied)
+        changed = {q: with_mass(varied[q], round(rng.uniform(0.1, 80), 2)) for q in rng.sample(names, 3)}
+        varied.update(changed)
+        ctx.update_parts(changed)
+        actual = next(r["actual"] for r in ctx.evaluate(source="parts") if r["check"] == MASS_CHECK)
+        updated += abs(actual - flat_mass(varied)) > 0.1 + 1e-9
+    return fresh, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scalar vs batch compliance checks")
+    parser.add_argument("--designs", type=int, default=20000, help="Number of design variants (default: 20000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--mass-sets", type=int, default=3000,
+                        help="Random part-mass sets for the roll-up parity check (default: 3000)")
+    args = parser.parse_args()
+
+    reqs = json.loads((EXAMPLES / "output_requirements.json").read_text())
+    parts = json.loads((EXAMPLES / "output_parts.json").read_text())
+    metrics = json.loads((EXAMPLES / "grp3-uas_v6_aerodeck_metrics.json").read_text())
+    designs = make_designs(metrics, args.designs, args.seed)
+
+    start = perf_counter()
+    scalar = [run_all_checks(reqs, parts, m) for m in designs]
+    scalar_time = perf_counter() - start
+
+    start = perf_counter()
+    ctx = ComplianceContext(reqs, parts)
+    compiled = [list(ctx.evaluate(m)) for m in designs]
+    compiled_time = perf_counter() - start
+
+    start = perf_counter()
+    table = metrics_table(designs)
+    table_time = perf_counter() - start
+    start = perf_counter()
+    batch = run_all_checks_batch(reqs, parts, table)
+    batch_time = perf_counter() - start
+
+    mismatches = sum(
+        1 for i, expected in enumerate(scalar)
+        if batch_row(batch, i) != expected or compiled[i] != expected
+    )
+
+    print(f"Designs: {args.designs:,}  Checks per design: {len(batch['checks'])}")
+    print(f"  Scalar run_all_checks:     {scalar_time * 1000:9.1f} ms")
+    print(f"  ComplianceContext.evaluate:{compiled_time * 1000:9.1f} ms")
+    print(f"  Batch (table build):       {table_time * 1000:9.1f} ms")
+    print(f"  Batch run_all_checks_batch:{batch_time * 1000:9.1f} ms  "
+          f"({scalar_time / batch_time:.0f}x faster)")
+    print(f"  Passing every check: {batch['summary']['passing_designs']:,}")
+    print(f"  Mismatched designs: {mismatches}")
+    fresh, updated = mass_parity(reqs, parts, args.mass_sets, args.seed)
+    print(f"  Mass roll-ups differing from the flat sum: {fresh} of {args.mass_sets:,}; "
+          f"after updates, more than 0.1 off: {updated} of {args.mass_sets:,}")
+    if mismatches or fresh or updated:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Script version of check_design.ipynb: check, update the requirement, re-check.
+
+Runs the notebook's milestones without Jupyter:
+  1. Load the extracted requirements/parts and the latest nTop metrics
+  2. Run the compliance checks and snapshot the configuration
+  3. Relax the weight budget in the SysML (only uploaded if it changes)
+  4. Re-extract locally, re-check, run the SysGit job for diagrams, snapshot again
+
+Usage:
+    python use-cases/check-design-meets-requirements/check_design.py
+    python use-cases/check-design-meets-requirements/check_design.py --weight-budget 330
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent.parent))
+from compliance_checks import RULES, format_report, run_all_checks
+from istari_artifact_store import read_text
+from istari_client import get_client
+from istari_edit import Rule, edit_model
+from istari_jobs import monitor_job
+from istari_json_stream import load_json
+from istari_memo import submit_job
+from istari_metrics import span
+from istari_pagination import paginate
+from istari_sysml import extract_model
+from istari_digital_client import JobStatusName, NewSnapshot, NewSnapshotTag
+
+SYSTEM_ID = "294568b3-e626-4293-8e2c-307370ec9e95"  # Example: Check Design Meets Requirements
+CONFIG_ID = "cfdbd13b-817e-4c7e-b3c7-53ffcb4b9836"  # Baseline configuration
+SYSML_MODEL_ID = "c4280a27-b2e4-4376-81f7-474062bcdf4d"  # Group3 UAS Requirements
+NTOP_MODEL_ID = "263b7332-03f4-4ded-9686-7f11df478058"  # Group3-UAS-Wing-v8
+METRIC_PATHS = sorted({rule.path for rule in RULES if rule.source == "metrics"})
+
+
+def load_inputs(client):
+    """Extracted requirements and parts from the SysML model, metrics from nTop.
+
+    Only the metrics the compliance rules read are parsed out of the aerodeck file.
+    """
+    reqs = parts = metrics = None
+    for a in client.get_model(SYSML_MODEL_ID).artifacts:
+        rev = a.file.revisions[0] if a.file.revisions else None
+        if rev and "requirements" in rev.name and rev.name.endswith(".json"):
+            reqs = json.loads(read_text(a))
+        elif rev and "parts" in rev.name and rev.name.endswith(".json"):
+            parts = json.loads(read_text(a))
+    for a in reversed(client.get_model(NTOP_MODEL_ID).artifacts):
+        rev = a.file.revisions[0] if a.file.revisions else None
+        if rev and "aerodeck_metrics" in rev.name:
+            metrics = load_json(a, *METRIC_PATHS)
+            break
+    return reqs, parts, metrics
+
+
+def snapshot(client, tag):
+    """Snapshot the configuration (or reuse the latest if unchanged) and tag it."""
+    created = client.create_snapshot(CONFIG_ID, NewSnapshot()).actual_instance
+    if hasattr(created, "id"):
+        snap_id = created.id
+    else:
+        snap_id = client.list_snapshots(configuration_id=CONFIG_ID, page=1, size=1).items[0].id
+    client.create_tag(snap_id, NewSnapshotTag(tag=tag))
+    revs = paginate(client.list_snapshot_revisions, snap_id)
+    print(f"  Snapshot {snap_id[:8]}... tagged '{tag}' ({revs.total} files)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the design against requirements, update, re-check")
+    parser.add_argument("--weight-budget", type=float, default=325.0,
+                        help="New MaxStructureWeight in lb (default: 325)")
+    args = parser.parse_args()
+
+    client = get_client()
+    system = client.get_system(SYSTEM_ID)
+    print(f"System: {system.name}\n")
+
+    # Milestones 1-2: load, check, snapshot
+    with span("initial-checks"):
+        reqs, parts, metrics = load_inputs(client)
+        print(f"Loaded: {len(reqs)} requirements, {len(parts)} parts, aerodeck metrics\n")
+        print(format_report(run_all_checks(reqs, parts, metrics)))
+        snapshot(client, "initial-checks")
+
+    # Milestone 3: relax the weight budget
+    budget = f"{args.weight_budget:g}"
+    rules = [
+        Rule(r"attribute maxValue : Real = 275(\.0)?;", f"attribute maxValue : Real = {args.weight_budget:.1f};",
+             regex=True),
+        Rule("shall not exceed 275 lb", f"shall not exceed {budget} lb"),
+    ]
+    with span("update-requirement"):
+        result = edit_model(client, SYSML_MODEL_ID, rules)
+    print(f"\nWeight budget → {budget} lb: "
+          f"{'uploaded new revision' if result.uploaded else 'no change'}")
+
+    # Milestone 4: re-extract locally, re-check, remote extraction for diagrams
+    with span("re-check"):
+        reqs, parts = extract_model(client.get_model(SYSML_MODEL_ID))
+        results = run_all_checks(reqs, parts, metrics)
+    print("\n--- Updated compliance report ---\n")
+    print(format_report(results))
+
+    with span("extraction"):
+        job = submit_job(
+            client,
+            model_id=SYSML_MODEL_ID,
+            function="@istari:extract_sysmlv2",
+            tool_name="sysgit",
+            tool_version="0.1.8",
+            operating_system="Ubuntu 22.04",
+            parameters={},
+        )
+        job = monitor_job(client, job.id, "Extraction", function="@istari:extract_sysmlv2")
+    if job.status.name != JobStatusName.COMPLETED:
+        print("Extraction failed!")
+        sys.exit(1)
+    with span("snapshot"):
+        snapshot(client, "post-requirement-update")
+    if any(r["status"] != "PASS" for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,77 +4,195 @@ Compliance checks: requirements vs architecture vs CAD.
 Compares SysML requirements and architecture (parts) against nTop
 aerodeck metrics. Returns a simple pass/fail report.
 
+Each check is a row in RULES: which requirement attribute is the target,
+where the actual value comes from, and how they compare. To add a check,
+add a rule.
+
 Usage:
     from compliance_checks import run_all_checks
     results = run_all_checks(reqs_data, parts_data, metrics_data)
+
+    # Parse once, then re-check only what changed
+    from compliance_checks import ComplianceContext
+    ctx = ComplianceContext(reqs_data, parts_data)
+    results = ctx.evaluate(metrics_data)
+    results = ctx.evaluate(new_metrics)            # only metric checks whose value moved
+    ctx.update_parts({qname: part})                # only the changed parts' values are re-read
+
+    # Many designs at once (e.g. a parameter sweep), one row per design
+    from compliance_checks import metrics_table, run_all_checks_batch
+    batch = run_all_checks_batch(reqs_data, parts_data, metrics_table(all_metrics))
+    print(batch["summary"])
 """
 
 import json
+from collections import namedtuple
 
+import numpy as np
 
-def run_all_checks(reqs: dict, parts: dict, metrics: dict) -> list[dict]:
-    """Run all compliance checks and return results."""
-    results = []
-    results += check_reqs_vs_cad(reqs, metrics)
-    results += check_architecture_mass(reqs, parts)
-    return results
+from istari_rollup import RollupTree, part_value
 
+# requirement: requirement name in the SysML model
+# check:       label shown in reports
+# attribute:   requirement attribute holding the target value
+# source:      "metrics" (value at a dotted path in the aerodeck metrics)
+#              or "parts" (value rolled up over the architecture)
+# path:        metric path, or the part attribute to sum
+Rule = namedtuple("Rule", ["requirement", "check", "attribute", "source", "path", "unit", "operator"])
 
-def check_reqs_vs_cad(reqs: dict, metrics: dict) -> list[dict]:
-    """Check quantitative requirements against CAD results."""
-    results = []
+RULES = [
+    Rule("RangeReq", "Range", "targetValue", "metrics", "range_mission.range_nm", "nm", ">="),
+    Rule("MaxStructureWeight", "Structure Weight", "maxValue", "metrics",
+         "mass_properties.empty_weight_lbm", "lb", "<="),
+    Rule("CruiseSpeed", "Cruise Speed", "minValue", "metrics", "range_mission.cruise_speed_kts", "kts", ">="),
+    Rule("MaxStructureWeight", "Architecture Mass Roll-up", "maxValue", "parts", "mass", "lb", "<="),
+]
+
+
+def _metric(metrics, path):
+    value = metrics
+    for key in path.split("."):
+        value = value.get(key, {}) if isinstance(value, dict) else {}
+    return 0 if value == {} else value
+
+
+class ComplianceContext:
+    """Requirements and architecture parsed once, checks re-run on demand.
+
+    Requirements are indexed by name, part roll-ups are kept as running
+    totals, and each rule's last result is cached. A new architecture is
+    summed in part order, as the flat roll-up always did; part updates add
+    the changed values' differences. Updating metrics, parts or requirements
+    marks only the rules that read them as stale; the next evaluate()
+    recomputes just those. `rollup` gives subtotals for every subsystem, as
+    a RollupTree (istari_rollup.py) built the first time it is read.
+    """
+
+    def __init__(self, reqs: dict, parts: dict, rules: list = RULES):
+        self.rules = list(rules)
+        self.requirements = {}
+        self.targets = [0.0] * len(self.rules)
+        self.metrics = {}
+        self._actuals = [None] * len(self.rules)
+        self._results = [None] * len(self.rules)
+        self._stale = set(range(len(self.rules)))
+        self._parts = {}
+        self._pending = []  # (changed, removed) since set_parts, for a rollup not built yet
+        self._rollup = None
+        self._part_values = {}  # attribute -> {qualified name: value}
+        self._totals = {}  # attribute -> running total
+        self.evaluations = 0
+        self.update_requirements(reqs)
+        self.set_parts(parts)
 
-    # Build lookup by requirement name
-    lookup = {r.get("name"): r for r in reqs.values() if r.get("attributes")}
+    def _indexes(self, source):
+        return [i for i, rule in enumerate(self.rules) if rule.source == source]
 
-    # Range: actual >= target
-    req = lookup.get("RangeReq", {})
-    target = float(req.get("attributes", {}).get("targetValue", 0))
-    actual = metrics.get("range_mission", {}).get("range_nm", 0)
-    if target:
-        results.append(_result("RangeReq", "Range", target, actual, "nm", ">="))
+    def update_requirements(self, reqs: dict):
+        """Re-index requirements; rules whose target changed become stale."""
+        self.requirements = {r.get("name"): r for r in reqs.values() if r.get("attributes")}
+        for i, rule in enumerate(self.rules):
+            req = self.requirements.get(rule.requirement, {})
+            target = float(req.get("attributes", {}).get(rule.attribute, 0))
+            if target != self.targets[i]:
+                self.targets[i] = target
+                self._stale.add(i)
 
-    # Weight: actual <= target
-    req = lookup.get("MaxStructureWeight", {})
-    target = float(req.get("attributes", {}).get("maxValue", 0))
-    actual = metrics.get("mass_properties", {}).get("empty_weight_lbm", 0)
-    if target:
-        results.append(_result("MaxStructureWeight", "Structure Weight", target, actual, "lb", "<="))
+    @property
+    def rollup(self):
+        """RollupTree of the part attributes the rules sum, with subtotals per subsystem."""
+        if self._rollup is None:
+            attributes = sorted(self._part_values)
+            self._rollup = RollupTree(self._parts, {attribute: attribute for attribute in attributes})
+            for changed, removed in self._pending:
+                self._rollup.update(changed, removed)
+            self._pending = []
+        return self._rollup
 
-    # Speed: actual >= target
-    req = lookup.get("CruiseSpeed", {})
-    target = float(req.get("attributes", {}).get("minValue", 0))
-    actual = metrics.get("range_mission", {}).get("cruise_speed_kts", 0)
-    if target:
-        results.append(_result("CruiseSpeed", "Cruise Speed", target, actual, "kts", ">="))
+    def set_parts(self, parts: dict):
+        """Replace the whole architecture and re-sum every roll-up."""
+        self._parts, self._pending, self._rollup = parts, [], None
+        self._part_values, self._totals = {}, {}
+        for attribute in {self.rules[i].path for i in self._indexes("parts")}:
+            values = {qname: part_value(part, attribute) for qname, part in parts.items()}
+            self._part_values[attribute] = values
+            self._totals[attribute] = sum(values.values())
+        self._stale.update(self._indexes("parts"))
 
-    return results
+    def update_parts(self, changed: dict, removed=()):
+        """Apply changed/added parts and removed part names to the roll-ups.
+
+        Costs the changed parts only: each total moves by their differences,
+        and a built `rollup` adjusts the subtotals on their paths to the root.
+        """
+        if self._rollup is not None:
+            self._rollup.update(changed, removed)
+        else:
+            self._pending.append((dict(changed), list(removed)))
+        for attribute, values in self._part_values.items():
+            delta = 0.0
+            for qname in removed:
+                delta -= values.pop(qname, 0.0)
+            for qname, part in changed.items():
+                new = part_value(part, attribute)
+                delta += new - values.get(qname, 0.0)
+                values[qname] = new
+            before = self._totals[attribute]
+            self._totals[attribute] = before + delta
+            if round(before, 1) != round(before + delta, 1):  # the checked value moved
+                self._stale.update(i for i in self._indexes("parts") if self.rules[i].path == attribute)
+
+    def update_metrics(self, metrics: dict):
+        """Take new metrics; only rules whose metric value moved become stale."""
+        self.metrics = metrics
+        for i in self._indexes("metrics"):
+            if _metric(metrics, self.rules[i].path) != self._actuals[i]:
+                self._stale.add(i)
+
+    def actual(self, i):
+        """Current actual value for rule i."""
+        rule = self.rules[i]
+        if rule.source == "parts":
+            return round(self._totals[rule.path], 1)
+        return _metric(self.metrics, rule.path)
+
+    def evaluate(self, metrics: dict = None, source: str = None) -> list[dict]:
+        """Results of every rule with a target, re-running only stale ones.
+
+        `source` limits the results to "metrics" or "parts" rules.
+        """
+        if metrics is not None:
+            self.update_metrics(metrics)
+        for i in sorted(self._stale):
+            rule = self.rules[i]
+            self._actuals[i] = self.actual(i)
+            self._results[i] = None
+            if self.targets[i]:
+                self._results[i] = _result(
+                    rule.requirement, rule.check, self.targets[i], self._actuals[i],
+                    rule.unit, rule.operator,
+                )
+                self.evaluations += 1
+        self._stale.clear()
+        return [
+            result for rule, result in zip(self.rules, self._results)
+            if result is not None and (source is None or rule.source == source)
+        ]
+
+
+def run_all_checks(reqs: dict, parts: dict, metrics: dict) -> list[dict]:
+    """Run all compliance checks and return results."""
+    return ComplianceContext(reqs, parts).evaluate(metrics)
+
+
+def check_reqs_vs_cad(reqs: dict, metrics: dict) -> list[dict]:
+    """Check quantitative requirements against CAD results."""
+    return ComplianceContext(reqs, {}).evaluate(metrics, source="metrics")
 
 
 def check_architecture_mass(reqs: dict, parts: dict) -> list[dict]:
     """Sum component masses from architecture and compare to weight requirement."""
-    # Find the weight requirement target
-    target = 0
-    for r in reqs.values():
-        if r.get("name") == "MaxStructureWeight":
-            target = float(r.get("attributes", {}).get("maxValue", 0))
-            break
-
-    if not target:
-        return []
-
-    # Sum all component masses from parts
-    total_mass = 0
-    for qname, part in parts.items():
-        mass_attr = part.get("attributes", {}).get("mass", {})
-        val = mass_attr.get("value")
-        if val is not None:
-            total_mass += float(val)
-
-    return [_result(
-        "MaxStructureWeight", "Architecture Mass Roll-up",
-        target, round(total_mass, 1), "lb", "<="
-    )]
+    return ComplianceContext(reqs, parts).evaluate(source="parts")
 
 
 def _result(requirement, check, target, actual, unit, operator):
@@ -98,6 +216,107 @@ def _result(requirement, check, target, actual, unit, operator):
     }
 
 
+def metrics_table(metrics_list: list[dict], rules: list = RULES) -> dict:
+    """Columnar table from a list of metrics dicts: {dotted path: array}.
+
+    Only the columns the rules read are built. The results CSV written by
+    ntop/run_ntop_sweep.py uses the same dotted column names.
+    """
+    return {
+        rule.path: np.array([_metric(m, rule.path) for m in metrics_list], dtype=float)
+        for rule in rules if rule.source == "metrics"
+    }
+
+
+def _round1(values):
+    """Round to one decimal exactly like Python's round(x, 1).
+
+    np.round scales by 10 first, which can land on the other side of a tie
+    than Python's correctly-rounded result; those few cases are redone with
+    round() so batch margins match the scalar path bit for bit.
+    """
+    rounded = np.round(values, 1)
+    scaled = values * 10
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded.flat[i] = round(float(values.flat[i]), 1)
+    return rounded
+
+
+def _batch_check(target, actual, operator):
+    """Vectorized _result: pass flags and margins for one check over all designs."""
+    if operator == ">=":
+        passed = actual >= target
+        margin = _round1((actual - target) / target * 100)
+    else:  # <=
+        passed = actual <= target
+        margin = _round1((target - actual) / target * 100)
+    return passed, margin
+
+
+def run_all_checks_batch(reqs: dict, parts: dict, table: dict, rules: list = RULES) -> dict:
+    """Run all compliance checks over many designs at once.
+
+    `table` maps metric paths to equal-length arrays (see metrics_table()).
+    Requirements and architecture are shared by every design. Returns:
+        checks   list of {requirement, check, target, unit, operator}
+        actual   (designs, checks) float array
+        passed   (designs, checks) bool array
+        margin   (designs, checks) float array, % as in _result()
+        summary  design count, designs passing every check, per-check pass counts
+    Row i gives the same results as run_all_checks() on design i.
+    """
+    ctx = ComplianceContext(reqs, parts, rules)
+    n = len(next(iter(table.values()))) if table else 0
+
+    checks, actuals = [], []
+    for i, rule in enumerate(ctx.rules):
+        if not ctx.targets[i]:
+            continue
+        checks.append({"requirement": rule.requirement, "check": rule.check,
+                       "target": ctx.targets[i], "unit": rule.unit, "operator": rule.operator})
+        if rule.source == "metrics":
+            actuals.append(np.asarray(table.get(rule.path, np.zeros(n)), dtype=float))
+        else:
+            # Architecture roll-ups do not vary with the CAD metrics: one value per batch
+            actuals.append(np.full(n, float(ctx.actual(i))))
+
+    actual = np.column_stack(actuals) if actuals else np.zeros((n, 0))
+    passed = np.zeros(actual.shape, dtype=bool)
+    margin = np.zeros(actual.shape)
+    for j, c in enumerate(checks):
+        passed[:, j], margin[:, j] = _batch_check(c["target"], actual[:, j], c["operator"])
+
+    all_pass = passed.all(axis=1)
+    summary = {
+        "designs": n,
+        "passing_designs": int(all_pass.sum()),
+        "checks": {c["check"]: int(passed[:, j].sum()) for j, c in enumerate(checks)},
+        "worst_margin": {
+            c["check"]: float(margin[:, j].min()) if n else 0.0 for j, c in enumerate(checks)
+        },
+    }
+    return {"checks": checks, "actual": actual, "passed": passed, "margin": margin,
+            "summary": summary}
+
+
+def batch_row(batch: dict, row: int) -> list[dict]:
+    """One design's results from run_all_checks_batch(), in run_all_checks() form."""
+    return [
+        {
+            "requirement": c["requirement"],
+            "check": c["check"],
+            "target": c["target"],
+            "actual": batch["actual"][row, j].item(),
+            "unit": c["unit"],
+            "operator": c["operator"],
+            "status": "PASS" if batch["passed"][row, j] else "FAIL",
+            "margin": batch["margin"][row, j].item(),
+        }
+        for j, c in enumerate(batch["checks"])
+    ]
+
+
 def format_report(results: list[dict]) -> str:
     """Print a readable text report."""
     lines = []
@@ -0,0 +1,249 @@
+"""Benchmark istari_nastran.read_bdf on synthetic decks scaled up from the example.
+
+A deck at scale N holds N copies of Aircraft-One_DEMO.bdf's grids, elements,
+forces and constraints, each copy with its own IDs (the coordinates repeat).
+It is written in small-field, large-field and free-field format. Each read
+runs in a fresh process, so its peak memory is its own. The script checks
+that:
+
+  1. all three formats give the same arrays (IDs, coordinates, connectivity)
+  2. the element and grid counts are N times the example's
+  3. free-field cards with a tenth field or more (a continuation marker, or
+     data past it) read the same whichever parser takes them
+
+and reports throughput (MB/s) and peak memory above the interpreter's
+baseline, next to a plain reader that keeps one Python dict per card.
+
+Usage:
+    python use-cases/extract-nastran-model/benchmark_bdf_reader.py
+    python use-cases/extract-nastran-model/benchmark_bdf_reader.py --scales 1 10 100 400 --no-naive
+"""
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from istari_nastran import _card_fields, read_bdf
+
+EXAMPLE = Path(__file__).resolve().parent / "example-input" / "Aircraft-One_DEMO.bdf"
+FORMATS = ("small", "large", "free")
+
+
+def _real(value, width):
+    """A NASTRAN real that fits `width` columns (always with a decimal point)."""
+    for digits in range(width - 1, 0, -1):
+        text = f"{value:.{digits}g}"
+        if "e" not in text and "." not in text:
+            text += "."
+        if len(text) <= width:
+            return text
+    raise ValueError(f"{value} does not fit {width} columns")
+
+
+def _line(name, fields, form):
+    """One card's text; `fields` are strings, at most 8 (small) or 8 over two lines (large)."""
+    if form == "free":
+        return ",".join([name, *fields]) + "\n"
+    if form == "small":
+        return f"{name:<8}" + "".join(f"{f:>8}" for f in fields) + "\n"
+    fields = list(fields) + [""] * (-len(fields) % 4)
+    lines = []
+    for start in range(0, len(fields), 4):
+        head = f"{name + '*':<8}" if start == 0 else f"{'*':<8}"
+        lines.append(head + "".join(f"{f:>16}" for f in fields[start:start + 4]))
+    return "\n".join(lines) + "\n"
+
+
+def write_deck(path, scale, form):
+    """Write the example's bulk data `scale` times over, in `form` format."""
+    base = read_bdf(EXAMPLE)
+    grid_step = int(base.grids.ids.max()) + 1
+    element_step = max(int(e.ids.max()) for e in base.elements.values()) + 1
+    # Same text in every format, so all three must read back identically
+    xyz = [[_real(v, 8) for v in row] for row in base.grids.xyz.tolist()]
+    grids = list(zip(base.grids.ids.tolist(), base.grids.cp.tolist(), xyz, base.grids.cd.tolist()))
+    elements = [(name, e.ids.tolist(), e.pids.tolist(), e.nodes.tolist())
+                for name, e in base.elements.items()]
+    forces = base.tables["FORCE"].tolist()
+    spcs = base.tables["SPC1"].tolist()
+
+    with open(path, "w") as out:
+        out.write("SOL 101\nCEND\nBEGIN BULK\n")
+        out.write(_line("MAT1", ["1", "9900000.", "", ".33", "2.5388-4", "1.265-5", "70."], form))
+        for pid in sorted({p for _, _, pids, _ in elements for p in pids}):
+            out.write(_line("PSHELL", [str(pid), "1", ".1", "1", "", "1"], form))
+        for copy in range(scale):
+            g0, e0 = copy * grid_step, copy * element_step
+            out.write(f"$ copy {copy + 1}\n")
+            out.writelines(_line("GRID", [str(g + g0), str(cp), *c, str(cd)], form)
+                           for g, cp, c, cd in grids)
+            for name, ids, pids, nodes in elements:
+                out.writelines(_line(name, [str(e + e0), str(p), *(str(n + g0) for n in ns)], form)
+                               for e, p, ns in zip(ids, pids, nodes))
+            out.writelines(_line("FORCE", [str(int(sid)), str(int(g) + g0), "0", "1.", "0.", "0.", "1."], form)
+                           for sid, g, *_ in forces)
+            out.writelines(_line("SPC1", [str(int(sid)), str(int(c)), str(int(g) + g0)], form)
+                           for sid, c, g in spcs)
+        out.write("ENDDATA\n")
+
+
+# Free-field cards around the tenth field, and how many of their nodes are
+# given (1, 2, ...); the rest of the element's nodes must read as 0
+FREE_FIELD_CASES = [
+    ("CTRIA6,1,1,1,2,3,4,5,6\n", 6),
+    ("CQUAD8,2,1,1,2,3,4,5,6,7\n", 7),
+    ("CQUAD8,3,1,1,2,3,4,5,6,+Q3\n+Q3,7,8\n", 8),
+    ("CQUAD8,4,1,1,2,3,4,5,6,\n,7,8\n", 8),
+    ("CQUAD8,5,1,1,2,3,4,5,6\n,7,8\n", 8),
+    ("CQUAD8,6,1,1,2,3,4,5,6,7,8\n", 8),
+    ("CTETRA,7,1,1,2,3,4,5,6,7,8,9,10\n", 10),
+    ("CTETRA,8,1,1,2,3,4,5,6,,7,8,9,10\n", 10),
+    ("CTETRA,9,1,1,2,3,4,5,6,+T9\n+T9,7,8,9,10\n", 10),
+    ("CTETRA,10,1,1,2,3,4,5,6,7\n", 7),
+    ("CTRIA6,11,1,1,2,3,4,5,6,+\n", 6),
+]
+
+
+def free_field_parity(path):
+    """Cases of FREE_FIELD_CASES that read_bdf or _card_fields read wrongly."""
+    path.write_text("BEGIN BULK\n" + "".join(text for text, _ in FREE_FIELD_CASES) + "ENDDATA\n")
+    read = {}
+    for element in read_bdf(path).elements.values():
+        read.update(zip(element.ids.tolist(), element.nodes.tolist()))
+    wrong = []
+    for text, given in FREE_FIELD_CASES:
+        name, fields = _card_fields(text.splitlines(keepends=True))
+        nodes = read.get(int(fields[0]), [])
+        expected = list(range(1, given + 1))
+        if nodes != expected + [0] * (len(nodes) - given) or fields[2:] != [str(n) for n in expected]:
+            wrong.append(text.strip())
+    return wrong
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def naive_read(path):
+    """Plain reader for comparison: lines of each card into a dict per card."""
+    cards, lines = [], []
+
+    def flush():
+        if lines:
+            name, fields = _card_fields(lines)
+            cards.append({"card": name, "fields": fields})
+            lines.clear()
+
+    with open(path, encoding="latin-1") as f:
+        for line in f:
+            if line.startswith("BEGIN BULK"):
+                cards.clear()
+                continue
+            if not line.strip() or line.startswith("$"):
+                continue
+            if line[0].isalpha():
+                flush()
+            lines.append(line)
+    flush()
+    return cards
+
+
+def _child(path, reader):
+    """Run one read in this process and print its results as JSON."""
+    before = _peak_rss_mb()
+    started = perf_counter()
+    if reader == "naive":
+        cards = naive_read(path)
+        result = {"cards": len(cards)}
+    else:
+        bulk = read_bdf(path)
+        digest = hashlib.sha256(bulk.grids.ids.tobytes() + bulk.grids.xyz.tobytes())
+        for name in sorted(bulk.elements):
+            digest.update(bulk.elements[name].ids.tobytes() + bulk.elements[name].nodes.tobytes())
+        result = {
+            "grids": len(bulk.grids.ids),
+            "elements": sum(len(e.ids) for e in bulk.elements.values()),
+            "checksum": digest.hexdigest()[:16],
+        }
+    result["seconds"] = perf_counter() - started
+    after = _peak_rss_mb()
+    result["peak_mb"] = None if after is None else after - before
+    print(json.dumps(result))
+
+
+def _run(path, reader):
+    output = subprocess.run([sys.executable, __file__, "--child", str(path), reader],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local NASTRAN bulk data reader")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50, 200],
+                        help="Copies of the example deck per synthetic deck (default: 1 10 50 200)")
+    parser.add_argument("--no-naive", action="store_true", help="Skip the per-card dict reader")
+    parser.add_argument("--keep", default=None, help="Write the decks here and keep them")
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "READER"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(*args.child)
+        return
+
+    base = read_bdf(EXAMPLE)
+    base_grids = len(base.grids.ids)
+    base_elements = sum(len(e.ids) for e in base.elements.values())
+    work = Path(args.keep) if args.keep else Path(tempfile.mkdtemp(prefix="bdf-bench-"))
+    work.mkdir(parents=True, exist_ok=True)
+
+    failures = 0
+    wrong = free_field_parity(work / "free_field_cases.bdf")
+    for case in wrong:
+        print(f"  FAIL: {case!r} reads differently in the two parsers, or loses nodes")
+    failures += len(wrong)
+    print(f"  {'FAIL' if wrong else 'ok'}: free-field cards past the ninth field ({len(FREE_FIELD_CASES)} cases)")
+
+    print(f"{'deck':<18}{'MB':>8}{'reader':>8}{'seconds':>9}{'MB/s':>8}{'peak MB':>9}  check")
+    for scale in args.scales:
+        checksums = set()
+        for form in FORMATS:
+            path = work / f"scaled_{scale}x_{form}.bdf"
+            if not path.exists():
+                write_deck(path, scale, form)
+            mb = path.stat().st_size / (1024 * 1024)
+            readers = ["numpy"] if args.no_naive or form != "small" else ["numpy", "naive"]
+            for reader in readers:
+                result = _run(path, reader)
+                check = ""
+                if reader == "numpy":
+                    checksums.add(result["checksum"])
+                    counts_ok = (result["grids"] == base_grids * scale
+                                 and result["elements"] == base_elements * scale)
+                    check = "ok" if counts_ok else "WRONG COUNTS"
+                    failures += not counts_ok
+                peak = f"{result['peak_mb']:.1f}" if result["peak_mb"] is not None else "-"
+                print(f"{path.stem[7:]:<18}{mb:>8.1f}{reader:>8}{result['seconds']:>9.2f}"
+                      f"{mb / result['seconds']:>8.0f}{peak:>9}  {check}")
+        if len(checksums) > 1:
+            failures += 1
+            print(f"  FAIL: the formats disagree at scale {scale}")
+        else:
+            print(f"  ok: small, large and free field give the same arrays at scale {scale}")
+    if not args.keep:
+        for path in work.glob("*.bdf"):
+            path.unlink()
+        work.rmdir()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()